@@ -30,7 +30,16 @@ setup(name='biograpy',
           'matplotlib>=1.0',
           'numpy>=1.1',
       ],
+      extras_require={
+          # asyncio rendering, backports for older pythons
+          'async:python_version < "3.2"': ['futures'],
+          'async:python_version < "3.4"': ['trollius'],
+      },
       entry_points="""
       # -*- Entry points: -*-
+      [console_scripts]
+      biograpy-zoom = biograpy.signaldata:main
+      biograpy-index = biograpy.intervalindex:main
+      biograpy-server = biograpy.server:main
       """,
       )
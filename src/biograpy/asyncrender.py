@@ -0,0 +1,153 @@
+'''
+Created on 19/ott/2026
+
+Asyncio rendering.
+
+:func:`~biograpy.drawer.Panel.save_async` and
+:func:`~biograpy.seqrecord.SeqRecordDrawer.render_async` run the layout and
+the rasterization of a panel in an executor and return an asyncio future, so
+that an event loop is not blocked while a panel is saved::
+
+    htmlmap = await panel.save_async('panel.png')
+
+``trollius`` is used if ``asyncio`` is not available, and the
+``futures`` backport gives ``concurrent.futures`` on Python 2. both are
+installed with the ``async`` extra: ``pip install biograpy[async]``.
+
+Features are drawn through pyplot, whose current figure is global to the
+process: renders running in threads are serialized, the executor only keeps
+them out of the event loop. Use :func:`render_spec_async` with a process
+executor to render specs in parallel.
+
+Cancelling a future stops its render before the next track is drawn and
+releases its figure with :func:`~biograpy.drawer.Panel.close`.
+
+'''
+
+import threading
+
+try:
+    import asyncio
+except ImportError:
+    import trollius as asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+'''renders in threads share the pyplot state'''
+PYPLOT_LOCK = threading.RLock()
+
+_executor = None
+_concurrency = 2
+
+
+def configure(executor = None, concurrency = 2):
+    '''
+    set the default executor used by the async render functions.
+    if `executor` is ``None`` a thread pool of `concurrency` threads is
+    created on first use. an executor passed to a single call is used in its
+    place for that call.
+    '''
+    global _executor, _concurrency
+    _executor = executor
+    _concurrency = concurrency
+
+
+def get_executor():
+    '''returns the default executor'''
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers = _concurrency)
+    return _executor
+
+
+class _SaveJob(object):
+    '''a panel save that can be cancelled from the event loop. the panel
+    is closed once, either by the render thread or by the cancellation'''
+
+    def __init__(self, panel, output, close, kwargs):
+        self.panel = panel
+        self.output = output
+        self.close = close
+        self.kwargs = kwargs
+        self.lock = threading.Lock()
+        self.finished = False
+        self.closed = False
+        self.cancel_event = threading.Event()
+        panel.cancel_event = self.cancel_event
+
+    def _close_panel(self):
+        if not self.closed:
+            self.closed = True
+            self.panel.close()
+
+    def run(self):
+        PYPLOT_LOCK.acquire()
+        try:
+            self.panel.save(self.output, **self.kwargs)
+            return getattr(self.panel, 'htmlmap', None)
+        finally:
+            self.lock.acquire()
+            try:
+                self.finished = True
+                if self.close or self.cancel_event.is_set():
+                    self._close_panel()
+            finally:
+                self.lock.release()
+                PYPLOT_LOCK.release()
+
+    def cancel(self, concurrent_future):
+        self.lock.acquire()
+        try:
+            self.cancel_event.set()
+            if concurrent_future.cancel() or self.finished:# not started or already done
+                self._close_panel()
+        finally:
+            self.lock.release()
+
+
+def _render_spec(spec):
+    from biograpy.server import render_spec
+    PYPLOT_LOCK.acquire()# only matters in threads
+    try:
+        return render_spec(spec)
+    finally:
+        PYPLOT_LOCK.release()
+
+
+def save_async(panel, output, loop = None, executor = None, close = False, **kwargs):
+    '''
+    returns an asyncio future saving `panel` to `output` in `executor`, the
+    result is the html map if one was created. `kwargs` are passed to
+    :func:`~biograpy.drawer.Panel.save`. if `close` is ``True`` the panel
+    is closed once saved.
+    the executor must be a thread executor, panels cannot be sent to other
+    processes.
+    '''
+    if loop is None:
+        loop = asyncio.get_event_loop()
+    if executor is None:
+        executor = get_executor()
+    job = _SaveJob(panel, output, close, kwargs)
+    concurrent_future = executor.submit(job.run)
+    future = asyncio.wrap_future(concurrent_future, loop = loop)
+
+    def cancelled(future):
+        if future.cancelled():
+            job.cancel(concurrent_future)
+    future.add_done_callback(cancelled)
+    return future
+
+
+def render_spec_async(spec, loop = None, executor = None):
+    '''
+    returns an asyncio future rendering a :mod:`biograpy.server` spec in
+    `executor`, that can be a process executor since specs can be pickled.
+    the result is the dict returned by
+    :func:`~biograpy.server.render_spec`.
+    a render already running in another process is not stopped by
+    cancelling the future.
+    '''
+    if loop is None:
+        loop = asyncio.get_event_loop()
+    if executor is None:
+        executor = get_executor()
+    return asyncio.wrap_future(executor.submit(_render_spec, spec), loop = loop)
@@ -0,0 +1,199 @@
+'''
+Created on 19/ott/2026
+
+Benchmarks.
+
+``python -m biograpy.benchmark -n 1000000`` builds the given number of
+features with each of the core feature classes and with their compact
+versions, and prints the memory used per feature, once the features are
+drawn in a track, and the time spent to create them.
+
+The memory of a feature is measured following its attributes, lists, tuples
+and dicts. Objects shared between features, such as styles and colormaps,
+are counted once and divided among all the features.
+
+``python -m biograpy.benchmark --svg -n 2000`` saves a panel of genes as SVG
+with and without ``shared_glyphs`` and prints the file sizes and the time
+needed to parse them, as a measure of the time a browser spends reading them.
+
+``python -m biograpy.benchmark --backend -n 2000`` saves the same panel as SVG
+with the matplotlib backend and with the direct ``svg`` backend of
+:mod:`biograpy.svgrender` and prints the time spent and the file sizes.
+
+'''
+
+import sys
+import time
+import random
+
+from biograpy import features
+
+
+def deep_size(objects):
+    '''returns the bytes used by `objects` and by the objects they hold,
+    each object is counted once'''
+    seen = set()
+    size = 0
+    stack = list(objects)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, (features.BaseGraphicFeature, features.FeatureStyle)):
+            if hasattr(obj, '__dict__'):
+                stack.append(obj.__dict__)
+            for klass in type(obj).__mro__:
+                for slot in klass.__dict__.get('__slots__', ()):
+                    if (slot not in ('__dict__', '__weakref__')) and hasattr(obj, slot):
+                        stack.append(getattr(obj, slot))
+    return size
+
+
+def _gene_factory(feature_class):
+    def factory(i):
+        return feature_class(None, start = i * 10, end = i * 10 + 500, strand = 1, name = 'gene%i' % i)
+    return factory
+
+
+def _position_factory(feature_class):
+    def factory(i):
+        return feature_class(None, start = i * 10, name = 'site%i' % i)
+    return factory
+
+
+def _seqfeature_factory(feature_class):
+    from Bio.SeqFeature import SeqFeature, FeatureLocation
+    seqfeature = SeqFeature(FeatureLocation(0, 1), type = 'region')
+    def factory(i):
+        return feature_class(seqfeature, start = i * 10, end = i * 10 + 500, name = 'region%i' % i)
+    return factory
+
+
+def _simple_factory(feature_class):
+    def factory(i):
+        return feature_class(i * 10, i * 10 + 500, name = 'feat%i' % i)
+    return factory
+
+
+FEATURE_CLASSES = [(features.Simple, features.CompactSimple, _simple_factory),
+                   (features.GenericSeqFeature, features.CompactGenericSeqFeature, _seqfeature_factory),
+                   (features.GeneSeqFeature, features.CompactGeneSeqFeature, _gene_factory),
+                   (features.SinglePositionFeature, features.CompactSinglePositionFeature, _position_factory),]
+
+
+def feature_memory(factory, n, draw = True):
+    '''returns the bytes per feature and the seconds spent to create `n`
+    features with `factory`, a function taking the feature index. if `draw`
+    is ``True`` the features are measured after being drawn in a track, 
+    which sets their colors, and their artists are released'''
+    start = time.time()
+    feats = [factory(i) for i in xrange(n)]
+    elapsed = time.time() - start
+    if draw:
+        from cStringIO import StringIO
+        from biograpy import Panel, tracks
+        panel = Panel(fig_width = 1000, release_artists = True)
+        panel.add_track(tracks.BaseTrack(*feats, max_rows = 5))
+        panel.save(StringIO(), format = 'png')
+        panel.close()
+    return deep_size(feats) / float(n), elapsed
+
+
+def gene_panel(n, names = True, seed = 1):
+    '''returns a panel with a track of `n` random genes with one exon'''
+    from biograpy import Panel, tracks
+    rand = random.Random(seed)
+    genes = []
+    for i in xrange(n):
+        start = rand.randint(0, 1000000)
+        length = rand.choice([1000, 2000, 5000, rand.randint(500, 20000)])
+        genes.append(features.GeneSeqFeature(None, start = start, end = start + length,
+                                             strand = rand.choice([1, -1]),
+                                             name = names and ('gene%i' % i) or '',
+                                             exons = [(start + 100, start + 400)],
+                                             url = 'http://localhost/gene%i' % i))
+    panel = Panel(fig_width = 1000)
+    panel.add_track(tracks.BaseTrack(*genes, name = 'genes'))
+    return panel
+
+
+def svg_size(panel, shared_glyphs = False, repeat = 5):
+    '''returns the size in bytes of the svg output of `panel` and the seconds
+    needed to parse it'''
+    from cStringIO import StringIO
+    from xml.etree import cElementTree
+    output = StringIO()
+    panel.save(output, format = 'svg', shared_glyphs = shared_glyphs)
+    svg = output.getvalue()
+    start = time.time()
+    for i in range(repeat):
+        cElementTree.fromstring(svg)
+    return len(svg), (time.time() - start) / repeat
+
+
+def save_time(n, backend = 'matplotlib', names = True):
+    '''returns the seconds spent to save a new :func:`gene_panel` of `n` 
+    genes as svg with `backend`, and the size of the output'''
+    from cStringIO import StringIO
+    panel = gene_panel(n, names = names)
+    output = StringIO()
+    start = time.time()
+    panel.save(output, format = 'svg', backend = backend)
+    elapsed = time.time() - start
+    panel.close()
+    return elapsed, len(output.getvalue())
+
+
+def main(argv = None):
+    '''command line benchmark::
+
+        python -m biograpy.benchmark [--svg | --backend] [-n number]
+    '''
+    from optparse import OptionParser
+    parser = OptionParser(usage = '%prog [--svg | --backend] [-n number]')
+    parser.add_option('-n', '--number', type = 'int', default = None,
+                      help = 'features created per class, default is 1000000, or genes in the svg panel, default is 2000')
+    parser.add_option('--svg', action = 'store_true', default = False,
+                      help = 'compare svg output with and without shared glyphs')
+    parser.add_option('--backend', action = 'store_true', default = False,
+                      help = 'compare the svg save time of the matplotlib and svg backends')
+    options, args = parser.parse_args(argv)
+    if options.backend:
+        print '%-30s %12s %12s' % ('backend', 'seconds', 'bytes')
+        for names in (True, False):
+            for backend in ('matplotlib', 'svg'):
+                elapsed, size = save_time(options.number or 2000, backend, names = names)
+                print '%-30s %12.3f %12i' % ('%s, %s' % (backend, names and 'labels' or 'no labels'), elapsed, size)
+        return 0
+    if options.svg:
+        print '%-30s %12s %12s' % ('svg', 'bytes', 'parse s')
+        for names in (True, False):
+            panel = gene_panel(options.number or 2000, names = names)
+            for shared_glyphs in (False, True):
+                size, elapsed = svg_size(panel, shared_glyphs)
+                print '%-30s %12i %12.3f' % ('%s%s' % (names and 'labels' or 'no labels',
+                                                       shared_glyphs and ', shared glyphs' or ''), size, elapsed)
+            panel.close()
+        return 0
+    options.number = options.number or 1000000
+    print '%-30s %16s %12s' % ('class', 'bytes/feature', 'seconds')
+    for classic, compact, factory in FEATURE_CLASSES:
+        for feature_class in (classic, compact):
+            try:
+                size, elapsed = feature_memory(factory(feature_class), options.number)
+            except ImportError, e:# GenericSeqFeature needs Biopython
+                print '%-30s skipped: %s' % (feature_class.__name__, e)
+                break
+            print '%-30s %16.1f %12.2f' % (feature_class.__name__, size, elapsed)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+'''
+Created on 19/ott/2026
+
+Memory diagnostics for long running processes.
+
+A closed :class:`~biograpy.drawer.Panel` frees its figure, but features kept
+by the application keep their matplotlib artists, and the artists keep the
+axes and the figure, until the features are drawn again. Panels created with
+``release_artists = True`` drop these references when closed.
+:func:`live_objects` counts the figures, artists, features and panels still
+alive, :func:`memory_usage` gives the memory of the process and
+:func:`start_tracing` and :func:`top_allocations` find where memory is
+allocated with :mod:`tracemalloc`, available from Python 3.4 or with the
+pytracemalloc package::
+
+    panel = Panel(fig_width = 900, release_artists = True)
+    ...
+    panel.close()
+    print live_objects()
+
+The render service of :mod:`biograpy.server` uses these counters to keep its
+workers under a memory ceiling.
+
+'''
+
+import gc
+import os
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.artist import Artist
+from matplotlib.figure import Figure
+
+
+def live_objects():
+    '''
+    returns a dict with the number of live objects found by the garbage
+    collector: matplotlib `figures`, the figures still open in pyplot as
+    `pyplot_figures`, matplotlib `artists` (including figures and axes),
+    biograpy `features` and `panels`. collects garbage first, all the
+    objects of the process are scanned
+    '''
+    from biograpy.features import BaseGraphicFeature
+    from biograpy.drawer import Panel
+    gc.collect()
+    counts = dict(figures = 0, artists = 0, features = 0, panels = 0)
+    for obj in gc.get_objects():
+        if isinstance(obj, Artist):
+            counts['artists'] += 1
+            if isinstance(obj, Figure):
+                counts['figures'] += 1
+        elif isinstance(obj, BaseGraphicFeature):
+            counts['features'] += 1
+        elif isinstance(obj, Panel):
+            counts['panels'] += 1
+    counts['pyplot_figures'] = len(plt.get_fignums())
+    return counts
+
+
+def memory_usage():
+    '''returns the resident memory of the process in bytes, or its peak
+    resident memory where the current one cannot be read'''
+    try:
+        fh = open('/proc/self/statm')
+        try:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        finally:
+            fh.close()
+    except (IOError, OSError, ValueError, IndexError):
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            return peak
+        return peak * 1024
+
+
+def start_tracing(frames = 1):
+    '''start tracing memory allocations with :mod:`tracemalloc`, keeping
+    `frames` frames of each traceback. raises ``ImportError`` if tracemalloc
+    is not available'''
+    import tracemalloc
+    tracemalloc.start(frames)
+
+
+def stop_tracing():
+    '''stop tracing memory allocations and free the traces'''
+    import tracemalloc
+    tracemalloc.stop()
+
+
+def top_allocations(limit = 10, key_type = 'lineno'):
+    '''
+    returns the `limit` largest ``(location, size, count)`` allocations
+    traced since :func:`start_tracing`, grouped by `key_type`
+    (``'lineno'``, ``'filename'`` or ``'traceback'``), with `size` in bytes.
+    raises ``RuntimeError`` if tracing was not started
+    '''
+    import tracemalloc
+    if not tracemalloc.is_tracing():
+        raise RuntimeError('Memory allocations are not traced, call start_tracing first')
+    snapshot = tracemalloc.take_snapshot()
+    stats = snapshot.statistics(key_type)[:limit]
+    return [(str(stat.traceback), stat.size, stat.count) for stat in stats]
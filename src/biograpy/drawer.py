@@ -12,11 +12,85 @@ there's always a simpler solution you're not yet aware of...
 
 import matplotlib, warnings, operator
 matplotlib.use('Agg')
+import numpy as np
 import tracks 
 from matplotlib.font_manager import FontProperties
+from matplotlib.collections import LineCollection, Collection
+from matplotlib.colors import colorConverter
 
 warnings.simplefilter("ignore")
 
+class RenderCancelled(Exception):
+    '''raised when the `cancel_event` of a :class:`Panel` is set during 
+    drawing'''
+
+def feature_boxes(objects, fig):
+    '''yields the image box of every feature in `objects` drawn in `fig`, 
+    used for html maps. the boxes of the `map_regions` of a feature come 
+    before its box, with the region label as `name`'''
+    trans = fig.get_transform() # transform should not be necessary if the plot was already plotted
+    dpi = fig.get_dpi()
+    # XXX: img_width unused ???
+    # img_width = fig.get_figwidth() * dpi
+    img_height = fig.get_figheight() * dpi
+    for obj in objects:
+        xs_patches=[]
+        ys_patches=[]
+        for patch in obj.patches:
+            if isinstance(patch,list):
+                for p in patch:
+                    bbox=p.get_window_extent(None)
+                    xs_patches.append(bbox.xmax)
+                    xs_patches.append(bbox.xmin)
+                    ys_patches.append(bbox.ymax)
+                    ys_patches.append(bbox.ymin)
+            else:
+                try:
+                    bbox=patch.get_window_extent(None)
+                    xs_patches.append(bbox.xmax)
+                    xs_patches.append(bbox.xmin)
+                    ys_patches.append(bbox.ymax)
+                    ys_patches.append(bbox.ymin)
+                except:
+                    xs_patches = ys_patches = False
+        if xs_patches and ys_patches:
+            xmin, ymin = trans.transform([min(xs_patches),min(ys_patches)])
+            xmax, ymax = trans.transform([max(xs_patches),max(ys_patches)])
+            left = xmin
+            top = img_height-ymin
+            right = xmax
+            bottom = img_height-ymax
+            regions = getattr(obj, 'map_regions', None)
+            if regions:
+                data_trans = obj.patches[0].get_transform()
+                for label, start, end in regions:
+                    region_left = trans.transform(data_trans.transform([start, 0]))[0]
+                    region_right = trans.transform(data_trans.transform([end, 0]))[0]
+                    yield dict(feature=obj, name=label, left=region_left, top=top, right=region_right, 
+                               bottom=bottom, track=None, proceed = True)
+            yield dict(feature=obj, left=left, top=top, right=right, bottom=bottom, track=None, proceed = True)
+        else:
+            warnings.warn('could not find box coordinated for patch: '+str(patch) )
+            yield dict(feature=obj, left=left, top=top, right=right, bottom=bottom, track=None, proceed = False)
+
+def html_map(boxes, map_name = 'biograpy-map', map_id = 'biograpy-map', target = '_self'):
+    '''returns the html map of the feature `boxes` given by 
+    :func:`feature_boxes`'''
+    areas =[]
+    for box in boxes:
+        if box['proceed']:
+            obj = box['feature']
+            area_dict = dict(shape = 'rect', # shape: rect, circle, poly
+                             coords = '%(left)i,%(top)i,%(right)i,%(bottom)i' % box,
+                             href = obj.url or '#%s'%obj.name, #href
+                             target = target,
+                             script = obj.html_map_extend,
+                             alt = box.get('name', obj.name) )
+            area_html = '''<area shape="%(shape)s" coords="%(coords)s" href="%(href)s" target="%(target)s" alt="%(alt)s" %(script)s >''' % area_dict
+            areas.append(area_html)
+    return '''<map name="%s" id="%s">\n %s \n</map>'''%(map_name, map_id, '\n'.join(areas))
+
+
 class Panel(object):
     '''
  
@@ -58,6 +132,14 @@ class Panel(object):
                               a part of the drawing, default is ``None``
         xmax                  int maximum value of the X axes, use to plot just 
                               a part of the drawing, default is ``None``  
+        figure_pool           a :class:`~biograpy.figurepool.FigurePool` to 
+                              take the figure from, it is given back to the 
+                              pool by :func:`close`. default is ``None``
+        release_artists       ``True`` | ``False``. :func:`close` also calls 
+                              :func:`release`, so that the features do not 
+                              keep the artists of the closed figure alive. 
+                              use it in long running processes. default is 
+                              ``False``
         ===================== ==================================================
         
     '''
@@ -71,6 +153,7 @@ class Panel(object):
             self.fig_height = fig_height / float(fig_dpi)
         else:
             self.fig_height = fig_height
+        self._auto_fig_height = not fig_height
         self.dpi = float(fig_dpi)
         self.features = {}
         self.tracks = []
@@ -91,10 +174,23 @@ class Panel(object):
             self.vpadding = self.hpadding
         self.xmin = kwargs.get('xmin', None)
         self.xmax = kwargs.get('xmax', None)
+        self._xlim_options = [self.xmin, self.xmax]# None means computed from the tracks
+        '''state of the last drawing, reused when tracks change'''
+        self._layout_key = None
+        self._track_cache = {}# track id -> axes and decorations
+        self._axes_count = 0
         
             
+        self.figure_pool = kwargs.get('figure_pool', None)
+        self.release_artists = kwargs.get('release_artists', False)
+        self.cancel_event = None # a threading.Event checked between tracks
+        self.closed = False
+            
         '''create figure object'''
-        self.fig = matplotlib.pyplot.figure(1, figsize = (self.fig_width, self.fig_width), dpi = self.dpi, frameon = False)
+        if self.figure_pool is not None:
+            self.fig = self.figure_pool.acquire(self.fig_width, self.fig_width, self.dpi)
+        else:
+            self.fig = matplotlib.pyplot.figure(1, figsize = (self.fig_width, self.fig_width), dpi = self.dpi, frameon = False)
         self.ax = self.fig.add_subplot(111)#needed to make it invisible
         ''' '''
 
@@ -122,74 +218,167 @@ class Panel(object):
     def _estimate_fig_height(self,):
         return self.drawn_lines*self.fig_width/30.
 
+    def _auto_xticks(self):
+        '''returns the automatic X major and minor ticks for the panel 
+        range, computed once for all the tracks'''
+        step=int(round(self.xmax/10.,1-len(str(int(self.xmax / 10.)))))
+        auto_X_major_ticks = range(self.xmin, self.xmax + 1, step)
+        step_min = step / 4.
+        minor_ticks = np.empty(int((self.xmax - auto_X_major_ticks[0]) / step_min) + 2)
+        minor_ticks.fill(step_min)
+        minor_ticks[0] = auto_X_major_ticks[0]
+        minor_ticks = np.cumsum(minor_ticks)# same accumulation as tick += step_min
+        minor_ticks = minor_ticks[minor_ticks <= self.xmax]
+        auto_X_minor_ticks = np.floor(minor_ticks + 0.5).astype(int).tolist()
+        return auto_X_major_ticks, auto_X_minor_ticks
+    
+    def _grid_lines(self, auto_X_major_ticks, auto_X_minor_ticks):
+        '''returns the segments and colors of the grid lines, in X data 
+        and Y axes coordinates, to be shared by all the track axes'''
+        segments = []
+        grid_colors = []
+        if (self.grid == 'major') or (self.grid == 'both'):
+            segments.extend([((X, 0), (X, 1)) for X in auto_X_major_ticks])
+            grid_colors.extend([colorConverter.to_rgba('grey', 0.66)] * len(auto_X_major_ticks))
+        if (self.grid == 'minor') or (self.grid == 'both'):
+            segments.extend([((X, 0), (X, 1)) for X in auto_X_minor_ticks])
+            grid_colors.extend([colorConverter.to_rgba('grey', 0.33)] * len(auto_X_minor_ticks))
+        return segments, grid_colors
+    
+    def _discard_track(self, track):
+        '''remove the axes of a previous drawing of the track'''
+        entry = self._track_cache.pop(id(track), None)
+        if entry is not None:
+            self.fig.delaxes(entry['axis'])
+            if entry['cb_axis'] is not None:
+                self.fig.delaxes(entry['cb_axis'])
+    
+    def _clear_hidden_axes(self):
+        '''features are drawn with pyplot in the hidden panel axes, their 
+        artists are then moved to the track axes'''
+        for artists in (self.ax.texts, self.ax.lines, self.ax.patches, 
+                        self.ax.collections, self.ax.artists):
+            del artists[:]
+    
+    def _new_axes(self, rect):
+        '''axes are labeled to avoid matplotlib returning an existing axes 
+        created with the same rect'''
+        self._axes_count += 1
+        return self.fig.add_axes(rect, label = 'biograpy axes %i' % self._axes_count)
+    
+    def _check_cancelled(self):
+        if (self.cancel_event is not None) and self.cancel_event.is_set():
+            raise RenderCancelled('Panel drawing was cancelled')
+    
     def _draw_tracks(self, **kwargs):
         '''create an axis for each track and moves
         accordingly all the child features'''
         
+        matplotlib.pyplot.figure(self.fig.number)# features are drawn with pyplot
+        matplotlib.pyplot.sca(self.ax)
         self.ax.set_axis_off()
         self.Drawn_objects = []
         self.track_axes = []
         draw_xmin = kwargs.get('xmin', None)
         draw_xmax = kwargs.get('xmax', None)
         if draw_xmin:
-            self.xmin = draw_xmin
+            self._xlim_options[0] = draw_xmin
         if draw_xmax:
-            self.xmax = draw_xmax
-        '''estimate track height using track.drawn_lines
-        find max and min x coords, and check for colorbar
-        presence in at least one track'''
+            self._xlim_options[1] = draw_xmax
+        self.xmin, self.xmax = self._xlim_options
+        '''check for colorbar presence in at least one track, colorbars 
+        take width from the axes'''
         cbars = False
+        for track in self.tracks:
+            if track.features and track.draw_cb:
+                if cbars != 'label':
+                    cbars = 'simple'
+                    if track.cb_label:
+                        cbars = 'label'
+        '''set colorbar dimension '''
+        if cbars == 'label':
+            cbar_extent=0.015
+            cbar_axis_space = 0.05
+            cbar_right_pad = 0.03
+        else:
+            cbar_extent=0.015
+            cbar_axis_space = 0.05
+            cbar_right_pad = 0.01
+        axis_width = 1.-2*self.hpadding
+        if cbars:
+            axis_width -= (cbar_extent + cbar_axis_space + cbar_right_pad)
+        pixels = int(self.fig_width * self.dpi * axis_width)
+        '''tracks are laid out again only if they changed or if the drawing 
+        range changed'''
+        layout_key = (self.xmin, self.xmax, pixels, self.dpi)
+        full_layout = layout_key != self._layout_key
+        self._layout_key = layout_key
+        '''estimate track height using track.drawn_lines
+        find max and min x coords'''
         self.drawn_lines = 0
         Xs =[]
         track_height_user_specified = False
         for track in self.tracks:
+            self._check_cancelled()
             if track.features:#skip tracks with no features
-                if track.track_height and self.fig_height: #if not fig_height is specified user track heights are ignored
+                if track.track_height and not self._auto_fig_height: #if not fig_height is specified user track heights are ignored
                     track_height_user_specified = True
                 if track_height_user_specified and not track.track_height:
                     track_height_user_specified = False #disable if some track has not a specified heigth
                     warnings.warn('All tracks need to have a specified track_height, reverting to automatic track height')
-                track._sort_features(dpi = self.dpi, xoffset = self.xmin)#THIS WILL DRAW ALL THE FEATURES
-                if track.draw_cb:
-                    if cbars != 'label':
-                        cbars = 'simple'
-                        if track.cb_label:
-                            cbars = 'label'
+                if full_layout or not track._can_update():
+                    if track._laid_out:
+                        self._discard_track(track)
+                    track._sort_features(dpi = self.dpi,
+                                         xoffset = self.xmin,
+                                         xmax = self.xmax,
+                                         pixels = pixels)#THIS WILL DRAW ALL THE FEATURES
+                elif track.is_dirty():# only draw and place appended features
+                    self._discard_track(track)
+                    track._update_features(dpi = self.dpi,
+                                           xoffset = self.xmin,
+                                           xmax = self.xmax,
+                                           pixels = pixels)
                 self.drawn_lines += track.drawn_lines
                 Xs.append(track.xmin)
                 Xs.append(track.xmax)
+        self._clear_hidden_axes()
         if self.xmin == None:
             self.xmin = min(Xs)
         if self.xmax == None:
             self.xmax =max(Xs)
         '''auto estimate fig_heigth and panning if needed '''
-        if not self.fig_height:#automatcally set fig height basing on the total number of features
+        if self._auto_fig_height:#automatcally set fig height basing on the total number of features
             self.fig_height=self._estimate_fig_height()
             self.vpadding = (float(self.padding)/self.dpi) / self.fig_height
             self.vtrack_padding = (float(self.track_padding)/self.dpi) / self.fig_height
             
-        '''set colorbar dimension '''
-        if cbars == 'label':
-            cbar_extent=0.015
-            cbar_axis_space = 0.05
-            cbar_right_pad = 0.03
-        else:
-            cbar_extent=0.015
-            cbar_axis_space = 0.05
-            cbar_right_pad = 0.01
-            
         '''arrange tracks'''
         
         axis_left_pad = self.hpadding
         default_figure_bottom_space = self.vpadding + float(self.figure_bottom_space)/self.dpi
         axis_bottom_pad = 1.0 - default_figure_bottom_space
-        axis_width = 1.-2*self.hpadding
         axis_scale = None# used to persist the same scale on all the tracks
-        if cbars:
-            axis_width -= (cbar_extent + cbar_axis_space + cbar_right_pad)
+        '''X ticks and grid lines are the same for all the tracks '''
+        auto_X_major_ticks, auto_X_minor_ticks = self._auto_xticks()
+        grid_segments, grid_colors = [], []
+        if self.grid:
+            grid_segments, grid_colors = self._grid_lines(auto_X_major_ticks, auto_X_minor_ticks)
+        '''drop axes of tracks no longer drawn '''
+        for track in self.tracks:
+            if (not track.features) and (id(track) in self._track_cache):
+                self._discard_track(track)
+        drawn_tracks = set([id(track) for track in self.tracks])
+        for track_id in self._track_cache.keys():
+            if track_id not in drawn_tracks:
+                entry = self._track_cache.pop(track_id)
+                self.fig.delaxes(entry['axis'])
+                if entry['cb_axis'] is not None:
+                    self.fig.delaxes(entry['cb_axis'])
         '''cycle trought tracks and draw them as axix object '''
         #canvas_height = 0
         for track_num, track in enumerate(self.tracks):
+            self._check_cancelled()
             if track.features:#skip tracks with no features
                 '''define axis dimensions and position and create axis'''
                 if track_height_user_specified:
@@ -201,7 +390,22 @@ class Panel(object):
                         axis_height = (float(track.drawn_lines)/self.drawn_lines)  - self.vpadding/(2.*len(self.tracks)) - default_figure_bottom_space/len(self.tracks)
                         axis_scale = axis_height / float(track.drawn_lines)
                 axis_bottom_pad -= (axis_height + self.vtrack_padding/2.)
-                axis = matplotlib.pyplot.axes([axis_left_pad,axis_bottom_pad, axis_width, axis_height ],) 
+                entry = self._track_cache.get(id(track))
+                if entry is None:
+                    axis = self._new_axes([axis_left_pad,axis_bottom_pad, axis_width, axis_height ],) 
+                    entry = self._track_cache[id(track)] = dict(axis = axis, name = None, grid = None, cb_axis = None)
+                    reused = False
+                else:# unchanged track, move its axes and decorate them again
+                    axis = entry['axis']
+                    axis.set_position([axis_left_pad,axis_bottom_pad, axis_width, axis_height ])
+                    if entry['name'] is not None:
+                        axis.texts.remove(entry['name'])
+                    if entry['grid'] is not None:
+                        axis.collections.remove(entry['grid'])
+                    if entry['cb_axis'] is not None:
+                        self.fig.delaxes(entry['cb_axis'])
+                    entry.update(name = None, grid = None, cb_axis = None)
+                    reused = True
                 self.track_axes.append(axis)
                 
                 
@@ -211,59 +415,53 @@ class Panel(object):
                     if track.show_name:
                         if track.show_name == 'top':
                             axis.set_ylim(track.Ycord, track.ymax+1)
-                            track_name = axis.text(self.xmin + (self.xmax * 0.01), track.ymax + .5, track.name,  horizontalalignment='left', verticalalignment='bottom', fontproperties=track.name_font_feat,)
+                            entry['name'] = axis.text(self.xmin + (self.xmax * 0.01), track.ymax + .5, track.name,  horizontalalignment='left', verticalalignment='bottom', fontproperties=track.name_font_feat,)
                         elif track.show_name == 'bottom':
                             axis.set_ylim(track.Ycord-1, track.ymax)
-                            track_name = axis.text(self.xmin + (self.xmax * 0.01), track.Ycord - .5, track.name,  horizontalalignment='left', verticalalignment='bottom', fontproperties=track.name_font_feat,)
+                            entry['name'] = axis.text(self.xmin + (self.xmax * 0.01), track.Ycord - .5, track.name,  horizontalalignment='left', verticalalignment='bottom', fontproperties=track.name_font_feat,)
                     else:
                         axis.set_ylim(track.Ycord, track.ymax)
                 else:
                     if track.show_name:
                         if track.show_name == 'top':
                             axis.set_ylim(track.Ycord, track.ymax+2.5)
-                            track_name = axis.text(self.xmin + (self.xmax * 0.01), track.ymax + 1.5, track.name,  horizontalalignment='left', verticalalignment='bottom', fontproperties=track.name_font_feat,)
+                            entry['name'] = axis.text(self.xmin + (self.xmax * 0.01), track.ymax + 1.5, track.name,  horizontalalignment='left', verticalalignment='bottom', fontproperties=track.name_font_feat,)
                         elif track.show_name == 'bottom':
                             axis.set_ylim(track.Ycord-1, track.ymax + 1.5)
-                            track_name = axis.text(self.xmin + (self.xmax * 0.01), track.Ycord - 0., track.name,  horizontalalignment='left', verticalalignment='bottom', fontproperties=track.name_font_feat,)
+                            entry['name'] = axis.text(self.xmin + (self.xmax * 0.01), track.Ycord - 0., track.name,  horizontalalignment='left', verticalalignment='bottom', fontproperties=track.name_font_feat,)
                     else: 
                         axis.set_ylim(track.Ycord, track.ymax+1.5,)
                 '''set X lims'''
                 axis.set_xlim(self.xmin, self.xmax)
                 
                 '''handle last bottom axis '''
-                if (track_num+1 == len(self.tracks)) and ('force no axis' not in track.draw_axis):
-                    track.draw_axis.append('bottom')
+                draw_axis = list(track.draw_axis)# the track option is not changed by the drawing
+                if (track_num+1 == len(self.tracks)) and ('force no axis' not in draw_axis):
+                    draw_axis.append('bottom')
                 if not self.track_padding:
                     if (track_num+1 != len(self.tracks)):
-                        if 'bottom' in track.draw_axis:
-                            del track.draw_axis[track.draw_axis.index('bottom')]
-                        if 'top' in track.draw_axis:
-                            del track.draw_axis[track.draw_axis.index('top')]
+                        if 'bottom' in draw_axis:
+                            del draw_axis[draw_axis.index('bottom')]
+                        if 'top' in draw_axis:
+                            del draw_axis[draw_axis.index('top')]
                     axis.spines["top"].set_color('none')
 
                 '''handle axis and ticks'''
                 for spine in ["right", "left", "top", "bottom"]:
-                    if spine not in track.draw_axis:
+                    if spine not in draw_axis:
                         axis.spines[spine].set_color('none')# don't draw axis 
-                if ("right" not in track.draw_axis) and ("left" not in track.draw_axis):
+                    elif reused and ((spine != 'top') or self.track_padding):
+                        axis.spines[spine].set_color(matplotlib.rcParams['axes.edgecolor'])
+                if ("right" not in draw_axis) and ("left" not in draw_axis):
                     axis.yaxis.set_ticks([])# dont'show ticks and labels on y
-                if 'top' not in track.draw_axis:
+                if 'top' not in draw_axis:
                     axis.xaxis.set_ticks_position('bottom')# only show bottom ticks
-                if 'right' not in track.draw_axis:
+                elif reused:
+                    axis.xaxis.set_ticks_position('default')
+                if 'right' not in draw_axis:
                     axis.yaxis.set_ticks_position('left')# only show left ticks
                 
                 '''handle X ticks and labels '''
-                step=int(round(self.xmax/10.,1-len(str(int(self.xmax / 10.)))))
-                auto_X_major_ticks = range(self.xmin, self.xmax + 1, step)
-                step_min = step / 4.
-                tick = auto_X_major_ticks[0]
-                auto_X_minor_ticks =[]
-                while tick <= self.xmax:
-                    auto_X_minor_ticks.append(int(round(tick)))
-                    tick+= step_min
-
-                
-
                 '''use sequence as X ticks '''
                 if track.x_use_sequence:
                     if len(track.x_use_sequence) < self.xmax-self.xmin:
@@ -285,7 +483,7 @@ class Panel(object):
                         X_major_ticks_labels = track.xticklabels_major
                 else:
                     X_major_ticks = auto_X_major_ticks
-                if 'bottom' in track.draw_axis :
+                if 'bottom' in draw_axis :
                     axis.set_xticks(X_major_ticks)
                 else:
                     axis.set_xticks([])
@@ -315,7 +513,7 @@ class Panel(object):
                         X_minor_ticks_labels = track.xticklabels_minor
                 else:
                     X_minor_ticks = auto_X_minor_ticks
-                if 'bottom' in track.draw_axis :
+                if 'bottom' in draw_axis :
                     axis.set_xticks(X_minor_ticks, minor=True)
                 else:
                     axis.set_xticks([], minor=True)
@@ -351,7 +549,7 @@ class Panel(object):
                         Y_major_ticks_labels = track.yticklabels_major
                 else:
                     Y_major_ticks = None
-                if ('left' in track.draw_axis)  and track.yticks_major:
+                if ('left' in draw_axis)  and track.yticks_major:
                     axis.set_yticks(Y_major_ticks)
                 '''major ticks labels '''
                 if Y_major_ticks and track.show_yticklabels:
@@ -373,7 +571,7 @@ class Panel(object):
                         Y_minor_ticks_labels = track.yticklabels_minor
                 else:
                     Y_minor_ticks = None
-                if ('left' in track.draw_axis)  and track.yticks_minor:
+                if ('left' in draw_axis)  and track.yticks_minor:
                     axis.set_yticks(Y_minor_ticks, minor=True)
                 '''minor ticks labels '''
                 if Y_minor_ticks and track.show_yticklabels:
@@ -392,33 +590,36 @@ class Panel(object):
                        
                     
 
-                '''draw grid'''
-                if self.grid:
-                    if (self.grid == 'major') or (self.grid == 'both'):
-                        for X in auto_X_major_ticks:
-                            axis.axvline(X,ls=':',c='grey',alpha=0.66, zorder = -1)
-                    if (self.grid == 'minor') or (self.grid == 'both'):
-                        for X in auto_X_minor_ticks:
-                            axis.axvline(X,ls=':',c='grey',alpha=0.33, zorder = -1)
+                '''draw grid as a single collection spanning the axis height'''
+                if grid_segments:
+                    grid = LineCollection(grid_segments, colors = grid_colors,
+                                          linestyles = 'dotted', zorder = -1,
+                                          transform = axis.get_xaxis_transform())
+                    axis.add_collection(grid, autolim = False)
+                    entry['grid'] = grid
                 
                 
                 '''add feature patches to track axes '''
-                for feature in track.features:
+                for feature in track.drawn_features():
                     self.Drawn_objects.append(feature)
+                    if reused:# already there
+                        continue
                     for patch in feature.patches:
                         if isinstance(patch, matplotlib.lines.Line2D):
                             axis.add_line(patch)
                         elif isinstance(patch, matplotlib.patches.Patch):
                             axis.add_patch(patch)
+                        elif isinstance(patch, Collection):
+                            axis.add_collection(patch, autolim = False)
                         else:
                             axis.add_artist(patch)
-                        patch.set_transform(axis.transData)# IMPORTANT WORKAROUND!!! if not manually set, transform is not passed correctly in Line2D objects
+                        patch.set_transform(feature.offset_transform(axis.transData))# IMPORTANT WORKAROUND!!! if not manually set, transform is not passed correctly in Line2D objects
                                                 
                     for feat_name in feature.feat_name:
                         axis.add_artist(feat_name)
 
                 if track.draw_cb:
-                    cb_axis = matplotlib.pyplot.axes([axis_left_pad + axis_width + cbar_axis_space - cbar_right_pad ,axis_bottom_pad, cbar_extent, axis_height ],) 
+                    cb_axis = entry['cb_axis'] = self._new_axes([axis_left_pad + axis_width + cbar_axis_space - cbar_right_pad ,axis_bottom_pad, cbar_extent, axis_height ],) 
                     if (track.min_score == None) and (track.max_score == None):
                         for feat in track.features:
                             if feat.norm != None:
@@ -451,61 +652,14 @@ class Panel(object):
         '''
         if not getattr(self, 'Drawn_objects', None):
             self._draw_tracks()
-        trans = self.fig.get_transform() # transform should not be necessary if the plot was already plotted
-        dpi = self.fig.get_dpi()
-        # XXX: img_width unused ???
-        # img_width = self.fig.get_figwidth() * dpi
-        img_height = self.fig.get_figheight() * dpi
-        for obj in self.Drawn_objects:
-            xs_patches=[]
-            ys_patches=[]
-            for patch in obj.patches:
-                if isinstance(patch,list):
-                    for p in patch:
-                        bbox=p.get_window_extent(None)
-                        xs_patches.append(bbox.xmax)
-                        xs_patches.append(bbox.xmin)
-                        ys_patches.append(bbox.ymax)
-                        ys_patches.append(bbox.ymin)
-                else:
-                    try:
-                        bbox=patch.get_window_extent(None)
-                        xs_patches.append(bbox.xmax)
-                        xs_patches.append(bbox.xmin)
-                        ys_patches.append(bbox.ymax)
-                        ys_patches.append(bbox.ymin)
-                    except:
-                        xs_patches = ys_patches = False
-            if xs_patches and ys_patches:
-                xmin, ymin = trans.transform([min(xs_patches),min(ys_patches)])
-                xmax, ymax = trans.transform([max(xs_patches),max(ys_patches)])
-                left = xmin
-                top = img_height-ymin
-                right = xmax
-                bottom = img_height-ymax
-                yield dict(feature=obj, left=left, top=top, right=right, bottom=bottom, track=None, proceed = True)
-            else:
-                warnings.warn('could not find box coordinated for patch: '+str(patch) )
-                yield dict(feature=obj, left=left, top=top, right=right, bottom=bottom, track=None, proceed = False)
+        return feature_boxes(self.Drawn_objects, self.fig)
 
     def _create_html_map(self, map_name = 'biograpy-map', map_id = 'biograpy-map', target = '_self', **kwargs):
         """
         returns the corresponding html map from self.Drawn_objects in self.htmlmap
         target ---> set target="_blank" on area links if needed
         """
-        areas =[]
-        for box in self._boxes():
-            if box['proceed']:
-                obj = box['feature']
-                area_dict = dict(shape = 'rect', # shape: rect, circle, poly
-                                 coords = '%(left)i,%(top)i,%(right)i,%(bottom)i' % box,
-                                 href = obj.url or '#%s'%obj.name, #href
-                                 target = target,
-                                 script = obj.html_map_extend,
-                                 alt = obj.name )
-                area_html = '''<area shape="%(shape)s" coords="%(coords)s" href="%(href)s" target="%(target)s" alt="%(alt)s" %(script)s >''' % area_dict
-                areas.append(area_html)
-        self.htmlmap ='''<map name="%s" id="%s">\n %s \n</map>'''%(map_name, map_id, '\n'.join(areas))
+        self.htmlmap = html_map(self._boxes(), map_name = map_name, map_id = map_id, target = target)
         return
 
 
@@ -515,25 +669,56 @@ class Panel(object):
         
         input parameters are:
     
-        =========== ============================================================
-        Property    Description
-        =========== ============================================================
-        output      a string containing the file path or a file-like handler
-        format      a format must be specified if a file handler is passed 
-                    supported formats are: emf, eps, pdf, png, ps, raw, rgba, 
-                    svg, svgz 
-        html_target ``'_self'`` | ``'_blank'`` | ``'_parent'`` | ``'_top'`` 
-                    default is ``'_self'`` . The html target value for 
-                    generated hyperlinks. set to  ``'_blank'`` to open in a new
-                    browser windows
-        xmin        int minimum value of the X axes, use to plot just 
-                    a part of the drawing, default is ``None``
-        xmax        int maximum value of the X axes, use to plot just 
-                    a part of the drawing, default is ``None``
-        =========== ============================================================
+        ============= ==========================================================
+        Property      Description
+        ============= ==========================================================
+        output        a string containing the file path or a file-like handler
+        format        a format must be specified if a file handler is passed 
+                      supported formats are: emf, eps, pdf, png, ps, raw, rgba, 
+                      svg, svgz 
+        html_target   ``'_self'`` | ``'_blank'`` | ``'_parent'`` | ``'_top'`` 
+                      default is ``'_self'`` . The html target value for 
+                      generated hyperlinks. set to  ``'_blank'`` to open in a new
+                      browser windows
+        xmin          int minimum value of the X axes, use to plot just 
+                      a part of the drawing, default is ``None``
+        xmax          int maximum value of the X axes, use to plot just 
+                      a part of the drawing, default is ``None``
+        shared_glyphs ``True`` | ``False``. for svg and svgz output, define 
+                      repeated feature shapes and styles once and give every 
+                      feature patch an id, see :mod:`biograpy.svgglyphs`. 
+                      default is ``False``
+        backend       ``'matplotlib'`` | ``'svg'``. default is ``'matplotlib'``.
+                      ``'svg'`` writes svg and svgz output directly from the 
+                      feature geometry, much faster for annotation tracks, see
+                      :mod:`biograpy.svgrender`
+        strip_height  int, for png and tiff output draw the image in strips 
+                      of this number of pixels written one by one to the file,
+                      to save memory with very tall panels, see 
+                      :mod:`biograpy.striprender`. default is ``None``
+        workers       int or a :class:`multiprocessing.Pool`, for png and 
+                      tiff output draw the tracks in parallel in this number 
+                      of processes, or in the processes of the pool, see 
+                      :mod:`biograpy.parallelrender`. default is ``None``
+        ============= ==========================================================
 
 
         '''
+        backend = kwargs.pop('backend', 'matplotlib')
+        if backend == 'svg':
+            from biograpy import svgrender
+            svgrender.save(self, output, xmin = xmin, xmax = xmax, format = kwargs.get('format', None))
+            return
+        elif backend != 'matplotlib':
+            raise ValueError('Unknown backend: %s' % backend)
+        shared_glyphs = kwargs.pop('shared_glyphs', False)
+        strip_height = kwargs.pop('strip_height', None)
+        workers = kwargs.pop('workers', None)
+        if strip_height or workers:
+            from biograpy import striprender
+            striprender.output_format(output, kwargs.get('format', None))
+        if strip_height:
+            self.fig.set_figheight(self.fig_width)# tracks draw the figure to measure texts, keep it small
         self._draw_tracks(xmin = xmin, xmax = xmax)
         create_html_map = False
         if kwargs.get('format',None) in ('png', 'jpg', 'jpeg'):
@@ -544,13 +729,110 @@ class Panel(object):
         if create_html_map:
             self._create_html_map(target = html_target, **kwargs)# do it just for png file
         
-        matplotlib.pyplot.savefig(output, dpi=self.fig.get_dpi(), **kwargs)
+        self._check_cancelled()
+        if workers:
+            from biograpy import parallelrender
+            parallelrender.save(self, output, workers = workers, format = kwargs.get('format', None),
+                                xmin = xmin, xmax = xmax)
+        elif strip_height:
+            striprender.save(self, output, strip_height, format = kwargs.get('format', None))
+        elif shared_glyphs and self._is_svg(output, kwargs.get('format', None)):
+            self._save_shared_glyphs(output, **kwargs)
+        else:
+            self.fig.savefig(output, dpi=self.fig.get_dpi(), **kwargs)
+    
+    @staticmethod
+    def _is_svg(output, format):
+        if format is not None:
+            return format in ('svg', 'svgz')
+        return isinstance(output, basestring) and output.endswith(('.svg', '.svgz'))
+    
+    def _set_feature_ids(self):
+        '''the n-th drawn feature patches get the ``feature<n>`` svg id, 
+        followed by ``.<i>`` for the patches after the first one'''
+        for n, feature in enumerate(self.Drawn_objects):
+            for i, patch in enumerate(feature.patches):
+                if patch.get_gid() is None:
+                    if i:
+                        patch.set_gid('feature%i.%i' % (n, i))
+                    else:
+                        patch.set_gid('feature%i' % n)
+    
+    def _save_shared_glyphs(self, output, **kwargs):
+        import gzip
+        from cStringIO import StringIO
+        from biograpy.svgglyphs import share_glyphs
+        compress = kwargs.pop('format', None) == 'svgz' or \
+                   (isinstance(output, basestring) and output.endswith('.svgz'))
+        self._set_feature_ids()
+        svg = StringIO()
+        self.fig.savefig(svg, dpi=self.fig.get_dpi(), format = 'svg', **kwargs)
+        svg = share_glyphs(svg.getvalue())
+        if isinstance(output, basestring):
+            if compress:
+                fh = gzip.open(output, 'wb')
+            else:
+                fh = open(output, 'wb')
+            fh.write(svg)
+            fh.close()
+        elif compress:
+            fh = gzip.GzipFile(fileobj = output, mode = 'wb')
+            fh.write(svg)
+            fh.close()
+        else:
+            output.write(svg)
+        
+    def save_async(self, output, loop = None, executor = None, **kwargs):
+        '''
+        returns an asyncio future running :func:`save` in an executor, see
+        :func:`biograpy.asyncrender.save_async`. 
         
+        ``htmlmap = await panel.save_async('panel.png')``
+        
+        '''
+        from biograpy import asyncrender
+        return asyncrender.save_async(self, output, loop = loop, executor = executor, **kwargs)
+
+    def build_scene(self, xmin = None, xmax = None):
+        '''
+        returns the layout of the panel as a serializable
+        :class:`biograpy.scene.Scene`, see :func:`biograpy.scene.build_scene`.
+
+        ``htmlmap = panel.build_scene().render('panel.png')``
+
+        '''
+        from biograpy import scene
+        return scene.build_scene(self, xmin = xmin, xmax = xmax)
+
     
     def close(self):
         '''Close to free the panel. Use it before starting a new drawing in the \
-        same process. Typical usage scenario is a web server.'''
-        
-        matplotlib.pyplot.close()
+        same process. Typical usage scenario is a web server.
+        If the panel uses a `figure_pool` the figure is cleared and given back
+        to the pool, and the panel drops it as the next owner will draw on it.
+        With the `release_artists` option the artists are also
+        released, see :func:`release`. Closing a closed panel does nothing.'''
         
+        if self.closed or (self.fig is None):# released
+            return
+        self.closed = True
+        if self.figure_pool is not None:
+            self.figure_pool.release(self.fig)
+            self.figure_pool = None
+            self.fig = self.ax = None
+        else:
+            matplotlib.pyplot.close(self.fig)
+        if self.release_artists:
+            self.release()
 
+    def release(self):
+        '''drop the references to the artists of the closed panel, kept by 
+        the panel, the tracks and the features. the features and tracks can 
+        then be drawn in a new panel, and the html map is kept'''
+        for track in self.tracks:
+            track.release()
+        self.Drawn_objects = []
+        self.track_axes = []
+        self._track_cache = {}
+        self._layout_key = None
+        self.fig = self.ax = None
@@ -13,15 +13,136 @@ there's always a simpler solution you're not yet aware of...
 
 import operator
 import random
+import weakref
+from abc import ABCMeta
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.axes_grid.axislines import Subplot
 from matplotlib.font_manager import FontProperties
 import matplotlib.cm as cm
 from matplotlib.lines import Line2D
-from matplotlib.text import Text
+from matplotlib.text import Text, Annotation
+from matplotlib.transforms import Affine2D
 from matplotlib.patches import Rectangle,Circle, Wedge, Polygon,FancyBboxPatch, FancyArrow
 from matplotlib.colors import Normalize,LogNorm,ListedColormap,LinearSegmentedColormap
+from matplotlib.collections import PatchCollection, LineCollection, PolyCollection
+from xml.sax.saxutils import quoteattr
+from residues import segments, DSSP_CODES, TOPOLOGY_CODES
+
+CM_COLOR = object()# default facecolor, picked from the colormap at `cm_value`
+STYLE_OPTIONS = ('cm', 'color_by_cm', 'use_score_for_color', 'fc', 
+                 'ec', 'lw', 'ls', 'alpha', 'boxstyle',)
+
+
+def _style_key(value):
+    if isinstance(value, (basestring, int, long, float, bool, type(None))):
+        return (type(value), value)
+    if isinstance(value, tuple):
+        try:
+            hash(value)
+            return (tuple, value)
+        except TypeError:
+            pass
+    return (id, id(value))
+
+
+class FeatureStyle(object):
+    '''
+
+    The style options of a feature: `cm`, `color_by_cm`, 
+    `use_score_for_color`, `fc`, `ec`, `lw`, `ls`, `alpha` and `boxstyle`, 
+    as described in :class:`BaseGraphicFeature`. `cm_value` and `norm` are 
+    kept by each feature, as tracks set them while drawing.
+    
+    Styles are shared and must not be changed: :func:`get` returns the 
+    existing style for the same options, so all the features of a track 
+    created with the same options keep a single style. Setting a style option
+    on a feature gives the feature another style, except for `fc` and `ec` 
+    that can be set per feature, as tracks do when coloring by colormap.
+    A style can be given to features with the `feature_style` keyword::
+    
+        style = FeatureStyle.get(cm = 'Blues', lw = 1, ...)
+        track.extend([features.CompactSimple(start, end, feature_style = style) for start, end in positions])
+    
+    '''
+    __slots__ = STYLE_OPTIONS + ('_options', '__weakref__',)
+    _styles = weakref.WeakValueDictionary()
+    
+    def __init__(self, **kwargs):
+        for option in STYLE_OPTIONS:
+            setattr(self, option, kwargs[option])
+    
+    @classmethod
+    def get(cls, **kwargs):
+        '''returns the shared style with the given options, all of 
+        ``STYLE_OPTIONS`` must be given. `cm` can be a colormap name, `fc` 
+        can be ``CM_COLOR``'''
+        key = tuple([_style_key(kwargs[option]) for option in STYLE_OPTIONS])
+        style = cls._styles.get(key)
+        if style is None:
+            options = dict(kwargs)
+            kwargs['cm'] = cm.get_cmap(kwargs['cm'])
+            if kwargs['fc'] is CM_COLOR:
+                kwargs['fc'] = kwargs['cm'](0)
+            style = cls(**kwargs)
+            style._options = options
+            cls._styles[key] = style
+        return style
+    
+    def replace(self, **kwargs):
+        '''returns the shared style with the options of this style changed 
+        as in `kwargs`'''
+        options = dict(self._options)
+        options.update(kwargs)
+        return self.get(**options)
+    
+    def __reduce__(self):
+        options = dict(self._options)
+        cm_color = options['fc'] is CM_COLOR
+        if cm_color:
+            options['fc'] = None
+        return (_load_style, (options, cm_color))
+
+
+def _load_style(options, cm_color):
+    if cm_color:
+        options['fc'] = CM_COLOR
+    return FeatureStyle.get(**options)
+
+
+def _style_property(option):
+    '''a feature style option, setting it changes the feature style'''
+    def fget(feature):
+        return getattr(feature.feature_style, option)
+    def fset(feature, value):
+        feature.feature_style = feature.feature_style.replace(**{option : value})
+    return property(fget, fset)
+
+
+def _own_style_property(option):
+    '''a feature style option that can be set per feature'''
+    slot = '_' + option
+    def fget(feature):
+        try:
+            return getattr(feature, slot)
+        except AttributeError:
+            return getattr(feature.feature_style, option)
+    def fset(feature, value):
+        setattr(feature, slot, value)
+    return property(fget, fset)
+
+
+def _lazy_property(slot, factory):
+    '''an attribute created on first use'''
+    def fget(feature):
+        try:
+            return getattr(feature, slot)
+        except AttributeError:
+            setattr(feature, slot, factory())
+            return getattr(feature, slot)
+    def fset(feature, value):
+        setattr(feature, slot, value)
+    return property(fget, fset)
 
 
 class BaseGraphicFeature(object):
@@ -90,6 +211,8 @@ class BaseGraphicFeature(object):
         html_map_extend       included text will be added in html area tab, 
                               use to add onmouseover events, etc... 
                               must be a valid html attrib.
+        feature_style         a :class:`FeatureStyle` to use instead of the 
+                              style options above
         ===================== ==================================================
 
 .. _www.scipy.org: http://www.scipy.org/Cookbook/Matplotlib/Show_colormaps
@@ -100,6 +223,10 @@ class BaseGraphicFeature(object):
             '''
     
     default_cm='winter'#deafult matplotlib colormap to use
+    __slots__ = ('name', 'type', 'score', 'height', 'url', 'html_map_extend', 
+                 'Y', 'feature_style', '_fc', '_ec', '_patches', '_feat_name', 
+                 'offset', '_render_key', '_base_positions', '_measures',
+                 'cm_value', 'norm',)
     
     def __init__(self, **kwargs):
         '''
@@ -112,23 +239,125 @@ class BaseGraphicFeature(object):
         # html map options
         self.url =  kwargs.get('url','')
         self.html_map_extend = kwargs.get('html_map_extend','') 
-        #feature style options
-        self.cm = cm.get_cmap(kwargs.get('cm', self.default_cm))
-        self.color_by_cm = kwargs.get('color_by_cm',True)
+        #feature style options, shared by the features with the same options
+        self.feature_style = kwargs.get('feature_style', None)
+        if self.feature_style is None:
+            use_score_for_color = kwargs.get('use_score_for_color',False)
+            color_by_cm = kwargs.get('color_by_cm',True)
+            if use_score_for_color:
+                color_by_cm = True
+            self.feature_style = FeatureStyle.get(cm = kwargs.get('cm', self.default_cm),
+                                          color_by_cm = color_by_cm,
+                                          use_score_for_color = use_score_for_color,
+                                          fc = kwargs.get('fc', CM_COLOR),
+                                          ec = kwargs.get('ec', None),
+                                          lw = kwargs.get('lw',0.5),
+                                          ls = kwargs.get('ls','-'),
+                                          alpha = kwargs.get('alpha',.8),
+                                          boxstyle = kwargs.get('boxstyle','square, pad=0.'),)
+        #per feature color options, set by the tracks while drawing
         self.cm_value = kwargs.get('cm_value',None)
-        self.use_score_for_color=kwargs.get('use_score_for_color',False)
-        if self.use_score_for_color:
-            self.color_by_cm = True
-        self.fc = kwargs.get('fc', self.cm(self.cm_value or 0))
-        self.ec = kwargs.get('ec', None)
-        self.lw = kwargs.get('lw',0.5)
-        self.ls = kwargs.get('ls','-')
-        self.alpha=kwargs.get('alpha',.8)
-        self.boxstyle=kwargs.get('boxstyle','square, pad=0.')
-        self.Y=0.0
-        self.patches = [] # all the patches must be returned inside this list
-        self.feat_name= [] # all the patches labels must be returned inside this list
         self.norm = kwargs.get('norm', None)
+        if (self.cm_value is not None) and (self.feature_style._options['fc'] is CM_COLOR):
+            self.fc = self.cm(self.cm_value)
+        self.Y=0.0
+        self.offset = 0. # Y offset set by the track layout
+        self._render_key = None
+        self._base_positions = ()
+    
+    cm = _style_property('cm')
+    color_by_cm = _style_property('color_by_cm')
+    use_score_for_color = _style_property('use_score_for_color')
+    lw = _style_property('lw')
+    ls = _style_property('ls')
+    alpha = _style_property('alpha')
+    boxstyle = _style_property('boxstyle')
+    fc = _own_style_property('fc')
+    ec = _own_style_property('ec')
+    patches = _lazy_property('_patches', list) # all the patches must be returned inside this list
+    feat_name = _lazy_property('_feat_name', list) # all the patches labels must be returned inside this list
+    measures = _lazy_property('_measures', dict) # layout measures of the current artists, kept by the tracks
+    
+    def __getstate__(self):
+        state = dict(getattr(self, '__dict__', {}))
+        for klass in type(self).__mro__:
+            for slot in klass.__dict__.get('__slots__', ()):
+                if hasattr(self, slot):
+                    state[slot] = getattr(self, slot)
+        return state
+    
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+        
+    def render(self, context = None, labels = True, **kwargs):
+        '''
+        build the feature artists calling :func:`draw_feature` and 
+        :func:`draw_feat_name`, `kwargs` are passed to the latter. 
+        the name is not drawn if `labels` is ``False``, see :func:`set_label`.
+        artists are built only once for a given drawing `context` and feature
+        colors, further calls keep the existing artists. 
+        returns ``True`` if the artists were built.
+        '''
+        key = (context, repr(self.fc), repr(self.ec), labels)
+        if self.patches and (key == getattr(self, '_render_key', None)):
+            return False
+        self.patches = []
+        self.feat_name = []
+        self.draw_feature()
+        if labels:
+            self.draw_feat_name(**kwargs)
+        self._render_key = key
+        self.measures = {}
+        self.offset = 0.
+        self._store_name_positions()
+        return True
+    
+    def _store_name_positions(self):
+        self._base_positions = [(text, text.get_position(), text.xytext) 
+                                for text in self.feat_name 
+                                if isinstance(text, Annotation)]
+    
+    def set_label(self, text, **kwargs):
+        '''
+        draw `text` as the feature name, or no name if `text` is empty, 
+        after the feature artists are built by :func:`render`. `kwargs` are 
+        passed to :func:`draw_feat_name`. the name is drawn again only if 
+        `text` changed
+        '''
+        if self.measures.get('label', None) == text:
+            return
+        self.measures['label'] = text
+        if text:
+            self.draw_feat_name(text = text, **kwargs)
+        else:
+            self.feat_name = []
+        self._store_name_positions()
+        self.set_offset(self.offset)
+    
+    def reset(self):
+        '''drop the artists, they will be built again by :func:`render`'''
+        self.patches = []
+        self.feat_name = []
+        self._render_key = None
+        self._base_positions = ()
+        self.measures = {}
+        self.offset = 0.
+    
+    def set_offset(self, offset):
+        '''set the Y offset of the feature in the track. name annotations are 
+        moved from their original position, patches are moved by 
+        :func:`offset_transform`'''
+        self.offset = offset
+        for text, (x, y), (text_x, text_y) in self._base_positions:
+            text.set_y(y + offset)
+            text.xytext = (text_x, text_y + offset)
+    
+    def offset_transform(self, transform):
+        '''returns `transform` preceded by the feature Y offset'''
+        if not self.offset:
+            return transform
+        return Affine2D().translate(0, self.offset) + transform
         
 
     def draw_feat_name(self,**kwargs):
@@ -145,6 +374,7 @@ class BaseGraphicFeature(object):
         va                    as in matplotlib, default is `'top'`
         ha                    as in matplotlib, default is `'left'`  
         xoffset               to be used to move the text annotation along x axis
+        text                  the text to draw, default is the feature `name`
         ===================== ==================================================
 
         '''
@@ -162,19 +392,12 @@ class BaseGraphicFeature(object):
         text_x = self.start
         if (self.start < xoffset) and (xoffset <= self.end):
             text_x+= xoffset
-        self.feat_name = [plt.annotate(self.name, xy = (text_x, self.Y), xytext = (text_x, self.Y - self.height/5.), fontproperties=font_feat, horizontalalignment=ha, verticalalignment=va)]
+        self.feat_name = [plt.annotate(kwargs.get('text', self.name), xy = (text_x, self.Y), xytext = (text_x, self.Y - self.height/5.), fontproperties=font_feat, horizontalalignment=ha, verticalalignment=va)]
 
         
-class Simple(BaseGraphicFeature):
-    '''
-    Handle a feature not derived from a SeqFeature. 
-    Just need a `start` and `end` position.
-    Minimum definition are start and end positions.
-    Usage eg.
-    
-    ``features.Simple(start,end,name='factor 7',**kwargs)``
-
-    '''
+class _Simple(BaseGraphicFeature):
+    '''Implementation shared by :class:`Simple` and :class:`CompactSimple`'''
+    __slots__ = ('start', 'end',)
     def __init__(self,start,end,**kwargs):
     
         BaseGraphicFeature.__init__(self, **kwargs)
@@ -195,24 +418,22 @@ class Simple(BaseGraphicFeature):
         self.patches.append(feat_draw)
 
 
-class GenericSeqFeature(BaseGraphicFeature):
+class Simple(_Simple):
     '''
-
-    Handle a feature  derived from a `Biopython.SeqFeature.SeqFeature` as a \
-    simple rectangle.
-    
-    Requires a `SeqFeature` object in input, `start` and `end` will be \
-    automatically detected from seqfeature.
-    
+    Handle a feature not derived from a SeqFeature. 
+    Just need a `start` and `end` position.
+    Minimum definition are start and end positions.
     Usage eg.
-
-    ::
-    
-        from Bio.SeqFeature import SeqFeature, FeatureLocation 
-        feat = SeqFeature (FeatureLocation(10,124))
-        features.GenericSeqFeature(feat,name='factor 7', score=0.2, **kwargs)
     
+    ``features.Simple(start,end,name='factor 7',**kwargs)``
+
     '''
+    __metaclass__ = ABCMeta
+
+
+class _GenericSeqFeature(BaseGraphicFeature):
+    '''Implementation shared by :class:`GenericSeqFeature` and :class:`CompactGenericSeqFeature`'''
+    __slots__ = ('start', 'end',)
     def __init__(self,feature,**kwargs):
         '''
 
@@ -232,37 +453,42 @@ class GenericSeqFeature(BaseGraphicFeature):
         self.patches.append(feat_draw)
 
 
-class GeneSeqFeature(BaseGraphicFeature):
+class GenericSeqFeature(_GenericSeqFeature):
     '''
+
+    Handle a feature  derived from a `Biopython.SeqFeature.SeqFeature` as a \
+    simple rectangle.
     
-    Draws a Gene Feature as an arrow.
-    Requires a SeqFeature with ``SeqFeature.type = 'gene'`` and optionally a 
-    list of exons SeqFeatures that can be drawn over the gene patch.
-    
-    Additional valid attributes:
-        ===================== ==================================================
-        Key                   Description
-        ===================== ==================================================
-        head_length           defines matplotlib  FancyArrow head_length keyword
-                              argument to set up gene arrow head length
-        ===================== ==================================================
+    Requires a `SeqFeature` object in input, `start` and `end` will be \
+    automatically detected from seqfeature.
     
     Usage eg.
-    
+
     ::
     
         from Bio.SeqFeature import SeqFeature, FeatureLocation 
-        genefeat = SeqFeature (FeatureLocation(103,1053), type = 'gene', strand=1,)
-        features.GeneSeqFeature(genefeat,name='factor 7', **kwargs)
-    
+        feat = SeqFeature (FeatureLocation(10,124))
+        features.GenericSeqFeature(feat,name='factor 7', score=0.2, **kwargs)
     
     '''
+    __metaclass__ = ABCMeta
+
+
+class _GeneSeqFeature(BaseGraphicFeature):
+    '''Implementation shared by :class:`GeneSeqFeature` and :class:`CompactGeneSeqFeature`'''
+    __slots__ = ('start', 'end', 'strand', 'head_length', 'feature', 'exons',)
     def __init__(self,feature,exons=[],**kwargs):
 
         BaseGraphicFeature.__init__(self,**kwargs)
         self.height=kwargs.get('height',2.)
-        self.start=kwargs.get('start',min([feature.location.start.position,feature.location.end.position]))
-        self.end=kwargs.get('end',max([feature.location.start.position,feature.location.end.position]))
+        if feature is not None:
+            self.start=kwargs.get('start',min([feature.location.start.position,feature.location.end.position]))
+            self.end=kwargs.get('end',max([feature.location.start.position,feature.location.end.position]))
+            self.strand=kwargs.get('strand',feature.strand)
+        else:
+            self.start=kwargs['start']
+            self.end=kwargs['end']
+            self.strand=kwargs['strand']
         default_head_length = 10
         if abs(self.end -  self.start<= 50):
             default_head_length = (self.end-self.start)/10.
@@ -274,13 +500,13 @@ class GeneSeqFeature(BaseGraphicFeature):
 
     def draw_feature(self):
         self.patches=[]
-        if self.feature.strand==1:
+        if self.strand==1:
             arrow_start=self.start
             arrow_direction=self.end-self.start
             shape='right'
             body_width=self.height*.6667
             head_width=self.height
-        elif self.feature.strand==-1:
+        elif self.strand==-1:
             arrow_start=self.end
             arrow_direction=self.start-self.end
             shape='left'
@@ -294,13 +520,53 @@ class GeneSeqFeature(BaseGraphicFeature):
             shape=shape, head_starts_at_zero=False)
         self.patches.append(feat_draw)
         for exon in self.exons:
-            feat_draw=FancyBboxPatch((int(exon.location.start.position),self.Y),
-                width=(int(exon.location.end.position)-int(exon.location.start.position)),
+            if isinstance(exon, tuple):
+                exon_start, exon_end = exon
+            else:
+                exon_start, exon_end = int(exon.location.start.position), int(exon.location.end.position)
+            feat_draw=FancyBboxPatch((exon_start,self.Y),
+                width=(exon_end-exon_start),
                 height=body_width/2., boxstyle=self.boxstyle,lw=0, ec=self.ec,
                 fc=self.fc,alpha=self.alpha+0.1, url = self.url,)
             self.patches.append(feat_draw)
 
 
+class GeneSeqFeature(_GeneSeqFeature):
+    '''
+    
+    Draws a Gene Feature as an arrow.
+    Requires a SeqFeature with ``SeqFeature.type = 'gene'`` and optionally a 
+    list of exons SeqFeatures that can be drawn over the gene patch.
+    
+    Additional valid attributes:
+        ===================== ==================================================
+        Key                   Description
+        ===================== ==================================================
+        head_length           defines matplotlib  FancyArrow head_length keyword
+                              argument to set up gene arrow head length
+        start                 gene start, default is taken from the SeqFeature
+        end                   gene end, default is taken from the SeqFeature
+        strand                ``1`` | ``-1``, default is taken from the 
+                              SeqFeature
+        ===================== ==================================================
+    
+    If `start`, `end` and `strand` are given the SeqFeature can be ``None``.
+    `exons` can be SeqFeatures or ``(start, end)`` tuples.
+
+    Usage eg.
+    
+    ::
+    
+        from Bio.SeqFeature import SeqFeature, FeatureLocation 
+        genefeat = SeqFeature (FeatureLocation(103,1053), type = 'gene', strand=1,)
+        features.GeneSeqFeature(genefeat,name='factor 7', **kwargs)
+        features.GeneSeqFeature(None, start = 103, end = 1053, strand = 1, name='factor 7')
+    
+    
+    '''
+    __metaclass__ = ABCMeta
+
+
 class TextSequence(BaseGraphicFeature):
     '''
     
@@ -429,6 +695,29 @@ class PlotFeature(BaseGraphicFeature):
             
         
 
+def _bin_bars(left, right, low, high, values, pixel):
+    '''
+    merges the bars, sorted by `left`, falling in the same `pixel` wide bin. 
+    a bin spans all of its bars, from the lowest `low` to the highest `high`,
+    with the mean of their `values`
+    '''
+    bins = np.floor((left - left[0]) / pixel).astype(int)
+    first = np.flatnonzero(np.concatenate(([True], bins[1:] != bins[:-1])))
+    counts = np.diff(np.append(first, len(left)))
+    return (np.minimum.reduceat(left, first), np.maximum.reduceat(right, first), 
+            np.minimum.reduceat(low, first), np.maximum.reduceat(high, first), 
+            np.add.reduceat(values, first) / counts)
+
+def _errors(err, n):
+    '''``(lower, upper)`` error arrays of `n` values, from a scalar, one 
+    value for each bar or a pair of lower and upper sequences'''
+    err = np.asarray(err, dtype = float)
+    if err.ndim == 2:
+        return err[0], err[1]
+    err = err * np.ones(n)
+    return err, err
+
+
 class BarPlotFeature(BaseGraphicFeature):
     '''
     
@@ -449,6 +738,11 @@ class BarPlotFeature(BaseGraphicFeature):
     ``color_by_cm = True`` will color each point based on the y values using
     the supplied colormap ``cm``.
     
+    Bars are drawn as a single collection. When more bars than pixels fall
+    in the window drawn by a :class:`~biograpy.tracks.PlotTrack`, the bars 
+    of each pixel are merged in one bar spanning their values, colored by 
+    their mean value. Bars with error bars are never merged.
+    
     Additional valid attributes:
         ===================== ==================================================
         Key                   Description
@@ -480,6 +774,7 @@ class BarPlotFeature(BaseGraphicFeature):
     '''
     def __init__(self,  y , x = [], style = '-' , **kwargs):
 
+        kwargs.setdefault('ls', 'solid')#['solid' | 'dashed' | 'dashdot' | 'dotted']
         BaseGraphicFeature.__init__(self,**kwargs)
         self.feat_type = 'plot' #to be checked in plot track
         self.label = kwargs.get('label', '')
@@ -490,7 +785,6 @@ class BarPlotFeature(BaseGraphicFeature):
         self.yerr = kwargs.get('yerr', None)
         self.ecolor = kwargs.get('ecolor', 'k')
         self.capsize = kwargs.get('capsize', 1)
-        self.ls = kwargs.get('ls', 'solid')#['solid' | 'dashed' | 'dashdot' | 'dotted']
         if  not isinstance(y[0], (int,float)):
             raise ValueError('PlotFeature objects only accepts int or float data')
         self.x = x
@@ -501,37 +795,177 @@ class BarPlotFeature(BaseGraphicFeature):
         self.start = min(self.x)
         self.end = max(self.x)
 
-            
+        self.view_xmin = None
+        self.view_xmax = None
+        self.view_bins = None
+
+    def set_view(self, xmin = None, xmax = None, pixels = None):
+        '''set the X window and the number of pixels available to draw it.
+        called by :class:`~biograpy.tracks.PlotTrack` before drawing'''
+        self.view_xmin = xmin
+        self.view_xmax = xmax
+        self.view_bins = pixels
+
+    def _bars(self):
+        '''``(left, right, low, high, values)`` arrays of the bars to draw, 
+        merged in pixel wide bins if they are more than the pixels'''
+        values = np.asarray(self.y, dtype = float)
+        left = np.asarray(self.x, dtype = float)
+        if self.align == 'center':
+            left = left - self.width / 2.
+        right = left + self.width
+        bottom = self.bottom * np.ones(len(values))
+        low = np.minimum(bottom, bottom + values)
+        high = np.maximum(bottom, bottom + values)
+        if (not self.view_bins) or (self.xerr is not None) or (self.yerr is not None):
+            return left, right, low, high, values
+        xmin = self.view_xmin if self.view_xmin is not None else left.min()
+        xmax = self.view_xmax if self.view_xmax is not None else right.max()
+        pixel = float(xmax - xmin) / self.view_bins
+        if (pixel <= 0) or (len(values) * pixel <= right.max() - left.min()):
+            return left, right, low, high, values
+        order = np.argsort(left, kind = 'mergesort')
+        return _bin_bars(left[order], right[order], low[order], high[order], values[order], pixel)
+
     def draw_feature(self):
         if self.y:
-            bars = plt.bar(self.x,
-                           self.y,
-                           width = self.width,
-                           bottom = self.bottom, 
-                           label = self.label,
-                           lw = self.lw,
-                           ls =self.ls,
-                           fc = self.fc,
-                           ec = self.ec,
-                           alpha = self.alpha,
-                           xerr = self.xerr,
-                           yerr = self.yerr,
-                           ecolor = self.ecolor,
-                           capsize = self.capsize,
-                           align = self.align,
-                           url = self.url,
-                           )
-                        
-            if self.color_by_cm:
+            left, right, low, high, values = self._bars()
+            if self.color_by_cm:# one colormap lookup for all the bars
                 self.norm = Normalize(min(self.y), max(self.y))
-                for bar, value in zip(bars, self.y):
-                    color = self.cm(self.norm(value))
-                    bar.set_color(color)
-                    
-            self.patches.extend(bars)
-            
-        
-        
+                rgba = self.cm(self.norm(values))
+                color_kwargs = dict(facecolors = rgba, edgecolors = rgba)
+            else:
+                color_kwargs = dict(facecolors = self.fc, edgecolors = self.ec)
+            verts = np.dstack((np.column_stack((left, left, right, right)), 
+                               np.column_stack((low, high, high, low))))
+            bars = PolyCollection(verts,
+                                  label = self.label,
+                                  linewidths = self.lw,
+                                  linestyles = self.ls,
+                                  alpha = self.alpha,
+                                  url = self.url,
+                                  **color_kwargs
+                                  )
+            self.patches.append(bars)
+            if (self.xerr is not None) or (self.yerr is not None):
+                self._draw_errors((left + right) / 2., np.where(values < 0, low, high))
+
+    def _draw_errors(self, x, y):
+        '''draws the error bars centered on the bar tops as one collection, 
+        with a line of markers for the caps'''
+        segments = []
+        caps = []
+        if self.yerr is not None:
+            lower, upper = _errors(self.yerr, len(x))
+            segments.append(np.dstack((np.column_stack((x, x)), np.column_stack((y - lower, y + upper)))))
+            caps.append((np.concatenate((x, x)), np.concatenate((y - lower, y + upper)), '_'))
+        if self.xerr is not None:
+            lower, upper = _errors(self.xerr, len(x))
+            segments.append(np.dstack((np.column_stack((x - lower, x + upper)), np.column_stack((y, y)))))
+            caps.append((np.concatenate((x - lower, x + upper)), np.concatenate((y, y)), '|'))
+        self.patches.append(LineCollection(np.concatenate(segments), colors = self.ecolor, 
+                                           linewidths = self.lw, alpha = self.alpha, url = self.url))
+        if self.capsize:
+            for cap_x, cap_y, marker in caps:
+                self.patches.append(Line2D(cap_x, cap_y, ls = 'None', marker = marker, 
+                                           markersize = 2 * self.capsize, color = self.ecolor, 
+                                           alpha = self.alpha, url = self.url))
+
+
+class SignalFeature(BaseGraphicFeature):
+    '''
+
+    Draws a per-position signal (coverage, conservation, ...) read from a
+    data source such as :class:`~biograpy.signaldata.MemmapSignal`.
+    Must be used within a :class:`~biograpy.tracks.PlotTrack`.
+
+    Only the values falling in the X window drawn by the
+    :class:`~biograpy.drawer.Panel` are read, and they are reduced to one
+    value per pixel before plotting, so signals spanning hundreds of millions
+    of positions can be drawn.
+
+    Requires a data source object or a file path. If a file path is given a
+    :class:`~biograpy.signaldata.MemmapSignal` is created using the `dtype`,
+    `offset` and `start` keyword arguments, unless the file is a zoom file
+    built with :func:`~biograpy.signaldata.build_zoom_file`: in this case a
+    :class:`~biograpy.signaldata.ZoomSignal` is used.
+
+    Additional valid attributes:
+        ===================== ==================================================
+        Key                   Description
+        ===================== ==================================================
+        dtype                 as in :class:`~biograpy.signaldata.MemmapSignal`
+                              default is ``'float32'``
+        offset                as in :class:`~biograpy.signaldata.MemmapSignal`
+                              default is ``0``
+        start                 as in :class:`~biograpy.signaldata.MemmapSignal`
+                              default is ``1``
+        style                 line plotting style as in matplotlib. default is
+                              ``'-'``
+        envelope              ``True`` | ``False``. if ``True`` draws the
+                              min-max range of the values reduced in each pixel
+                              under the mean line. default is ``True``
+        label                 set label to be used in `PlotTrack` legend.
+        ===================== ==================================================
+
+    Usage eg.
+
+    ::
+
+        feat = features.SignalFeature('chr1.coverage.f32', label = 'coverage')
+
+    '''
+    def __init__(self, source, style = '-', **kwargs):
+
+        BaseGraphicFeature.__init__(self,**kwargs)
+        self.feat_type = 'plot' #to be checked in plot track
+        self.label = kwargs.get('label', '')
+        self.envelope = kwargs.get('envelope', True)
+        if isinstance(source, basestring):
+            from biograpy.signaldata import open_signal
+            source = open_signal(source,
+                                 dtype = kwargs.get('dtype', 'float32'),
+                                 offset = kwargs.get('offset', 0),
+                                 start = kwargs.get('start', 1))
+        self.source = source
+        self.style = style
+        self.start = source.start
+        self.end = source.end
+        self.view_xmin = None
+        self.view_xmax = None
+        self.view_bins = None
+
+    def set_view(self, xmin = None, xmax = None, pixels = None):
+        '''set the X window and the number of pixels available to draw it.
+        called by :class:`~biograpy.tracks.PlotTrack` before drawing'''
+        self.view_xmin = xmin
+        self.view_xmax = xmax
+        self.view_bins = pixels
+
+    def draw_feature(self):
+        x, ymin, ymax, ymean = self.source.fetch(self.view_xmin, self.view_xmax, self.view_bins)
+        if not len(x):
+            return
+        plotted_data = plt.plot(x,
+                                ymean,
+                                self.style,
+                                label = self.label,
+                                lw = self.lw,
+                                ls =self.ls,
+                                alpha = self.alpha,
+                                url = self.url,)
+        self.patches.extend(plotted_data)
+        if self.envelope and (ymin != ymax).any():
+            envelope = plt.fill_between(x,
+                                        ymin,
+                                        ymax,
+                                        lw = 0,
+                                        facecolor = plotted_data[0].get_color(),
+                                        alpha = self.alpha/3.,
+                                        url = self.url,)
+            self.patches.append(envelope)
+
+
 
 
 class SegmentedSeqFeature(BaseGraphicFeature):
@@ -597,6 +1031,142 @@ class SegmentedSeqFeature(BaseGraphicFeature):
             self.patches.append(feat_draw)
 
 
+class SegmentedFeature(BaseGraphicFeature):
+    '''
+    
+    Draws a feature made of several segments joined by connectors, as 
+    :class:`~biograpy.features.SegmentedSeqFeature` does, without requiring a
+    SeqFeature object.
+    
+    Requires `start`, `end` and a list of ``(start, end)`` `segments`.
+    
+    Additional valid attributes:
+        ===================== ==================================================
+        Key                   Description
+        ===================== ==================================================
+        strand                ``1`` | ``-1`` | ``None``. default is ``None``
+        ec                    default is set to ``'k'``
+        ===================== ==================================================
+    
+    Usage eg.
+    
+    ::
+    
+        feat = SegmentedFeature(100, 900, [(100, 200), (400, 500), (800, 900)], 
+                                name='transcript 1')
+    '''
+
+    def __init__(self, start, end, segments, **kwargs):
+        BaseGraphicFeature.__init__(self,**kwargs)
+        self.start = start
+        self.end = end
+        self.segments = sorted(segments)
+        self.strand = kwargs.get('strand', None)
+        self.ec=kwargs.get('ec','k')
+
+
+    def draw_feature(self):
+        if not self.segments:
+            feat_draw=FancyBboxPatch((self.start,self.Y), width=(self.end-self.start), height=self.height, boxstyle=self.boxstyle, lw=self.lw, ec=self.ec, fc=self.fc,alpha=self.alpha, url = self.url,)
+            self.patches.append(feat_draw)
+            return
+        junction_start=False
+        for segment_start, segment_end in self.segments:
+            feat_draw=FancyBboxPatch((segment_start,self.Y), width=(segment_end-segment_start), height=self.height, boxstyle=self.boxstyle,lw=self.lw, ec=self.ec, fc=self.fc, alpha=self.alpha, url = self.url,)
+            self.patches.append(feat_draw)
+            if junction_start:
+                junction_end=float(segment_start)
+                junction_middle=float((junction_start+junction_end)/2.)
+                Yends=self.Y+self.height/2.
+                Ymiddle=self.Y+self.height
+                join=plt.plot([junction_start,junction_middle,junction_end],[Yends,Ymiddle,Yends], lw=1 ,ls='-', c=self.ec, alpha=0.5, url = self.url,)
+                self.patches.extend(join)
+            junction_start=float(segment_end)
+
+
+class OverflowFeature(BaseGraphicFeature):
+    '''
+
+    Summary of the features hidden by the `max_rows` option of a
+    :class:`~biograpy.tracks.BaseTrack`, drawn by the track in its last row.
+
+    The X range from `xmin` to `xmax` is split in `bins`, one per pixel when
+    drawn by a :class:`~biograpy.drawer.Panel`, and the number of hidden
+    features covering each bin is drawn as a step profile, as high as the
+    feature `height` where the most features are hidden.
+    The html map area of the feature lists the names of the hidden features
+    in its ``title`` attribute.
+
+    Additional valid attributes:
+        ===================== ==================================================
+        Key                   Description
+        ===================== ==================================================
+        xmin                  lower extent of the summary, default is the
+                              lowest start of the hidden features
+        xmax                  higher extent of the summary, default is the
+                              highest end of the hidden features
+        bins                  number of bins, default is ``500``
+        name                  default is ``'<n> more features'``
+        fc                    default is ``'grey'``
+        ===================== ==================================================
+
+    Usage eg.
+
+    ::
+
+        feat = OverflowFeature(track.hidden_features, xmin = 1, xmax = 10000,
+                               bins = 800)
+    '''
+
+    def __init__(self, hidden, xmin = None, xmax = None, bins = 500, **kwargs):
+        kwargs.setdefault('name', '%i more features' % len(hidden))
+        kwargs.setdefault('fc', 'grey')
+        kwargs.setdefault('ec', 'none')
+        kwargs.setdefault('color_by_cm', False)
+        names = [feat.name for feat in hidden if feat.name]
+        kwargs.setdefault('html_map_extend', 'title=%s' % quoteattr(', '.join(names)))
+        BaseGraphicFeature.__init__(self,**kwargs)
+        self.hidden = list(hidden)
+        starts = np.asarray([feat.start for feat in self.hidden], dtype = float)
+        ends = np.asarray([feat.end for feat in self.hidden], dtype = float)
+        if xmin is None:
+            xmin = starts.min()
+        if xmax is None:
+            xmax = ends.max()
+        self.start = xmin
+        self.end = xmax
+        self.bins = max(int(bins or 500), 1)
+        self.counts = self._count(starts, ends)
+
+    def _count(self, starts, ends):
+        '''number of features covering each bin, from the bins where they
+        start and end'''
+        width = float(self.end - self.start) / self.bins or 1.
+        shown = (ends >= self.start) & (starts <= self.end)
+        first = np.clip(((starts[shown] - self.start) / width).astype(int), 0, self.bins - 1)
+        last = np.clip(((ends[shown] - self.start) / width).astype(int), 0, self.bins - 1)
+        changes = np.bincount(first, minlength = self.bins + 1)[:self.bins + 1] - \
+                  np.bincount(last + 1, minlength = self.bins + 1)[:self.bins + 1]
+        return np.cumsum(changes)[:self.bins]
+
+    def draw_feature(self):
+        counts = self.counts
+        top = counts.max() if len(counts) else 0
+        heights = counts * (float(self.height) / (top or 1))
+        '''one step for each run of bins with the same count'''
+        width = float(self.end - self.start) / self.bins
+        steps = np.flatnonzero(np.diff(counts)) + 1
+        lefts = self.start + np.concatenate(([0], steps)) * width
+        rights = self.start + np.concatenate((steps, [self.bins])) * width
+        levels = self.Y + heights[np.concatenate(([0], steps))]
+        xs = np.column_stack((lefts, rights)).ravel()
+        ys = np.column_stack((levels, levels)).ravel()
+        xy = np.column_stack((np.concatenate(([self.start], xs, [self.end])),
+                              np.concatenate(([self.Y], ys, [self.Y]))))
+        feat_draw = Polygon(xy, closed = True, lw=self.lw, ec=self.ec, fc=self.fc, alpha=self.alpha, url = self.url,)
+        self.patches.append(feat_draw)
+
+
 class CoupledmRNAandCDS(BaseGraphicFeature):
     '''
 
@@ -687,7 +1257,37 @@ class CoupledmRNAandCDS(BaseGraphicFeature):
 
             
             
-class SinglePositionFeature(BaseGraphicFeature):
+class _SinglePositionFeature(BaseGraphicFeature):
+    '''Implementation shared by :class:`SinglePositionFeature` and :class:`CompactSinglePositionFeature`'''
+    __slots__ = ('start', 'end', 'marker', 'markersize',)
+    def __init__(self,feature,**kwargs):
+        '''
+        
+        '''
+        BaseGraphicFeature.__init__(self,**kwargs)
+       
+        if feature is not None:
+            self.start = self.end = kwargs.get('start',min([feature.location.start.position,feature.location.end.position]))
+            self.type=kwargs.get('type',feature.type)
+            if 'score' in feature.qualifiers:
+                self.score=kwargs.get('score',feature.qualifiers['score'])
+        else:
+            self.start = self.end = kwargs['start']
+
+        self.marker=kwargs.get('marker','o')
+        self.markersize=kwargs.get('markersize',4)
+        
+
+        
+    def draw_feature(self):
+        feat_draw=plt.plot(self.start, self.Y, marker=self.marker, markerfacecolor=self.fc, markeredgecolor='k', markersize=self.markersize, alpha=self.alpha, url = self.url,)
+        self.patches=feat_draw
+
+        
+        
+
+
+class SinglePositionFeature(_SinglePositionFeature):
     '''
  
     
@@ -700,6 +1300,9 @@ class SinglePositionFeature(BaseGraphicFeature):
         marker                marker symbol, accepts all matplotlib marker types
                               default is circle marker ``'o'``
         markersize            marker size as in matplotlib. default  is ``4``.
+        start                 feature position, default is taken from the 
+                              SeqFeature. If given the SeqFeature can be 
+                              ``None``
         ===================== ==================================================
         
     Available matplotlib marker types:
@@ -737,28 +1340,33 @@ class SinglePositionFeature(BaseGraphicFeature):
 
     
     '''
-    def __init__(self,feature,**kwargs):
-        '''
-        
-        '''
-        BaseGraphicFeature.__init__(self,**kwargs)
-       
-        self.start = self.end = kwargs.get('start',min([feature.location.start.position,feature.location.end.position]))
-        self.type=kwargs.get('type',feature.type)
-        if 'score' in feature.qualifiers:
-            self.score=kwargs.get('score',feature.qualifiers['score'])
+    __metaclass__ = ABCMeta
 
-        self.marker=kwargs.get('marker','o')
-        self.markersize=kwargs.get('markersize',4)
-        
 
-        
-    def draw_feature(self):
-        feat_draw=plt.plot(self.start, self.Y, marker=self.marker, markerfacecolor=self.fc, markeredgecolor='k', markersize=self.markersize, alpha=self.alpha, url = self.url,)
-        self.patches=feat_draw
 
-        
-        
+def _extent(feature):
+    '''``(start, end)`` of a SeqFeature location, or of a ``(start, end)`` 
+    pair'''
+    if isinstance(feature, (tuple, list)):
+        return (min(feature), max(feature))
+    return (min([feature.location.start.position,feature.location.end.position]),
+            max([feature.location.start.position,feature.location.end.position]))
+
+def _patch_collection(patches, **kwargs):
+    '''`patches` drawn as a list of one collection, or an empty list'''
+    if not patches:
+        return []
+    return [PatchCollection(patches, **kwargs)]
+
+def _line_collection(extents, y, linestyle, color, lw, alpha, url):
+    '''horizontal lines at `y` spanning the ``(start, end)`` `extents`, 
+    drawn as a list of one collection, or an empty list'''
+    if not extents:
+        return []
+    return [LineCollection([((start, y), (end, y)) for start, end in extents], 
+                           linestyles=linestyle, colors=color, linewidths=lw, 
+                           antialiaseds=False, alpha=alpha, url = url)]
+
 class TMFeature(BaseGraphicFeature):
     '''  
     
@@ -768,7 +1376,8 @@ class TMFeature(BaseGraphicFeature):
     A list of `transmembrane` SeqFeatures is required. additional `cytoplasmic`
     and `non cytoplasmic` SeqFeatures can be passed. If only `transmembrane` 
     SeqFeatures are given, the remaining space is filled with an horizontal 
-    line.
+    line. ``(start, end)`` pairs can be given instead of SeqFeatures, and 
+    :meth:`from_string` reads a per-residue topology string.
 
     Additional valid attributes:
         ===================== ==================================================
@@ -779,7 +1388,8 @@ class TMFeature(BaseGraphicFeature):
         cyto                  list of SeqFeatures reporting cytoplasmic regions.
         non_cyto              list of SeqFeatures reporting non cytoplasmic 
                               regions. 
-        type                  feature type
+        type                  feature type. default is the type of the first 
+                              transmembrane SeqFeature, or ``'transmembrane'``
         TM_ec                 transmembrane region edgecolor, as in matplotlib.
         TM_fc                 transmembrane region facecolor, as in matplotlib.
         TM_label              text that will appear under the transmembrane 
@@ -827,7 +1437,10 @@ class TMFeature(BaseGraphicFeature):
         self.TM = kwargs.get('TM',[])
         self.cyto = kwargs.get('cyto',[])
         self.non_cyto = kwargs.get('non_cyto',[])
-        self.type=kwargs.get('type',self.TM[0].type)
+        if 'type' in kwargs:
+            self.type = kwargs['type']
+        else:
+            self.type = getattr(self.TM[0], 'type', 'transmembrane') if self.TM else 'transmembrane'
         self.TM_ec = kwargs.get('TM_ec',self.ec)
         self.TM_fc = kwargs.get('TM_fc',self.fc)
         self.TM_label = kwargs.get('TM_label','TM')
@@ -842,18 +1455,12 @@ class TMFeature(BaseGraphicFeature):
         self.connection_lw = kwargs.get('connection_lw',2)
         self.do_not_fill = kwargs.get('do_not_fill',False)
         
-        Xs = []
-        for feature in self.TM:
-            Xs.append(feature.location.start.position)
-            Xs.append(feature.location.end.position)
-        if self.cyto:
-            for feature in self.cyto:
-                Xs.append(feature.location.start.position)
-                Xs.append(feature.location.end.position)
-        if self.non_cyto:
-            for feature in self.non_cyto:
-                Xs.append(feature.location.start.position)
-                Xs.append(feature.location.end.position)
+        #label positions
+        self.TM_starts = map(_extent, self.TM)
+        self.cyto_starts = map(_extent, self.cyto)
+        self.non_cyto_starts = map(_extent, self.non_cyto)
+        
+        Xs = [x for extent in self.TM_starts + self.cyto_starts + self.non_cyto_starts for x in extent]
         self.start = min(Xs)
         self.end = max(Xs)
         
@@ -861,54 +1468,47 @@ class TMFeature(BaseGraphicFeature):
             self.fill = False 
         else:
             self.fill = True 
-            
-        #label positions
-        self.TM_starts = []
-        self.cyto_starts = []
-        self.non_cyto_starts = []
         
-        
-
-    
+    @classmethod
+    def from_string(cls, topology, offset = 0, codes = TOPOLOGY_CODES, **kwargs):
+        '''
+        returns a TMFeature from a per-residue `topology` string, such as 
+        ``'iiiMMMMooo'``, or a numpy array of labels. `codes` maps ``'TM'``, 
+        ``'cyto'`` and ``'non_cyto'`` to their labels, by default TMHMM 
+        codes. residue ``i`` spans from ``offset + i`` to ``offset + i + 1``,
+        the other keyword arguments are given to the constructor
+        '''
+        kwargs.update(segments(topology, codes, offset = offset))
+        return cls(**kwargs)
     
     def draw_feature(self):
-        
-        def draw_orizontal_line(start, end, y, linestyle, color, url):
-            return plt.plot((start,end), (y,y), linestyle=linestyle, color=color, 
-                            lw=self.connection_lw, aa=False, alpha=self.alpha,
-                            url = url)
-        
-        TMs=[]
-        for feature in self.TM:
-            start = min([feature.location.start.position,feature.location.end.position])
-            end = max([feature.location.start.position,feature.location.end.position])
-            type = feature.type
-            self.TM_starts.append((start,end))
-            if 'score' in feature.qualifiers:#not used yet
-                score=kwargs.get('score',feature.qualifiers['score'])
-            feat_draw=FancyBboxPatch((start,self.Y), width=(end-start), height=self.height, boxstyle=self.boxstyle, lw=self.lw, ec=self.TM_ec, fc=self.TM_fc,alpha=self.alpha, url = self.url,)
-            self.patches.append(feat_draw)
+        '''draws one collection of boxes for the transmembrane regions and 
+        one collection of lines for each kind of connecting region'''
+        boxes = [FancyBboxPatch((start,self.Y), width=(end-start), height=self.height, boxstyle=self.boxstyle)
+                 for start, end in self.TM_starts]
+        self.patches.extend(_patch_collection(boxes, edgecolors=self.TM_ec, facecolors=self.TM_fc, linewidths=self.lw, 
+                                              alpha=self.alpha, url = self.url,))
+        y = self.Y + self.height/2
         if self.fill:
+            fill = []
             start = 1
             for TM_start,TM_end in sorted(self.TM_starts):
-                end = TM_start# - 1
-                feat_draw=draw_orizontal_line(start, end, self.Y + self.height/2, self.fill_linestyle, self.fill_color, url = self.url,)
-                self.patches.extend(feat_draw)#use extend, since plot returns a list of Line2D objects
-                start = TM_end #+ 1
-        'draw cytplasmic regions'
-        for feature in self.cyto:
-            start = min([feature.location.start.position,feature.location.end.position])
-            end = max([feature.location.start.position,feature.location.end.position])
-            self.cyto_starts.append((start,end))
-            feat_draw=draw_orizontal_line(start, end, self.Y + self.height/2, self.cyto_linestyle, self.cyto_color, url = self.url,)
-            self.patches.extend(feat_draw)
-        'draw non cytplasmic regions'
-        for feature in self.non_cyto:
-            start = min([feature.location.start.position,feature.location.end.position])
-            end = max([feature.location.start.position,feature.location.end.position])
-            self.non_cyto_starts.append((start,end))
-            feat_draw=draw_orizontal_line(start, end, self.Y + self.height/2, self.non_cyto_linestyle, self.non_cyto_color, url = self.url,)
-            self.patches.extend(feat_draw)
+                fill.append((start, TM_start))
+                start = TM_end
+            self.patches.extend(_line_collection(fill, y, self.fill_linestyle, self.fill_color, 
+                                                 self.connection_lw, self.alpha, self.url))
+        self.patches.extend(_line_collection(self.cyto_starts, y, self.cyto_linestyle, self.cyto_color, 
+                                             self.connection_lw, self.alpha, self.url))
+        self.patches.extend(_line_collection(self.non_cyto_starts, y, self.non_cyto_linestyle, self.non_cyto_color, 
+                                             self.connection_lw, self.alpha, self.url))
+
+    @property
+    def map_regions(self):
+        '''``(label, start, end)`` of the regions given their own html map 
+        area'''
+        return [(self.TM_label, start, end) for start, end in self.TM_starts] + \
+               [(self.cyto_label, start, end) for start, end in self.cyto_starts] + \
+               [(self.non_cyto_label, start, end) for start, end in self.non_cyto_starts]
                  
                 
     def draw_feat_name(self,**kwargs):
@@ -941,7 +1541,8 @@ class SecStructFeature(BaseGraphicFeature):
     
     Draws secondary structures. requires at least a list of SeqFeatures 
     indicating beta strands (`betas`), alpha helices (`alphah`), and random
-    coil (`coil`).
+    coil (`coil`). ``(start, end)`` pairs can be given instead of 
+    SeqFeatures, and :meth:`from_string` reads a per-residue DSSP string.
 
     Beta strands are drawn as arrows, alpha helices as rectangles and coils as
     horizontal lines. 
@@ -985,6 +1586,7 @@ class SecStructFeature(BaseGraphicFeature):
         '''
 
         '''
+        kwargs.setdefault('lw', 2)
         BaseGraphicFeature.__init__(self,**kwargs)
         
         self.betas = betas
@@ -998,79 +1600,71 @@ class SecStructFeature(BaseGraphicFeature):
         self.alphah_fc = kwargs.get('alphah_fc','magenta')
         self.coil_color = kwargs.get('coil_color','k')
         self.coil_linestyle = kwargs.get('coil_linestyle','-')
-        self.lw = kwargs.get('lw',2)
         
         self.filter_struct_length = kwargs.get('filter_struct_length', 0)#if != 0 smooths secondary structures, by displaying only those longher than the given value. self.filter_struct_length force coil geneation, and ignore supplied coils regions
         
         self.structured_regions =[]
+        self._regions = []# (label, start, end) of the drawn structures
 
-        Xs = []
-        if self.betas:
-            for feature in self.betas:
-                Xs.append(feature.location.start.position)
-                Xs.append(feature.location.end.position)
-        if self.alphah:
-            for feature in self.alphah:
-                Xs.append(feature.location.start.position)
-                Xs.append(feature.location.end.position)
-        if self.coil:
-            for feature in self.coil:
-                Xs.append(feature.location.start.position)
-                Xs.append(feature.location.end.position)
+        self._extents = dict(betas = map(_extent, self.betas), 
+                             alphah = map(_extent, self.alphah), 
+                             coil = map(_extent, self.coil))
+        Xs = [x for extents in self._extents.values() for extent in extents for x in extent]
         self.start = min(Xs)
         self.end = max(Xs)
 
+    @classmethod
+    def from_string(cls, states, offset = 0, codes = DSSP_CODES, **kwargs):
+        '''
+        returns a SecStructFeature from a per-residue `states` string, such as
+        the DSSP ``'--HHHHH---EEEE-'``, or a numpy array of labels. `codes` 
+        maps ``'betas'``, ``'alphah'`` and ``'coil'`` to their labels, by 
+        default DSSP codes. residue ``i`` spans from ``offset + i`` to 
+        ``offset + i + 1``. secondary structures shorter than 
+        `filter_struct_length` are left out while the string is read, the 
+        other keyword arguments are given to the constructor
+        '''
+        kwargs.update(segments(states, codes, offset = offset, 
+                               min_length = kwargs.get('filter_struct_length', 0), 
+                               filtered = ('betas', 'alphah')))
+        return cls(**kwargs)
 
     def draw_feature(self):
-        def draw_orizontal_line(start, end, y, linestyle, color, url):
-            return plt.plot((start,end), (y,y), linestyle=linestyle, color=color, 
-                                lw=1, aa=False, alpha=self.alpha, url = url)
-        'draw beta strands'
-        for feature in self.betas:
-            start = min([feature.location.start.position,feature.location.end.position])
-            end = max([feature.location.start.position,feature.location.end.position])
-            if (end-start) >= self.filter_struct_length: #skip short secondary structures
-                type = feature.type
-                self.structured_regions.append((start,end))
-                if 'score' in feature.qualifiers:#not used yet
-                    score=kwargs.get('score',feature.qualifiers['score'])
-
-                feat_draw = FancyArrow(start, self.Y+self.height/2., dx=end-start, dy=0, ec=self.betas_ec, fc=self.betas_fc, alpha=self.alpha, 
-                                       width=self.height/2., head_length=(end-start)*.33, head_width=self.height, 
-                                       lw=self.lw, length_includes_head=True,  head_starts_at_zero=False, url = self.url,)
-                self.patches.append(feat_draw)
-
-
-        'draw alpha helix'
-        for feature in self.alphah:
-            start = min([feature.location.start.position,feature.location.end.position])
-            end = max([feature.location.start.position,feature.location.end.position])
-            if (end-start) >= self.filter_struct_length: #skip short secondary structures
-                type = feature.type
-                self.structured_regions.append((start,end))
-                if 'score' in feature.qualifiers:#not used yet
-                    score=kwargs.get('score',feature.qualifiers['score'])
-
-                feat_draw = FancyBboxPatch((start,self.Y), width=(end-start), height=self.height, boxstyle=self.boxstyle, 
-                                           lw=self.lw, ec=self.alphah_ec, fc=self.alphah_fc,alpha=self.alpha, url = self.url,)
-                self.patches.append(feat_draw)
-        
+        '''draws one collection of arrows for the beta strands, one of boxes 
+        for the alpha helices and one of lines for the coils'''
+        betas = [(start, end) for start, end in self._extents['betas'] 
+                 if (end-start) >= self.filter_struct_length]#skip short secondary structures
+        alphah = [(start, end) for start, end in self._extents['alphah'] 
+                  if (end-start) >= self.filter_struct_length]
+        self.structured_regions = betas + alphah
+        arrows = [FancyArrow(start, self.Y+self.height/2., dx=end-start, dy=0, width=self.height/2., 
+                             head_length=(end-start)*.33, head_width=self.height, 
+                             length_includes_head=True,  head_starts_at_zero=False,)
+                  for start, end in betas]
+        self.patches.extend(_patch_collection(arrows, edgecolors=self.betas_ec, facecolors=self.betas_fc, linewidths=self.lw, 
+                                              alpha=self.alpha, url = self.url,))
+        boxes = [FancyBboxPatch((start,self.Y), width=(end-start), height=self.height, boxstyle=self.boxstyle)
+                 for start, end in alphah]
+        self.patches.extend(_patch_collection(boxes, edgecolors=self.alphah_ec, facecolors=self.alphah_fc, linewidths=self.lw, 
+                                              alpha=self.alpha, url = self.url,))
         if (not self.coil) or (self.filter_struct_length):
+            coils = []
             start = 1
             for region_start,region_end in sorted(self.structured_regions):
-                end = region_start #- 1
-                feat_draw=draw_orizontal_line(start, end, self.Y + self.height/2, self.coil_linestyle, self.coil_color, url = self.url,)
-                self.patches.extend(feat_draw)#use extend, since plot returns a list of Line2D objects
-                start = region_end #+ 1
+                coils.append((start, region_start))
+                start = region_end
         else:
-             for feature in self.coil:
-                start = min([feature.location.start.position,feature.location.end.position])
-                end = max([feature.location.start.position,feature.location.end.position])
-                type = feature.type
-                if 'score' in feature.qualifiers:#not used yet
-                    score=kwargs.get('score',feature.qualifiers['score'])
-                feat_draw=draw_orizontal_line(start, end, self.Y + self.height/2, self.coil_linestyle, self.coil_color, url = self.url,)
-                self.patches.extend(feat_draw)#use extend, since plot returns a list of Line2D objects
+            coils = self._extents['coil']
+        self.patches.extend(_line_collection(coils, self.Y + self.height/2, self.coil_linestyle, 
+                                             self.coil_color, 1, self.alpha, self.url))
+        self._regions = [('beta strand', start, end) for start, end in betas] + \
+                        [('alpha helix', start, end) for start, end in alphah]
+
+    @property
+    def map_regions(self):
+        '''``(label, start, end)`` of the secondary structures given their own
+        html map area'''
+        return self._regions
                 
                 
 class DomainFeature(BaseGraphicFeature):
@@ -1239,3 +1833,61 @@ fancybox_demo2.html
                 name = self.name
             self.feat_name.append(plt.annotate(name, xy = (start + (end - start) / 2, self.Y), xytext = (start + (end - start) / 2, self.Y + self.height/2.), fontproperties=font_feat, horizontalalignment=ha, verticalalignment=va))
 
+
+
+class CompactSimple(_Simple):
+    '''
+    
+    A :class:`Simple` feature without a per instance ``__dict__``, for tracks
+    with a very large number of features. Takes the same arguments and draws 
+    the same glyph, but arbitrary attributes cannot be set on it.
+    
+    A class with a ``__dict__`` cannot have subclasses without one, so the 
+    compact classes share their code with the classic ones through a common 
+    slotted base and are registered as virtual subclasses of them: 
+    ``isinstance(CompactSimple(0, 1), Simple)`` is ``True``, but methods 
+    defined on :class:`Simple` itself, or on a subclass of it, are not 
+    inherited.
+    
+    ``features.CompactSimple(start,end,name='factor 7',**kwargs)``
+    
+    '''
+    __slots__ = ()
+
+Simple.register(CompactSimple)
+
+
+class CompactGenericSeqFeature(_GenericSeqFeature):
+    '''
+    
+    A :class:`GenericSeqFeature` without a per instance ``__dict__``. Registered as a
+    virtual subclass of it, see :class:`CompactSimple`.
+    
+    '''
+    __slots__ = ()
+
+GenericSeqFeature.register(CompactGenericSeqFeature)
+
+
+class CompactGeneSeqFeature(_GeneSeqFeature):
+    '''
+    
+    A :class:`GeneSeqFeature` without a per instance ``__dict__``. Registered as a
+    virtual subclass of it, see :class:`CompactSimple`.
+    
+    '''
+    __slots__ = ()
+
+GeneSeqFeature.register(CompactGeneSeqFeature)
+
+
+class CompactSinglePositionFeature(_SinglePositionFeature):
+    '''
+    
+    A :class:`SinglePositionFeature` without a per instance ``__dict__``. Registered as a
+    virtual subclass of it, see :class:`CompactSimple`.
+    
+    '''
+    __slots__ = ()
+
+SinglePositionFeature.register(CompactSinglePositionFeature)
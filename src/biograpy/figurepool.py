@@ -0,0 +1,140 @@
+'''
+Created on 19/ott/2026
+
+Figure pooling for long running processes.
+
+Every :class:`~biograpy.drawer.Panel` creates a matplotlib figure that stays
+registered in pyplot until the panel is closed. In a web server this means
+a new figure and canvas for every request and a growing process if a panel is
+not closed.
+A :class:`FigurePool` keeps a limited number of cleared figures, grouped by
+size and dpi, and hands them to the panels created with the `figure_pool`
+keyword::
+
+    pool = FigurePool(max_size = 4)
+    panel = Panel(fig_width = 900, figure_pool = pool)
+    ...
+    panel.save(output)
+    panel.close()# the figure goes back to the pool
+
+'''
+
+import threading
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+
+class FigurePool(object):
+    '''
+
+    Reuses pyplot figures of matching size and dpi.
+
+    Valid keyword arguments for :class:`FigurePool` are:
+
+        ===================== ==================================================
+        Key                   Description
+        ===================== ==================================================
+        max_size              maximum number of idle figures kept alive, extra
+                              figures are closed when released. default is
+                              ``8``
+        ===================== ==================================================
+
+    '''
+
+    def __init__(self, max_size = 8):
+        self.max_size = max_size
+        self._idle = []# (key, figure), last released at the end
+        self._in_use = {}# figure number -> key
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.closed = 0
+        self.leaked_artists = 0
+
+    def acquire(self, width, height, dpi):
+        '''returns a cleared figure of `width` x `height` inches and `dpi`,
+        made current in pyplot. idle figures closed in pyplot are dropped'''
+        key = (float(width), float(height), float(dpi))
+        self._lock.acquire()
+        try:
+            fig = None
+            open_figures = set(plt.get_fignums())
+            self._idle = [(idle_key, idle) for idle_key, idle in self._idle if idle.number in open_figures]
+            for i in range(len(self._idle) - 1, -1, -1):
+                if self._idle[i][0] == key:
+                    fig = self._idle.pop(i)[1]
+                    self.reused += 1
+                    break
+            if fig is None:
+                fig = plt.figure(self._free_number(), figsize = key[:2], dpi = key[2], frameon = False)
+                self.created += 1
+            self._in_use[fig.number] = key
+        finally:
+            self._lock.release()
+        plt.figure(fig.number)
+        return fig
+
+    def release(self, fig):
+        '''clear a figure obtained from :func:`acquire` and keep it for
+        reuse, or close it if the pool is full'''
+        self._lock.acquire()
+        try:
+            key = self._in_use.pop(fig.number, None)
+            if key is None:
+                raise ValueError('Figure %s does not belong to this pool' % fig.number)
+            fig.clf()
+            self.leaked_artists += self._count_artists(fig)
+            fig.set_size_inches(key[:2])
+            fig.set_dpi(key[2])
+            if len(self._idle) < self.max_size:
+                self._idle.append((key, fig))
+            else:
+                plt.close(fig)
+                self.closed += 1
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        '''close all the idle figures'''
+        self._lock.acquire()
+        try:
+            for key, fig in self._idle:
+                plt.close(fig)
+                self.closed += 1
+            self._idle = []
+        finally:
+            self._lock.release()
+
+    def stats(self):
+        '''
+        returns a dict with the pool counters:
+        `idle` and `in_use` figures, `created`, `reused` and `closed`
+        figures, `leaked_artists` found on figures after clearing them and
+        `unpooled_figures`, the pyplot figures that are still open but are
+        not owned by the pool, usually panels that were never closed.
+        '''
+        pooled = set(self._in_use.keys())
+        pooled.update([fig.number for key, fig in self._idle])
+        return dict(idle = len(self._idle),
+                    in_use = len(self._in_use),
+                    created = self.created,
+                    reused = self.reused,
+                    closed = self.closed,
+                    leaked_artists = self.leaked_artists,
+                    unpooled_figures = len([n for n in plt.get_fignums() if n not in pooled]),)
+
+    def _free_number(self):
+        '''pooled figures use numbers not used by pyplot, starting from 1000
+        to leave the usual figure 1 alone'''
+        used = set(plt.get_fignums())
+        number = 1000
+        while number in used:
+            number += 1
+        return number
+
+    @staticmethod
+    def _count_artists(fig):
+        '''artists still attached to a cleared figure, apart from its
+        background patch'''
+        return len([child for child in fig.get_children() if child is not fig.patch])
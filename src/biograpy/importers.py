@@ -0,0 +1,265 @@
+'''
+Created on 19/ott/2026
+
+Streaming GFF3 and BED importers.
+
+Annotation files are read line by line and turned straight into graphic
+features grouped in one track per feature type, as
+:func:`~biograpy.seqrecord.SeqRecordDrawer.draw_features` does for a
+SeqRecord, but without creating Biopython SeqFeature objects.
+GFF3 children (eg. exons) are joined to their `Parent` and drawn as the
+segments of a :class:`~biograpy.features.SegmentedFeature`.
+
+Coordinates are converted to 0-based starts, as in Biopython.
+
+'''
+
+import urllib
+
+STRANDS = {'+': 1, '-': -1}
+SEGMENT_TYPES = ('exon', 'CDS')
+
+
+class Interval(object):
+    '''a lightweight annotation record'''
+    __slots__ = ('seqid', 'start', 'end', 'name', 'score', 'strand', 'type',
+                 'attributes', 'segments')
+
+    def __init__(self, seqid, start, end, name = '', score = None, strand = 0,
+                 type = '', attributes = None, segments = None):
+        self.seqid = seqid
+        self.start = start
+        self.end = end
+        self.name = name
+        self.score = score
+        self.strand = strand
+        self.type = type
+        self.attributes = attributes or {}
+        self.segments = segments or []
+
+
+def parse_gff3_attributes(column):
+    '''returns a dict from a GFF3 attributes column, multiple values are
+    returned as lists'''
+    attributes = {}
+    if column == '.':
+        return attributes
+    for attribute in column.split(';'):
+        if '=' not in attribute:
+            continue
+        key, value = attribute.split('=', 1)
+        values = [urllib.unquote(v) for v in value.strip().split(',')]
+        if len(values) == 1:
+            attributes[key.strip()] = values[0]
+        else:
+            attributes[key.strip()] = values
+    return attributes
+
+
+def iter_gff3(handle):
+    '''yields an :class:`Interval` per GFF3 line. a ``None`` is yielded for
+    each ``###`` directive, signalling that all the forward references have
+    been resolved'''
+    for line in handle:
+        if line.startswith('###'):
+            yield None
+            continue
+        if line.startswith('##FASTA'):
+            break
+        if (not line.strip()) or line.startswith('#'):
+            continue
+        fields = line.rstrip('\r\n').split('\t')
+        if len(fields) < 8:
+            raise ValueError('Malformed GFF3 line: %s' % line)
+        score = None
+        if fields[5] != '.':
+            score = float(fields[5])
+        attributes = {}
+        if len(fields) > 8:
+            attributes = parse_gff3_attributes(fields[8])
+        yield Interval(fields[0], int(fields[3]) - 1, int(fields[4]),
+                       name = attributes.get('Name', attributes.get('ID', '')),
+                       score = score,
+                       strand = STRANDS.get(fields[6], 0),
+                       type = fields[2],
+                       attributes = attributes)
+
+
+def iter_bed(handle, type = 'bed'):
+    '''yields an :class:`Interval` per BED line. BED12 blocks are returned as
+    `segments`'''
+    for line in handle:
+        if (not line.strip()) or line.startswith(('#', 'track', 'browser')):
+            continue
+        fields = line.rstrip('\r\n').split('\t')
+        start = int(fields[1])
+        interval = Interval(fields[0], start, int(fields[2]), type = type)
+        if len(fields) > 3:
+            interval.name = fields[3]
+        if (len(fields) > 4) and (fields[4] not in ('', '.')):
+            interval.score = float(fields[4])
+        if len(fields) > 5:
+            interval.strand = STRANDS.get(fields[5], 0)
+        if len(fields) > 11 and int(fields[9]) > 1:
+            sizes = [int(v) for v in fields[10].split(',') if v]
+            starts = [int(v) for v in fields[11].split(',') if v]
+            interval.segments = [(start + s, start + s + l) for s, l in zip(starts, sizes)]
+        yield interval
+
+
+def join_gff3(records):
+    '''
+    join GFF3 children to their `Parent` records: children of
+    ``SEGMENT_TYPES`` type are stored as `segments` of their parents and are
+    not returned. yields the top level and non segment records, grouping is
+    flushed at every ``###`` directive.
+    '''
+    block = []
+    for record in records:
+        if record is None:
+            for joined in _join_block(block):
+                yield joined
+            block = []
+        else:
+            block.append(record)
+    for joined in _join_block(block):
+        yield joined
+
+
+def _join_block(block):
+    by_id = {}
+    for record in block:
+        if 'ID' in record.attributes:
+            by_id[record.attributes['ID']] = record
+    children = {}
+    for record in block:
+        parents = record.attributes.get('Parent', [])
+        if isinstance(parents, basestring):
+            parents = [parents]
+        for parent in parents:
+            if parent in by_id:
+                children.setdefault(parent, []).append(record)
+    joined = set()
+    for parent_id, childs in children.items():
+        for segment_type in SEGMENT_TYPES:
+            segments = [(child.start, child.end) for child in childs if child.type == segment_type]
+            if segments:
+                by_id[parent_id].segments = segments
+                for child in childs:
+                    if child.type in SEGMENT_TYPES:
+                        joined.add(id(child))
+                break
+    for record in block:
+        if id(record) not in joined:
+            yield record
+
+
+def interval_to_feature(interval, **kwargs):
+    '''
+    returns the graphic feature for an :class:`Interval`, choosing the
+    feature type as :class:`~biograpy.seqrecord.SeqRecordDrawer` does.
+    `kwargs` are passed to the feature.
+    '''
+    from biograpy import features
+    kwargs.setdefault('name', interval.name)
+    kwargs.setdefault('type', interval.type)
+    if interval.score is not None:
+        kwargs.setdefault('score', interval.score)
+        if 0 <= interval.score <= 1:
+            kwargs.setdefault('use_score_for_color', True)
+            kwargs.setdefault('cm', 'RdYlGn')
+    if interval.segments:
+        return features.SegmentedFeature(interval.start, interval.end, interval.segments,
+                                         strand = interval.strand, **kwargs)
+    if interval.type == 'gene' and interval.strand in (1, -1):
+        return features.GeneSeqFeature(None, start = interval.start, end = interval.end,
+                                       strand = interval.strand, **kwargs)
+    if interval.start == interval.end:
+        return features.SinglePositionFeature(None, start = interval.start, **kwargs)
+    return features.Simple(interval.start, interval.end, **kwargs)
+
+
+def _select(intervals, seqid, start, end):
+    for interval in intervals:
+        if (seqid is not None) and (interval.seqid != seqid):
+            continue
+        if (start is not None) and (interval.end < start):
+            continue
+        if (end is not None) and (interval.start > end):
+            continue
+        yield interval
+
+
+def read_intervals(handle, format = 'gff3', seqid = None, start = None, end = None):
+    '''
+    yields the :class:`Interval` objects of a GFF3 or BED file, with GFF3
+    children already joined. `handle` can be a file path or an open file.
+    only intervals on `seqid` overlapping `start`-`end` are returned if
+    specified.
+    '''
+    if isinstance(handle, basestring):
+        handle = open(handle)
+    if format in ('gff', 'gff3'):
+        intervals = join_gff3(iter_gff3(handle))
+    elif format == 'bed':
+        intervals = iter_bed(handle)
+    else:
+        raise ValueError('Unsupported annotation format: %s' % format)
+    return _select(intervals, seqid, start, end)
+
+
+def read_tracks(handle, format = 'gff3', seqid = None, start = None, end = None,
+                track_class = None, **kwargs):
+    '''
+    returns a list of tracks, one per feature type sorted by type name, filled
+    with the features of a GFF3 or BED file.
+    `track_class` default is :class:`~biograpy.tracks.BaseTrack`, `kwargs`
+    are passed to each track.
+
+    ::
+
+        panel.extend(importers.read_tracks('annotation.gff3', seqid = 'chr1',
+                                           start = 10000, end = 50000))
+
+    '''
+    if track_class is None:
+        from biograpy.tracks import BaseTrack as track_class
+    tracks2draw = {}
+    for interval in read_intervals(handle, format, seqid, start, end):
+        if interval.type not in tracks2draw:
+            tracks2draw[interval.type] = track_class(name = interval.type, **kwargs)
+        tracks2draw[interval.type].add_feature(interval_to_feature(interval))
+    return [tracks2draw[key] for key in sorted(tracks2draw.keys())]
+
+
+def read_tables(handle, format = 'gff3', seqid = None, start = None, end = None):
+    '''
+    returns a dict of :class:`~biograpy.intervalindex.IntervalTable` columnar
+    tables, one per feature type, of the intervals on `seqid`. tables hold a
+    single sequence, `seqid` is required
+    '''
+    import numpy as np
+    from biograpy.intervalindex import IntervalTable
+    if seqid is None:
+        raise ValueError('A seqid is required to read interval tables')
+    columns = {}
+    for interval in read_intervals(handle, format, seqid, start, end):
+        if interval.type not in columns:
+            columns[interval.type] = dict(chrom = interval.seqid, starts = [], ends = [],
+                                          scores = [], strands = [], names = [])
+        table = columns[interval.type]
+        table['starts'].append(interval.start)
+        table['ends'].append(interval.end)
+        table['scores'].append(interval.score or 0.)
+        table['strands'].append(interval.strand)
+        table['names'].append(interval.name)
+    tables = {}
+    for ftype, table in columns.items():
+        tables[ftype] = IntervalTable(table['chrom'],
+                                      starts = np.array(table['starts'], dtype = np.int64),
+                                      ends = np.array(table['ends'], dtype = np.int64),
+                                      scores = np.array(table['scores'], dtype = np.float32),
+                                      strands = np.array(table['strands'], dtype = np.int8),
+                                      types = [ftype] * len(table['starts']),
+                                      names = table['names'])
+    return tables
@@ -0,0 +1,298 @@
+'''
+Created on 19/ott/2026
+
+Indexed on-disk interval files.
+
+Large BED or GFF annotation files are converted once to a compact binary
+columnar file with a linear index, so that features overlapping a window can
+be read in milliseconds without parsing the whole annotation.
+
+File layout (little endian)::
+
+    magic           4 bytes  'BGPI'
+    version         uint32
+    header length   uint32
+    header          JSON object describing chromosomes, array offsets and
+                    feature types
+    arrays          for each chromosome: starts, ends, scores, strands,
+                    types, name offsets, names blob and linear index
+
+Records are sorted by start position. Coordinates are 0-based half open as in
+BED, GFF starts are converted on import.
+The linear index stores, for each `window` positions, the first record ending
+after the beginning of the window: a query only reads records from there to
+the last record starting before the end of the query.
+
+'''
+
+import array
+import json
+import struct
+import numpy as np
+from biograpy.importers import iter_bed, iter_gff3
+
+INDEX_MAGIC = 'BGPI'
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct('<4sII')
+DEFAULT_WINDOW = 16384
+
+COLUMNS = (('starts', '<u4'),
+           ('ends', '<u4'),
+           ('scores', '<f4'),
+           ('strands', '<i1'),
+           ('types', '<u2'),
+           ('name_offsets', '<u4'),)
+
+
+def _parse_bed(handle):
+    for interval in iter_bed(handle):
+        yield (interval.seqid, interval.start, interval.end, interval.name,
+               interval.score or 0., interval.strand, interval.type)
+
+
+def _parse_gff(handle):
+    for interval in iter_gff3(handle):
+        if interval is not None:
+            yield (interval.seqid, interval.start, interval.end, interval.name,
+                   interval.score or 0., interval.strand, interval.type)
+
+
+PARSERS = dict(bed = _parse_bed, gff = _parse_gff, gff3 = _parse_gff)
+
+
+def build_interval_index(handle, output, format = 'bed', window = DEFAULT_WINDOW):
+    '''
+    build an indexed interval file at the `output` path reading BED or GFF
+    lines from `handle`, that can be a file path or an open file.
+    `format` can be ``'bed'`` or ``'gff'``.
+    columns are collected in compact arrays while reading, names are the
+    only python objects kept in memory.
+    '''
+    if isinstance(handle, basestring):
+        handle = open(handle)
+    if format not in PARSERS:
+        raise ValueError('Unsupported interval format: %s' % format)
+    chroms = {}
+    chrom_order = []
+    types = {}
+    for chrom, start, end, name, score, strand, ftype in PARSERS[format](handle):
+        if chrom not in chroms:
+            chroms[chrom] = dict(starts = array.array('L'), ends = array.array('L'),
+                                 scores = array.array('f'), strands = array.array('b'),
+                                 types = array.array('H'), names = [])
+            chrom_order.append(chrom)
+        columns = chroms[chrom]
+        columns['starts'].append(start)
+        columns['ends'].append(end)
+        columns['scores'].append(score)
+        columns['strands'].append(strand)
+        columns['types'].append(types.setdefault(ftype, len(types)))
+        columns['names'].append(name)
+
+    header = dict(window = window,
+                  types = [t for t, i in sorted(types.items(), key = lambda item: item[1])],
+                  chroms = {},
+                  order = chrom_order)
+    blocks = []
+    offset = 0
+    for chrom in chrom_order:
+        columns = chroms.pop(chrom)
+        starts = np.frombuffer(columns['starts'], dtype = np.dtype('L')).astype('<u4')
+        order = np.argsort(starts, kind = 'mergesort')
+        data = dict(starts = starts[order])
+        for key, dtype in COLUMNS[1:5]:
+            data[key] = np.frombuffer(columns[key], dtype = columns[key].typecode).astype(dtype)[order]
+        names = [columns['names'][i] for i in order]
+        lengths = np.array([len(n) for n in names], dtype = '<u4')
+        data['name_offsets'] = np.append(0, np.cumsum(lengths)).astype('<u4')
+        data['names'] = np.frombuffer(''.join(names), dtype = 'S1')
+        maxends = np.maximum.accumulate(data['ends'])
+        nwindows = int(maxends[-1]) // window + 1
+        data['lindex'] = np.searchsorted(maxends, np.arange(nwindows, dtype = np.int64) * window, side = 'right').astype('<u4')
+        chrom_info = dict(count = len(starts), windows = nwindows, offsets = {})
+        for key, array_data in sorted(data.items()):
+            chrom_info['offsets'][key] = offset
+            blocks.append(array_data)
+            offset += array_data.nbytes
+        header['chroms'][chrom] = chrom_info
+
+    header_data = json.dumps(header)
+    fh = open(output, 'wb')
+    fh.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(header_data)))
+    fh.write(header_data)
+    for block in blocks:
+        fh.write(block.tostring())
+    fh.close()
+
+
+class IntervalTable(object):
+    '''
+
+    Columnar view of the intervals returned by :func:`IntervalIndex.fetch`.
+    `starts`, `ends`, `scores` and `strands` are numpy arrays, `types` and
+    `names` are lists of strings.
+
+    '''
+
+    def __init__(self, chrom, starts, ends, scores, strands, types, names):
+        self.chrom = chrom
+        self.starts = starts
+        self.ends = ends
+        self.scores = scores
+        self.strands = strands
+        self.types = types
+        self.names = names
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        '''yields a ``(start, end, name, score, strand, type)`` tuple per
+        interval'''
+        for i in range(len(self)):
+            yield (int(self.starts[i]), int(self.ends[i]), self.names[i],
+                   float(self.scores[i]), int(self.strands[i]), self.types[i])
+
+    def to_features(self, feature_class = None, **kwargs):
+        '''returns a list of features chosen as 
+        :func:`~biograpy.importers.interval_to_feature` does, keeping the
+        strand, or of `feature_class` objects accepting the arguments of
+        :class:`~biograpy.features.Simple` and `strand`. scores of ``0`` 
+        are the missing scores of the file and are not used for colors.
+        `kwargs` are passed to every feature'''
+        if feature_class is None:
+            from biograpy.importers import Interval, interval_to_feature
+            return [interval_to_feature(Interval(self.chrom, start, end, name, score or None, strand, ftype), **kwargs)
+                    for start, end, name, score, strand, ftype in self]
+        return [feature_class(start, end, name = name, score = score, type = ftype, strand = strand, **kwargs)
+                for start, end, name, score, strand, ftype in self]
+
+
+class IntervalIndex(object):
+    '''
+
+    Reads an indexed interval file built by :func:`build_interval_index`.
+    Arrays are memory mapped, a query only touches the linear index entry of
+    the query start and the records that can overlap the query.
+
+    ``index = IntervalIndex('genes.bgi')``
+    ``track.extend(index.fetch('chr1', 100000, 200000).to_features())``
+
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        fh = open(path, 'rb')
+        magic, version, header_length = INDEX_HEADER.unpack(fh.read(INDEX_HEADER.size))
+        if magic != INDEX_MAGIC:
+            raise ValueError('%s is not an interval index file' % path)
+        if version != INDEX_VERSION:
+            raise ValueError('Unsupported interval index version: %i' % version)
+        header = json.loads(fh.read(header_length))
+        fh.close()
+        self.data_offset = INDEX_HEADER.size + header_length
+        self.window = header['window']
+        self.types = [str(t) for t in header['types']]
+        self.chroms = header['chroms']
+        self.chrom_names = [str(c) for c in header['order']]
+        self._arrays = {}
+
+    def _array(self, chrom, key):
+        if (chrom, key) not in self._arrays:
+            info = self.chroms[chrom]
+            offsets = info['offsets']
+            if key == 'lindex':
+                dtype, count = '<u4', info['windows']
+            elif key == 'names':
+                dtype, count = 'S1', int(self._array(chrom, 'name_offsets')[-1])
+            elif key == 'name_offsets':
+                dtype, count = '<u4', info['count'] + 1
+            else:
+                dtype, count = dict(COLUMNS)[key], info['count']
+            if count:
+                self._arrays[(chrom, key)] = np.memmap(self.path, dtype = dtype, mode = 'r',
+                                                       offset = self.data_offset + offsets[key],
+                                                       shape = (count,))
+            else:
+                self._arrays[(chrom, key)] = np.array([], dtype = dtype)
+        return self._arrays[(chrom, key)]
+
+    def count(self, chrom):
+        '''number of intervals stored for `chrom`'''
+        if chrom not in self.chroms:
+            return 0
+        return self.chroms[chrom]['count']
+
+    def query(self, chrom, start, end):
+        '''returns the sorted record indexes of the intervals overlapping
+        `start`-`end` on `chrom`'''
+        if chrom not in self.chroms:
+            return np.array([], dtype = np.int64)
+        lindex = self._array(chrom, 'lindex')
+        window = max(int(start), 0) // self.window
+        if window >= len(lindex):
+            return np.array([], dtype = np.int64)
+        lo = int(lindex[window])
+        hi = int(np.searchsorted(self._array(chrom, 'starts'), end, side = 'left'))
+        if hi <= lo:
+            return np.array([], dtype = np.int64)
+        overlapping = np.flatnonzero(self._array(chrom, 'ends')[lo:hi] > start)
+        return overlapping + lo
+
+    def fetch(self, chrom, start, end):
+        '''returns an :class:`IntervalTable` of the intervals overlapping
+        `start`-`end` on `chrom`'''
+        records = self.query(chrom, start, end)
+        columns = {}
+        for key in ('starts', 'ends', 'scores', 'strands'):
+            if len(records):
+                columns[key] = np.asarray(self._array(chrom, key)[records])
+            else:
+                columns[key] = np.array([], dtype = dict(COLUMNS)[key])
+        types = []
+        names = []
+        if len(records):
+            type_codes = self._array(chrom, 'types')[records]
+            types = [self.types[code] for code in type_codes]
+            name_offsets = self._array(chrom, 'name_offsets')
+            blob = self._array(chrom, 'names')
+            for record in records:
+                names.append(blob[name_offsets[record]:name_offsets[record + 1]].tostring())
+        return IntervalTable(chrom, types = types, names = names, **columns)
+
+    def fill_track(self, track, chrom, start, end, feature_class = None, **kwargs):
+        '''add the features overlapping `start`-`end` on `chrom` to a
+        :class:`~biograpy.tracks.BaseTrack`. returns the track'''
+        track.extend(self.fetch(chrom, start, end).to_features(feature_class, **kwargs))
+        return track
+
+    def close(self):
+        '''drop the memory maps'''
+        self._arrays = {}
+
+
+def main(argv = None):
+    '''command line index builder::
+
+        biograpy-index [options] annotation_file index_file
+    '''
+    from optparse import OptionParser
+    parser = OptionParser(usage = '%prog [options] annotation_file index_file')
+    parser.add_option('--format', default = None,
+                      help = 'bed or gff, default is guessed from the file extension')
+    parser.add_option('--window', type = 'int', default = DEFAULT_WINDOW,
+                      help = 'linear index window size [%default]')
+    options, args = parser.parse_args(argv)
+    if len(args) != 2:
+        parser.error('an annotation file and an output index file are required')
+    format = options.format
+    if format is None:
+        format = 'bed'
+        if args[0].lower().endswith(('.gff', '.gff3')):
+            format = 'gff'
+    build_interval_index(args[0], args[1], format = format, window = options.window)
+    return 0
+
+
+if __name__ == '__main__':
+    main()
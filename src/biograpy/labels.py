@@ -0,0 +1,73 @@
+'''
+Created on 19/ott/2026
+
+Feature name placement.
+
+With the :class:`~biograpy.tracks.BaseTrack` ``feature_labels = 'declutter'``
+option feature names are left out of the space taken by the features when
+the track rows are filled, and are placed afterwards by :func:`place_labels`
+working on arrays with the row, the position and the estimated width of all
+the names at once. A name is drawn whole if it ends before the next name in
+its row, shortened if at least `min_chars` characters fit, or dropped, and
+only the drawn names become matplotlib artists::
+
+    track = tracks.BaseTrack(*reads, feature_labels = 'declutter')
+
+'''
+
+import numpy as np
+
+'''average character width of the feature names, in font sizes'''
+CHAR_WIDTH = 0.6
+ELLIPSIS = '...'
+
+
+def _available(rows, lefts, right, shown):
+    '''space from each label to the next shown label of its row, or to
+    `right` for the last one, for labels sorted by row and position'''
+    index = np.flatnonzero(shown)
+    nexts = np.empty(len(index))
+    nexts[:-1] = lefts[index[1:]]
+    nexts[-1:] = right
+    last = np.ones(len(index), dtype = bool)
+    last[:-1] = rows[index[:-1]] != rows[index[1:]]
+    nexts[last] = right
+    space = np.zeros(len(rows))
+    space[index] = nexts - lefts[index]
+    return space
+
+
+def place_labels(rows, lefts, lengths, char_width, right, min_chars = 6):
+    '''
+    returns an array with the number of characters to draw for each label,
+    given arrays with the `rows` and the `lefts` of the labels, in pixels,
+    and their `lengths` in characters. labels are kept one `char_width`
+    apart and end before `right`.
+    a label is drawn whole if it fits, shortened to the characters fitting
+    if they are at least `min_chars`, or dropped and ``0`` is returned.
+    '''
+    rows = np.asarray(rows)
+    lefts = np.asarray(lefts, dtype = float)
+    lengths = np.asarray(lengths, dtype = int)
+    chars = np.zeros(len(lengths), dtype = int)
+    if not len(lengths):
+        return chars
+    order = np.lexsort((lefts, rows))
+    rows, lefts, lengths = rows[order], lefts[order], lengths[order]
+    shown = lengths > 0
+    '''a dropped label gives more space to the previous one, and never drops
+    another label, so two passes are enough'''
+    for dropping in (True, False):
+        fit = np.floor(_available(rows, lefts, right, shown) / char_width).astype(int) - 1
+        fit = np.where(fit >= lengths, lengths, np.where(fit >= min_chars, fit, 0))
+        if dropping:
+            shown &= fit > 0
+    chars[order] = np.where(shown, fit, 0)
+    return chars
+
+
+def truncate(name, chars):
+    '''`name` shortened to `chars` characters, ending with an ellipsis'''
+    if chars >= len(name):
+        return name
+    return name[:max(chars - len(ELLIPSIS), 0)] + ELLIPSIS
@@ -0,0 +1,167 @@
+'''
+Created on 19/ott/2026
+
+Raster output drawing the tracks in parallel.
+
+The tracks of a panel are stacked axes sharing the X scale, but matplotlib
+draws them one after the other. With the :func:`~biograpy.drawer.Panel.save`
+`workers` option the panel is laid out once, described by a
+:class:`~biograpy.scene.Scene`, and the image is cut in one horizontal band
+for each track, from the top of its axes to the top of the next one. Every
+band is drawn by a worker process from the scene of its track and of the
+neighbouring ones, as :mod:`biograpy.striprender` draws a strip, and the
+bands are written one below the other to the PNG or TIFF file. The html map
+comes from the layout, as with :func:`~biograpy.drawer.Panel.save`::
+
+    panel.save('genes.png', workers = 4)
+
+`workers` can also be a :class:`multiprocessing.Pool`, to avoid starting
+new processes for every image.
+
+'''
+
+from multiprocessing import Pool
+import numpy as np
+from matplotlib.backends.backend_agg import RendererAgg
+from biograpy import striprender
+from biograpy.scene import build_scene, _draw_scene, Scene
+
+
+def bands(scene):
+    '''
+    returns the ``(top, rows, axes)`` bands of `scene`, `top` and `rows` in
+    pixels from the top of the image, `axes` the index of the track axes of
+    the band
+    '''
+    height = int(scene.data['size'][1] * scene.data['dpi'])
+    cuts = [0]
+    for entry in scene.data['axes'][1:]:
+        left, bottom, width, axes_height = entry['rect']
+        cuts.append(min(max(int(round((1 - bottom - axes_height) * height)), cuts[-1]), height))
+    cuts.append(height)
+    return [(top, end - top, n) for n, (top, end) in enumerate(zip(cuts[:-1], cuts[1:])) if end > top]
+
+
+def _display_y(entry, y, height):
+    '''display Y coordinates of the data `y` of the axes `entry`'''
+    left, bottom, width, axes_height = entry['rect']
+    ymin, ymax = entry['ylim']
+    return (bottom + (np.asarray(y, dtype = float) - ymin) / (ymax - ymin) * axes_height) * height
+
+
+def _crop(entry, low, high, height, dpi):
+    '''the axes `entry` without the glyphs and labels out of the display Y
+    range from `low` to `high`'''
+    glyphs = []
+    for glyph in entry['glyphs']:
+        ys = _display_y(entry, glyph[2][1::2], height)
+        if len(ys) and (ys.max() >= low) and (ys.min() <= high):
+            glyphs.append(glyph)
+    labels = []
+    for label in entry['labels']:
+        y = _display_y(entry, label[2], height)
+        reach = 2 * label[3] * dpi / 72.
+        if (y + reach >= low) and (y - reach <= high):
+            labels.append(label)
+    entry = dict(entry)
+    entry.update(glyphs = glyphs, labels = labels)
+    return entry
+
+
+def band_scene(scene, axes, top = None, rows = None):
+    '''
+    the scene of the track axes `axes` and of the track axes around it. if
+    the band `top` and `rows` are given, the glyphs and labels of the axes
+    around it not reaching the band are left out
+    '''
+    data = dict(scene.data)
+    first = max(axes - 1, 0)
+    data['axes'] = scene.data['axes'][first: axes + 2]
+    if top is not None:
+        height = int(scene.data['size'][1] * scene.data['dpi'])
+        low = height - top - rows - striprender.MARGIN
+        high = height - top + striprender.MARGIN
+        data['axes'] = [entry if n + first == axes else _crop(entry, low, high, height, scene.data['dpi'])
+                        for n, entry in enumerate(data['axes'])]
+    return Scene(data)
+
+
+def _figure_extents(fig, renderer):
+    '''``(ymin, ymax, artists)`` for each axes and for each artist of the
+    axes of `fig`, in display coordinates'''
+    extents = []
+    for axis in fig.axes:
+        try:
+            bbox = axis.get_tightbbox(renderer)
+        except Exception:
+            continue
+        extents.append((bbox.ymin, bbox.ymax, [axis]))
+        for artist in axis.patches + axis.lines + axis.texts + axis.collections + axis.artists:
+            extent = striprender._extent([artist], renderer)
+            if extent is not None:
+                extents.append((extent[0], extent[1], [artist]))
+    return extents
+
+
+def render_band(data, top, rows):
+    '''
+    returns the RGBA array of the `rows` pixel rows from `top` of the
+    image of the scene `data`
+    '''
+    fig, features = _draw_scene(Scene(data))
+    height = int(fig.bbox.height)
+    extents = _figure_extents(fig, RendererAgg(1, 1, fig.dpi))
+    colors = striprender._savefig_colors(fig)
+    try:
+        return striprender.draw_strip(fig, extents, height - top - rows, rows).copy()
+    finally:
+        striprender._restore_colors(fig, colors)
+
+
+def _render_band(args):
+    return render_band(*args)
+
+
+def render_bands(scene, pool):
+    '''yields the bands of `scene` drawn by the processes of `pool`, from
+    the top'''
+    tasks = [(band_scene(scene, axes, top, rows).data, top, rows) for top, rows, axes in bands(scene)]
+    for band in pool.imap(_render_band, tasks):
+        yield band
+
+
+def save(panel, output, workers = None, format = None, xmin = None, xmax = None):
+    '''
+    write the image of `panel` to `output`, a file path or a file-like
+    object, drawing the bands of its tracks in `workers`, a
+    :class:`multiprocessing.Pool` or the number of processes of a new pool,
+    by default the number of cpus. `format` can be ``'png'``, ``'tif'`` or
+    ``'tiff'``, and is taken from the file extension of a path if not given
+    '''
+    format = striprender.output_format(output, format)
+    scene = build_scene(panel, xmin = xmin, xmax = xmax)
+    width = int(scene.data['size'][0] * scene.data['dpi'])
+    height = int(scene.data['size'][1] * scene.data['dpi'])
+    own_pool = (workers is None) or isinstance(workers, (int, long))
+    if own_pool:
+        pool = Pool(workers)
+    else:
+        pool = workers
+    if isinstance(output, basestring):
+        fh = open(output, 'wb')
+    else:
+        fh = output
+    try:
+        strips = render_bands(scene, pool)
+        if format == 'png':
+            striprender.write_png(fh, width, height, strips, dpi = scene.data['dpi'])
+        else:
+            rows = max([band_rows for top, band_rows, axes in bands(scene)])
+            striprender.write_tiff(fh, width, height, striprender.uniform_strips(strips, rows),
+                                   dpi = scene.data['dpi'])
+    finally:
+        if own_pool:
+            pool.terminate()
+            pool.join()
+        if fh is not output:
+            fh.close()
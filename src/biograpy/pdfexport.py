@@ -0,0 +1,83 @@
+'''
+Created on 19/ott/2026
+
+Multi-page PDF export.
+
+:class:`PDFBatch` writes many panels as the pages of a single PDF file. Each
+page is written to the file as soon as its panel is added, while fonts,
+transparency states and markers are written once for the whole file by the
+matplotlib PDF backend. Panels are closed after their page is written, so
+only the panel being drawn is kept in memory when the panels are given by a
+generator::
+
+    def panels():
+        for record in records:
+            yield SeqRecordDrawer(record, fig_width = 1000)
+
+    save_pdf(panels(), 'report.pdf')
+
+'''
+
+from matplotlib.backends.backend_pdf import PdfPages
+
+
+class PDFBatch(object):
+    '''
+
+    Collects panels as pages of a PDF file.
+
+    ``batch = PDFBatch('report.pdf')``
+
+    gives a batch writing to ``report.pdf``, `output` can also be a file-like
+    object. Add pages with :func:`add` and call :func:`close` to finish the
+    file, or use it in a ``with`` statement::
+
+        with PDFBatch('report.pdf') as batch:
+            for panel in panels:
+                batch.add(panel)
+
+    '''
+
+    def __init__(self, output):
+        self.pages = PdfPages(output)
+        self.count = 0# pages written
+
+    def add(self, panel, xmin = None, xmax = None, close = True):
+        '''
+        write `panel`, a :class:`~biograpy.drawer.Panel` or a
+        :class:`~biograpy.seqrecord.SeqRecordDrawer`, as a new page.
+        `xmin` and `xmax` are passed to :func:`~biograpy.drawer.Panel.save`.
+        the panel is closed after writing unless `close` is ``False``
+        '''
+        panel = getattr(panel, 'panel', panel)# the panel of a SeqRecordDrawer
+        try:
+            panel.save(self.pages, format = 'pdf', xmin = xmin, xmax = xmax)
+            self.count += 1
+        finally:
+            if close:
+                panel.close()
+
+    def close(self):
+        '''write the shared resources and finish the file'''
+        self.pages.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def save_pdf(panels, output):
+    '''
+    write every panel of the `panels` iterable as a page of the PDF file
+    `output`, a file path or a file-like object. the panels are closed.
+    returns the number of pages
+    '''
+    batch = PDFBatch(output)
+    try:
+        for panel in panels:
+            batch.add(panel)
+    finally:
+        batch.close()
+    return batch.count
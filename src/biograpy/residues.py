@@ -0,0 +1,80 @@
+'''
+Created on 19/ott/2026
+
+Per-residue annotations.
+
+Predictors describe proteins with a label for each residue, such as the
+DSSP secondary structure ``'--HHHHHH--EEEE-'`` or the topology
+``'iiiiMMMMMMMMoooo'``. :func:`segments` classifies the labels of a string
+or an array, splits them in runs of the same kind with one vectorized pass,
+and gives the ``(start, end)`` extents of the runs of each kind, as used by
+:meth:`biograpy.features.SecStructFeature.from_string` and
+:meth:`biograpy.features.TMFeature.from_string`::
+
+    feat = SecStructFeature.from_string('--HHHHHH--EEEE-', filter_struct_length = 3)
+
+Residue ``i`` of the labels spans from ``offset + i`` to ``offset + i + 1``,
+as the locations of Biopython SeqFeatures.
+
+'''
+
+import numpy as np
+
+'''DSSP secondary structure codes, the other labels are coil'''
+DSSP_CODES = dict(alphah = 'HGI', betas = 'EB', coil = None)
+'''transmembrane topology codes, as given by TMHMM and Phobius'''
+TOPOLOGY_CODES = dict(TM = 'M', cyto = 'iI', non_cyto = 'oO')
+
+
+def label_array(labels):
+    '''`labels` as a numpy array, strings give an array of characters'''
+    if isinstance(labels, unicode):
+        labels = labels.encode('ascii')
+    if isinstance(labels, str):
+        return np.frombuffer(labels, dtype = 'S1')
+    return np.asarray(labels)
+
+
+def run_lengths(labels):
+    '''
+    returns the ``(starts, ends, values)`` arrays of the runs of equal
+    values of the `labels` array, `ends` excluded
+    '''
+    labels = np.asarray(labels)
+    if not len(labels):
+        return np.zeros(0, dtype = int), np.zeros(0, dtype = int), labels[:0]
+    changes = np.flatnonzero(labels[1:] != labels[:-1]) + 1
+    starts = np.concatenate(([0], changes))
+    ends = np.concatenate((changes, [len(labels)]))
+    return starts, ends, labels[starts]
+
+
+def segments(labels, codes, offset = 0, min_length = 0, filtered = ()):
+    '''
+    returns a dict with a list of ``(start, end)`` extents of the runs of
+    `labels` for each key of `codes`. `codes` maps each key to the label
+    values of its runs, as a string of characters or a sequence of values,
+    or to ``None`` for the runs of all the other labels. adjacent labels of
+    the same key make one run. runs of the keys in `filtered` shorter than 
+    `min_length` residues are left out.
+    '''
+    labels = label_array(labels)
+    keys = sorted(codes)
+    classes = np.empty(len(labels), dtype = int)
+    classes.fill(-1)
+    for i, key in enumerate(keys):
+        if codes[key] is not None:
+            classes[np.in1d(labels, label_array(codes[key]))] = i
+    others = [i for i, key in enumerate(keys) if codes[key] is None]
+    if others:
+        classes[classes == -1] = others[0]
+    starts, ends, values = run_lengths(classes)
+    starts = starts + offset
+    ends = ends + offset
+    extents = {}
+    for i, key in enumerate(keys):
+        mask = values == (others[0] if (codes[key] is None and others) else i)
+        if min_length and (key in filtered):
+            mask &= (ends - starts) >= min_length
+        extents[key] = np.column_stack((starts[mask], ends[mask])).tolist()
+    return extents
@@ -0,0 +1,389 @@
+'''
+Created on 19/ott/2026
+
+Serializable scene descriptions.
+
+:func:`build_scene` lays out a :class:`~biograpy.drawer.Panel` and records
+what is drawn as a :class:`Scene`: the figure size, the rectangles, limits,
+ticks and decorations of the track axes, the feature glyphs as paths in data
+coordinates sharing a table of styles, the feature names and the colorbars.
+A scene only holds numbers and strings, so it can be cached or sent to other
+processes as JSON or msgpack, and drawn there by :func:`render_scene` in any
+matplotlib format, without features, tracks or layout::
+
+    data = build_scene(panel).dumps()
+    ...
+    htmlmap = render_scene(Scene.loads(data), 'panel.png')
+
+'''
+
+import json
+import warnings
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import Collection, LineCollection
+from matplotlib.colors import colorConverter, Normalize, LogNorm
+from matplotlib.font_manager import FontProperties
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch, PathPatch
+from matplotlib.path import Path
+from matplotlib.text import Annotation
+import matplotlib.cm as cm
+import matplotlib.colorbar
+
+VERSION = 1
+FORMATS = ('json', 'msgpack')
+'''decimals kept for coordinates and colors'''
+PRECISION = 4
+
+
+def _round(values):
+    return [round(float(value), PRECISION) for value in values]
+
+def _rgba(color, alpha = None):
+    return _round(colorConverter.to_rgba(color, alpha))
+
+def _flat(vertices):
+    return _round(vertices.ravel())
+
+
+class Scene(object):
+    '''
+
+    A laid out panel, built by :func:`build_scene`. `data` is a dictionary
+    of lists, numbers and strings:
+
+        ===================== ==================================================
+        Key                   Description
+        ===================== ==================================================
+        version               format version, ``1``
+        size                  figure width and height in inches
+        dpi                   figure resolution
+        styles                glyph styles, referenced by index by the glyphs:
+                              ``['patch', facecolor, edgecolor, linewidth,
+                              linestyle, zorder]`` or ``['line', color,
+                              linewidth, linestyle, marker, markersize,
+                              markerfacecolor, markeredgecolor, zorder]``
+        features              ``[name, url, html_map_extend, map_regions]``
+                              of the drawn features, for the html map
+        axes                  one dictionary for each track axes, with the
+                              ``rect``, ``xlim`` and ``ylim`` of the axes, the
+                              visible ``spines``, the ``xaxis`` and ``yaxis``
+                              ticks, the track name ``texts``, the ``grid``
+                              lines, the feature ``glyphs``, the feature name
+                              ``labels``, ``legend`` and ``colorbar``
+        ===================== ==================================================
+
+    a glyph is ``[style, feature, vertices, codes, label]``, with the
+    vertices flattened as ``x0, y0, x1, y1...``, the path `codes` or
+    ``None`` and the legend `label` or ``None``. a text is ``[text, x, y,
+    size, family, weight, style, ha, va, color, rotation]``.
+
+    '''
+
+    def __init__(self, data):
+        if data.get('version') != VERSION:
+            raise ValueError('Unsupported scene version: %s' % data.get('version'))
+        self.data = data
+
+    def dumps(self, format = 'json'):
+        '''the scene as a ``'json'`` or ``'msgpack'`` string. msgpack
+        requires the msgpack package'''
+        if format == 'json':
+            return json.dumps(self.data, separators = (',', ':'))
+        elif format == 'msgpack':
+            import msgpack
+            return msgpack.packb(self.data)
+        raise ValueError('Unknown scene format: %s' % format)
+
+    @classmethod
+    def loads(cls, data, format = 'json'):
+        '''the scene serialized by :func:`dumps`'''
+        if format == 'json':
+            return cls(json.loads(data))
+        elif format == 'msgpack':
+            import msgpack
+            return cls(msgpack.unpackb(data))
+        raise ValueError('Unknown scene format: %s' % format)
+
+    def render(self, output, **kwargs):
+        '''same as :func:`render_scene`'''
+        return render_scene(self, output, **kwargs)
+
+
+class _SceneBuilder(object):
+    '''records the artists of a drawn panel'''
+
+    def __init__(self):
+        self.styles = []
+        self._style_index = {}
+        self.features = []
+
+    def style(self, style):
+        key = repr(style)
+        if key not in self._style_index:
+            self._style_index[key] = len(self.styles)
+            self.styles.append(style)
+        return self._style_index[key]
+
+    def glyphs(self, artist, offset, feature):
+        '''glyphs of a feature artist, in data coordinates'''
+        label = artist.get_label()
+        if (not label) or label.startswith('_'):
+            label = None
+        if isinstance(artist, Line2D):
+            xy = artist.get_xydata().copy()
+            xy[:, 1] += offset
+            style = ['line', _rgba(artist.get_color(), artist.get_alpha()), artist.get_linewidth(),
+                     artist.get_linestyle(), artist.get_marker(), artist.get_markersize(),
+                     _rgba(artist.get_markerfacecolor(), artist.get_alpha()),
+                     _rgba(artist.get_markeredgecolor(), artist.get_alpha()), artist.get_zorder()]
+            return [[self.style(style), feature, _flat(xy), None, label]]
+        if isinstance(artist, Patch):
+            paths = [artist.get_patch_transform().transform_path(artist.get_path())]
+            styles = [['patch', _round(artist.get_facecolor()), _round(artist.get_edgecolor()),
+                       artist.get_linewidth(), artist.get_linestyle(), artist.get_zorder()]]
+        elif isinstance(artist, Collection):
+            if not len(artist.get_paths()):
+                return []
+            paths = artist.get_paths()
+            facecolors = [_round(color) for color in artist.get_facecolors()] or [[0, 0, 0, 0]]
+            edgecolors = [_round(color) for color in artist.get_edgecolors()] or [[0, 0, 0, 0]]
+            '''collection colors are cycled over the paths'''
+            styles = [['patch', facecolors[i % len(facecolors)], edgecolors[i % len(edgecolors)],
+                       artist.get_linewidths()[0], self.collection_linestyle(artist), artist.get_zorder()]
+                      for i in range(max(len(facecolors), len(edgecolors)))]
+        else:
+            warnings.warn('could not record artist: %s' % artist)
+            return []
+        styles = [self.style(style) for style in styles]
+        glyphs = []
+        for i, path in enumerate(paths):
+            vertices = path.vertices.copy()
+            vertices[:, 1] += offset
+            codes = path.codes
+            if codes is not None:
+                codes = [int(code) for code in codes]
+            glyphs.append([styles[i % len(styles)], feature, _flat(vertices), codes, label])
+            label = None# one legend entry for a collection
+        return glyphs
+
+    @staticmethod
+    def collection_linestyle(collection):
+        '''the collection dashes, as a matplotlib line style'''
+        linestyles = collection.get_linestyles()
+        if (not len(linestyles)) or (linestyles[0][1] is None):
+            return 'solid'
+        return 'dashed'
+
+    @staticmethod
+    def text(text, x, y):
+        font = text.get_fontproperties()
+        return [text.get_text(), round(float(x), PRECISION), round(float(y), PRECISION),
+                font.get_size_in_points(), font.get_family()[0], font.get_weight(), font.get_style(),
+                text.get_horizontalalignment(), text.get_verticalalignment(),
+                _rgba(text.get_color()), text.get_rotation()]
+
+    @staticmethod
+    def ticks(axis, minor):
+        '''``[locations, labels, size, pad]`` of the major or minor ticks'''
+        if minor:
+            locations = list(axis.get_minorticklocs())
+            formatter = axis.get_minor_formatter()
+            ticks = axis.get_minor_ticks(len(locations))
+        else:
+            locations = list(axis.get_majorticklocs())
+            formatter = axis.get_major_formatter()
+            ticks = axis.get_major_ticks(len(locations))
+        formatter.set_locs(locations)
+        labels = [formatter(location, i) for i, location in enumerate(locations)]
+        size = pad = None
+        if ticks:
+            size = ticks[0].label1.get_size()
+            pad = ticks[0].get_pad()
+        return [_round(locations), labels, size, pad]
+
+    def axis(self, axis):
+        position = axis.get_ticks_position()
+        if position not in ('top', 'bottom', 'left', 'right'):
+            position = 'default'
+        return dict(position = position,
+                    major = self.ticks(axis, False),
+                    minor = self.ticks(axis, True))
+
+    def axes(self, panel, track, entry):
+        axis = entry['axis']
+        spines = [name for name, spine in axis.spines.items() if spine.get_edgecolor()[3] > 0]
+        texts = [self.text(text, *text.get_position()) for text in axis.texts]
+        grid = None
+        if entry['grid'] is not None:
+            segments = entry['grid'].get_segments()
+            grid = dict(x = _round([segment[0][0] for segment in segments]),
+                        colors = [_round(color) for color in entry['grid'].get_colors()])
+        glyphs = []
+        labels = []
+        for feat in track.drawn_features():
+            index = len(self.features)
+            self.features.append([feat.name if isinstance(feat.name, basestring) else '',
+                                  feat.url, feat.html_map_extend,
+                                  [list(region) for region in getattr(feat, 'map_regions', None) or ()]])
+            for patch in feat.patches:
+                glyphs.extend(self.glyphs(patch, feat.offset, index))
+            for name in feat.feat_name:
+                if isinstance(name, Annotation):
+                    labels.append(self.text(name, *name.xytext))
+                else:
+                    labels.append(self.text(name, *name.get_position()))
+        colorbar = None
+        if entry['cb_axis'] is not None:
+            norm = track.norm
+            colorbar = dict(rect = _round(entry['cb_axis'].get_position().bounds),
+                            cmap = track.cm.name,
+                            vmin = getattr(norm, 'vmin', None),
+                            vmax = getattr(norm, 'vmax', None),
+                            log = isinstance(norm, LogNorm),
+                            alpha = track.cb_alpha,
+                            label = track.cb_label)
+        return dict(rect = _round(axis.get_position().bounds),
+                    xlim = _round(axis.get_xlim()),
+                    ylim = _round(axis.get_ylim()),
+                    spines = spines,
+                    xaxis = self.axis(axis.xaxis),
+                    yaxis = self.axis(axis.yaxis),
+                    texts = texts,
+                    grid = grid,
+                    glyphs = glyphs,
+                    labels = labels,
+                    legend = axis.get_legend() is not None,
+                    colorbar = colorbar)
+
+
+def build_scene(panel, xmin = None, xmax = None):
+    '''
+    lay out `panel`, a :class:`~biograpy.drawer.Panel` or a
+    :class:`~biograpy.seqrecord.SeqRecordDrawer`, for the X range from
+    `xmin` to `xmax` and returns its :class:`Scene`. the panel is not closed
+    '''
+    panel = getattr(panel, 'panel', panel)# the panel of a SeqRecordDrawer
+    panel._draw_tracks(xmin = xmin, xmax = xmax)
+    builder = _SceneBuilder()
+    axes = []
+    for track in panel.tracks:
+        entry = panel._track_cache.get(id(track))
+        if track.features and (entry is not None):
+            axes.append(builder.axes(panel, track, entry))
+    return Scene(dict(version = VERSION,
+                      size = _round(panel.fig.get_size_inches()),
+                      dpi = panel.fig.get_dpi(),
+                      styles = builder.styles,
+                      features = builder.features,
+                      axes = axes))
+
+
+class _SceneFeature(object):
+    '''the html map attributes and the artists of a feature of a scene'''
+
+    def __init__(self, name, url, html_map_extend, map_regions = ()):
+        self.name = name
+        self.url = url
+        self.html_map_extend = html_map_extend
+        self.map_regions = map_regions
+        self.patches = []
+
+
+def _set_ticks(axis, ticks, minor):
+    locations, labels, size, pad = ticks
+    axis.set_ticks(locations, minor = minor)
+    if size is None:
+        axis.set_ticklabels(labels, minor = minor)
+    else:
+        axis.set_ticklabels(labels, minor = minor, fontsize = size)
+    if pad is not None:
+        try:
+            axis.set_tick_params(which = minor and 'minor' or 'major', pad = pad)
+        except: pass #not supported in matplotlib <1
+
+def _add_text(axis, text, artist = False):
+    text, x, y, size, family, weight, style, ha, va, color, rotation = text
+    font = FontProperties(family = family, style = style, weight = weight, size = size)
+    return axis.text(x, y, text, fontproperties = font, horizontalalignment = ha,
+                     verticalalignment = va, color = color, rotation = rotation)
+
+def _draw_scene(scene):
+    '''returns the figure and the features of `scene`'''
+    data = scene.data
+    fig = Figure(figsize = data['size'], dpi = data['dpi'], frameon = False)
+    FigureCanvasAgg(fig)
+    styles = data['styles']
+    features = [_SceneFeature(*feature) for feature in data['features']]
+    for n, entry in enumerate(data['axes']):
+        axis = fig.add_axes(entry['rect'], label = 'biograpy axes %i' % n)
+        for name, spine in axis.spines.items():
+            if name not in entry['spines']:
+                spine.set_color('none')
+        axis.xaxis.set_ticks_position(entry['xaxis']['position'])
+        axis.yaxis.set_ticks_position(entry['yaxis']['position'])
+        for ticks_axis, ticks in ((axis.xaxis, entry['xaxis']), (axis.yaxis, entry['yaxis'])):
+            _set_ticks(ticks_axis, ticks['major'], False)
+            _set_ticks(ticks_axis, ticks['minor'], True)
+        for text in entry['texts']:
+            _add_text(axis, text)
+        if entry['grid'] is not None:
+            grid = LineCollection([[(x, 0), (x, 1)] for x in entry['grid']['x']],
+                                  colors = entry['grid']['colors'],
+                                  linestyles = 'dotted', zorder = -1,
+                                  transform = axis.get_xaxis_transform())
+            axis.add_collection(grid, autolim = False)
+        for style_index, feature, vertices, codes, label in entry['glyphs']:
+            style = styles[style_index]
+            xy = [vertices[i:i + 2] for i in range(0, len(vertices), 2)]
+            if style[0] == 'line':
+                kind, color, lw, ls, marker, ms, mfc, mec, zorder = style
+                artist = Line2D([x for x, y in xy], [y for x, y in xy], color = color, lw = lw, ls = ls,
+                                marker = marker, markersize = ms, markerfacecolor = mfc,
+                                markeredgecolor = mec, zorder = zorder)
+                axis.add_line(artist)
+            else:
+                kind, fc, ec, lw, ls, zorder = style
+                artist = PathPatch(Path(xy, codes), fc = fc, ec = ec, lw = lw, ls = ls, zorder = zorder)
+                axis.add_patch(artist)
+            if label is not None:
+                artist.set_label(label)
+            features[feature].patches.append(artist)
+        for text in entry['labels']:
+            _add_text(axis, text)
+        axis.set_xlim(entry['xlim'])
+        axis.set_ylim(entry['ylim'])
+        colorbar = entry['colorbar']
+        if colorbar is not None:
+            cb_axis = fig.add_axes(colorbar['rect'], label = 'biograpy colorbar %i' % n)
+            norm = (colorbar['log'] and LogNorm or Normalize)(colorbar['vmin'], colorbar['vmax'])
+            cb = matplotlib.colorbar.ColorbarBase(cb_axis, cmap = cm.get_cmap(colorbar['cmap']),
+                                                  norm = norm, alpha = colorbar['alpha'],
+                                                  orientation = 'vertical')
+            if colorbar['label']:
+                cb.set_label(colorbar['label'])
+            for label in cb_axis.get_yticklabels():
+                label.set_fontsize('xx-small')
+        if entry['legend']:
+            legend_font = FontProperties()
+            legend_font.set_size('x-small')
+            legend_font.set_family('serif')
+            legend_font.set_weight('normal')
+            axis.legend(prop = legend_font)
+    return fig, features
+
+
+def render_scene(scene, output, format = None, html_target = '_self', **kwargs):
+    '''
+    draw `scene` to `output`, a file path or a file-like object, as
+    :func:`~biograpy.drawer.Panel.save` does. `format` is required for file
+    objects, other `kwargs` are passed to matplotlib ``savefig``.
+    returns the html map of the features
+    '''
+    from biograpy.drawer import feature_boxes, html_map
+    fig, features = _draw_scene(scene)
+    htmlmap = html_map(feature_boxes(features, fig), target = html_target)
+    fig.savefig(output, dpi = fig.get_dpi(), format = format, **kwargs)
+    return htmlmap
@@ -72,6 +72,12 @@ class SeqRecordDrawer(object):
         self.panel.save(output,**kwargs)
         self.panel.close()
 
+    def render_async(self, output, loop = None, executor = None, **kwargs):
+        '''asyncio variant of :func:`save`, returns a future. see 
+        :func:`biograpy.asyncrender.save_async`'''
+        from biograpy import asyncrender
+        return asyncrender.save_async(self.panel, output, loop = loop, executor = executor, close = True, **kwargs)
+
     def imagemap(self, **kwargs):
         return self.panel.imagemap(**kwargs)
 
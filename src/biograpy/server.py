@@ -0,0 +1,516 @@
+'''
+Created on 19/ott/2026
+
+Local HTTP render service.
+
+Panels are described by a JSON spec and rendered by a pool of pre-forked
+worker processes, each one keeping matplotlib imported and a
+:class:`~biograpy.figurepool.FigurePool` of warm figures::
+
+    biograpy-server --port 8080 --workers 4
+
+``POST /render`` with a JSON spec returns a JSON object with the base64
+encoded `image`, its `format` and the `htmlmap`.
+``GET /metrics`` returns the service counters, latency and throughput.
+
+Panels are closed with ``release_artists = True``. With a memory ceiling,
+given by ``--max-worker-memory``, a worker above it after a render frees its
+idle figures and collects garbage, and if it is still above it the workers
+are replaced, see :mod:`biograpy.diagnostics`.
+
+A spec looks like::
+
+    {"panel": {"fig_width": 900, "grid": "both"},
+     "format": "png",
+     "xmin": 1, "xmax": 1000,
+     "tracks": [{"type": "BaseTrack", "name": "genes",
+                 "features": [{"type": "Simple", "start": 10, "end": 400,
+                               "name": "feat1"},
+                              {"type": "SegmentedFeature", "start": 500,
+                               "end": 900, "segments": [[500, 600], [800, 900]],
+                               "strand": 1}]},
+                {"type": "PlotTrack", "ymin": 0, "ymax": 10,
+                 "features": [{"type": "BarPlotFeature", "y": [1, 5, 3],
+                               "x": [100, 200, 300]}]}]}
+
+Feature and track keys other than `type` and `features` are passed as
+keyword arguments. Only features that do not need Biopython objects or local
+files can be used.
+
+'''
+
+import base64
+import gc
+import json
+import signal
+import threading
+import time
+from collections import deque
+from multiprocessing import Pool, TimeoutError
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from SocketServer import ThreadingMixIn
+from cStringIO import StringIO
+
+FEATURE_TYPES = ('Simple', 'GeneSeqFeature', 'TextSequence', 'PlotFeature',
+                 'BarPlotFeature', 'SegmentedFeature', 'SinglePositionFeature',
+                 'TMFeature', 'SecStructFeature', 'DomainFeature')
+TRACK_TYPES = ('BaseTrack', 'PlotTrack')
+FORMATS = dict(png = 'image/png', svg = 'image/svg+xml')
+LATENCY_SAMPLES = 1000
+
+
+class SpecError(ValueError):
+    '''raised for invalid panel specs'''
+
+
+class QueueFull(Exception):
+    '''raised when no more requests can be queued'''
+
+
+class RenderTimeout(Exception):
+    '''raised when a render does not complete in time'''
+
+
+def _kwargs(spec, exclude = ()):
+    '''JSON keys are unicode, keyword arguments must be str'''
+    return dict([(str(key), value) for key, value in spec.items() if key not in exclude])
+
+
+def build_panel(spec, **kwargs):
+    '''
+    returns a :class:`~biograpy.drawer.Panel` filled with the tracks and
+    features of a spec. `kwargs` are passed to the panel (eg.
+    `figure_pool`). raises :class:`SpecError` if the spec is not valid.
+    '''
+    from biograpy import features, tracks
+    from biograpy.drawer import Panel
+    if not isinstance(spec, dict):
+        raise SpecError('The spec must be a JSON object')
+    panel_kwargs = _kwargs(spec.get('panel', {}), exclude = ('figure_pool',))
+    panel_kwargs.update(kwargs)
+    try:
+        panel = Panel(**panel_kwargs)
+    except TypeError, e:
+        raise SpecError('Invalid panel options: %s' % e)
+    for track_spec in spec.get('tracks', []):
+        if not isinstance(track_spec, dict):
+            raise SpecError('Tracks must be JSON objects')
+        track_type = track_spec.get('type', 'BaseTrack')
+        if track_type not in TRACK_TYPES:
+            raise SpecError('Unsupported track type: %s' % track_type)
+        feats = []
+        for feat_spec in track_spec.get('features', []):
+            if not isinstance(feat_spec, dict):
+                raise SpecError('Features must be JSON objects')
+            feat_type = feat_spec.get('type', 'Simple')
+            if feat_type not in FEATURE_TYPES:
+                raise SpecError('Unsupported feature type: %s' % feat_type)
+            feat_kwargs = _kwargs(feat_spec, exclude = ('type',))
+            if feat_type in ('GeneSeqFeature', 'SinglePositionFeature'):
+                feat_kwargs.setdefault('feature', None)
+            try:
+                feats.append(getattr(features, feat_type)(**feat_kwargs))
+            except (TypeError, ValueError, KeyError), e:
+                raise SpecError('Invalid %s feature: %s' % (feat_type, e))
+        try:
+            track = getattr(tracks, track_type)(*feats, **_kwargs(track_spec, exclude = ('type', 'features')))
+        except (TypeError, ValueError), e:
+            raise SpecError('Invalid %s track: %s' % (track_type, e))
+        panel.add_track(track)
+    return panel
+
+
+def render_spec(spec, figure_pool = None):
+    '''
+    render a spec and returns a dict with the `image` data, its `format` and
+    `content_type` and the `htmlmap`
+    '''
+    if not isinstance(spec, dict):
+        raise SpecError('The spec must be a JSON object')
+    format = spec.get('format', 'png')
+    if format not in FORMATS:
+        raise SpecError('Unsupported format: %s' % format)
+    panel = build_panel(spec, figure_pool = figure_pool, release_artists = True)
+    try:
+        output = StringIO()
+        panel.save(output, format = str(format),
+                   html_target = str(spec.get('html_target', '_self')),
+                   xmin = spec.get('xmin', None),
+                   xmax = spec.get('xmax', None))
+        if not hasattr(panel, 'htmlmap'):# only done by Panel.save for bitmaps
+            panel._create_html_map(target = str(spec.get('html_target', '_self')))
+        return dict(image = output.getvalue(),
+                    format = format,
+                    content_type = FORMATS[format],
+                    htmlmap = panel.htmlmap)
+    finally:
+        panel.close()
+
+
+'''worker process state'''
+_worker_pool = None
+_worker_max_memory = None
+
+def _init_worker(max_figures = 2, warm = True, max_memory = None):
+    '''pool initializer: import matplotlib once and render a small panel to
+    load fonts and caches before the first request'''
+    global _worker_pool, _worker_max_memory
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from biograpy.figurepool import FigurePool
+    _worker_pool = FigurePool(max_size = max_figures)
+    _worker_max_memory = max_memory
+    if warm:
+        render_spec(dict(tracks = [dict(features = [dict(start = 1, end = 10, name = 'warm')])]),
+                     figure_pool = _worker_pool)
+
+def _check_memory():
+    '''returns the worker memory in bytes and ``'ok'``, ``'trimmed'`` if the
+    idle figures and garbage were freed to stay under the ceiling or
+    ``'over_limit'``'''
+    from biograpy.diagnostics import memory_usage
+    memory = memory_usage()
+    if (not _worker_max_memory) or (memory <= _worker_max_memory):
+        return memory, 'ok'
+    _worker_pool.clear()
+    gc.collect()
+    memory = memory_usage()
+    if memory <= _worker_max_memory:
+        return memory, 'trimmed'
+    return memory, 'over_limit'
+
+def _render_in_worker(spec):
+    '''errors are returned instead of raised, so that the result callback is
+    always called'''
+    start = time.time()
+    try:
+        result = 'ok', render_spec(spec, figure_pool = _worker_pool), time.time() - start
+    except SpecError, e:
+        result = 'spec_error', str(e), time.time() - start
+    except Exception, e:
+        result = 'error', '%s: %s' % (e.__class__.__name__, e), time.time() - start
+    return result + _check_memory()
+
+
+class Metrics(object):
+    '''thread safe service counters'''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.completed = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.memory_trims = 0
+        self.worker_recycles = 0
+        self.worker_memory = 0
+        self.in_flight = 0
+        self.latencies = deque(maxlen = LATENCY_SAMPLES)
+        self.render_times = deque(maxlen = LATENCY_SAMPLES)
+        self.completion_times = deque(maxlen = LATENCY_SAMPLES)
+
+    def count(self, counter):
+        self.lock.acquire()
+        try:
+            setattr(self, counter, getattr(self, counter) + 1)
+        finally:
+            self.lock.release()
+
+    def task_started(self):
+        self.lock.acquire()
+        try:
+            self.requests += 1
+            self.in_flight += 1
+        finally:
+            self.lock.release()
+
+    def task_done(self, render_time, memory = 0):
+        self.lock.acquire()
+        try:
+            self.in_flight -= 1
+            self.render_times.append(render_time)
+            self.worker_memory = max(self.worker_memory, memory)
+        finally:
+            self.lock.release()
+
+    def request_done(self, latency):
+        self.lock.acquire()
+        try:
+            self.completed += 1
+            self.latencies.append(latency)
+            self.completion_times.append(time.time())
+        finally:
+            self.lock.release()
+
+    @staticmethod
+    def _summary(samples):
+        if not samples:
+            return dict(count = 0)
+        ordered = sorted(samples)
+        def percentile(p):
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000.
+        return dict(count = len(ordered),
+                    mean = sum(ordered) / len(ordered) * 1000.,
+                    p50 = percentile(.5),
+                    p95 = percentile(.95),
+                    p99 = percentile(.99),
+                    max = ordered[-1] * 1000.)
+
+    def snapshot(self):
+        '''returns a dict of the counters, latencies are in milliseconds and
+        throughput in renders per second'''
+        self.lock.acquire()
+        try:
+            now = time.time()
+            uptime = now - self.started
+            last_minute = len([t for t in self.completion_times if t >= now - 60])
+            return dict(uptime = uptime,
+                        requests = self.requests,
+                        completed = self.completed,
+                        errors = self.errors,
+                        timeouts = self.timeouts,
+                        rejected = self.rejected,
+                        memory_trims = self.memory_trims,
+                        worker_recycles = self.worker_recycles,
+                        worker_memory = self.worker_memory,
+                        in_flight = self.in_flight,
+                        throughput = uptime and self.completed / uptime or 0.,
+                        throughput_last_minute = last_minute / min(max(uptime, 1.), 60.),
+                        latency_ms = self._summary(self.latencies),
+                        render_ms = self._summary(self.render_times),)
+        finally:
+            self.lock.release()
+
+
+class RenderService(object):
+    '''
+
+    Dispatches specs to a pool of render worker processes.
+
+    Valid keyword arguments for :class:`RenderService` are:
+
+        ===================== ==================================================
+        Key                   Description
+        ===================== ==================================================
+        workers               number of worker processes. default is ``2``
+        queue_size            renders that can wait for a free worker, further
+                              requests are rejected. default is ``16``
+        timeout               seconds to wait for a render. default is ``30``
+        max_tasks_per_child   renders after which a worker is replaced.
+                              default is ``None``, workers are never replaced
+        warm                  ``True`` | ``False``. render a small panel when
+                              each worker starts. default is ``True``
+        max_worker_memory     memory ceiling of a worker in megabytes. a worker
+                              above it after a render frees its idle figures,
+                              if it is still above it the workers are 
+                              replaced. default is ``None``, no ceiling
+        ===================== ==================================================
+
+    A render that times out is reported to the client and its workers are
+    terminated and replaced, so a stuck or lost render (eg. of a worker that
+    died) gives back its place in the queue and its worker. The other 
+    renders running on the same workers are lost and time out as well.
+    The `worker_memory` metric is the largest worker memory reported after a
+    render, in bytes.
+
+    '''
+
+    def __init__(self, workers = 2, queue_size = 16, timeout = 30.,
+                 max_tasks_per_child = None, warm = True, max_worker_memory = None):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        self.warm = warm
+        self.max_worker_memory = max_worker_memory
+        self.metrics = Metrics()
+        self._slots = threading.Semaphore(workers + queue_size)
+        self._pool_lock = threading.Lock()
+        self.pool = self._new_pool()
+
+    def _new_pool(self):
+        max_memory = None
+        if self.max_worker_memory:
+            max_memory = int(self.max_worker_memory * 1024 * 1024)
+        return Pool(self.workers, initializer = _init_worker,
+                    initargs = (2, self.warm, max_memory),
+                    maxtasksperchild = self.max_tasks_per_child)
+
+    def _recycle_pool(self, pool, terminate = False):
+        '''replace `pool` with new workers, its pending renders complete 
+        unless `terminate` is ``True``'''
+        self._pool_lock.acquire()
+        try:
+            if pool is not self.pool:# already replaced
+                return
+            self.pool = self._new_pool()
+        finally:
+            self._pool_lock.release()
+        self.metrics.count('worker_recycles')
+        if terminate:
+            closing = threading.Thread(target = pool.terminate)
+        else:
+            pool.close()
+            closing = threading.Thread(target = pool.join)
+        closing.daemon = True
+        closing.start()
+
+    def render(self, spec, timeout = None):
+        '''render a spec in a worker, see :func:`render_spec`.
+        raises :class:`QueueFull`, :class:`RenderTimeout` or
+        :class:`SpecError`'''
+        if timeout is None:
+            timeout = self.timeout
+        if not self._slots.acquire(False):
+            self.metrics.count('rejected')
+            raise QueueFull('Render queue is full')
+        start = time.time()
+        self.metrics.task_started()
+        pool = self.pool
+        slot = [True]
+        def release_slot():
+            '''called when the render completes or times out, the first call
+            releases the slot'''
+            try:
+                slot.pop()
+            except IndexError:
+                return
+            self._slots.release()
+        def done(result):
+            self.metrics.task_done(result[2], result[3])
+            if result[4] == 'trimmed':
+                self.metrics.count('memory_trims')
+            elif result[4] == 'over_limit':
+                self._recycle_pool(pool)
+            release_slot()
+        async_result = pool.apply_async(_render_in_worker, (spec,), callback = done)
+        try:
+            status, result, render_time, memory, memory_status = async_result.get(timeout)
+        except TimeoutError:
+            self._recycle_pool(pool, terminate = True)# kill the stuck worker
+            release_slot()
+            self.metrics.count('timeouts')
+            raise RenderTimeout('Render did not complete in %s seconds' % timeout)
+        if status == 'spec_error':
+            self.metrics.count('errors')
+            raise SpecError(result)
+        if status != 'ok':
+            self.metrics.count('errors')
+            raise RuntimeError(result)
+        self.metrics.request_done(time.time() - start)
+        return result
+
+    def stats(self):
+        stats = self.metrics.snapshot()
+        stats.update(workers = self.workers, queue_size = self.queue_size,
+                     timeout = self.timeout, max_worker_memory = self.max_worker_memory)
+        return stats
+
+    def close(self):
+        '''stop the worker processes'''
+        self.pool.terminate()
+        self.pool.join()
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    '''handles ``POST /render`` and ``GET /metrics``'''
+
+    server_version = 'biograpy'
+
+    def _send_json(self, code, data):
+        body = json.dumps(data)
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.split('?')[0] == '/metrics':
+            self._send_json(200, self.server.service.stats())
+        else:
+            self._send_json(404, dict(error = 'Not found'))
+
+    def do_POST(self):
+        if self.path.split('?')[0] != '/render':
+            self._send_json(404, dict(error = 'Not found'))
+            return
+        try:
+            length = int(self.headers.getheader('Content-Length') or 0)
+            spec = json.loads(self.rfile.read(length))
+        except ValueError, e:
+            self._send_json(400, dict(error = 'Invalid JSON: %s' % e))
+            return
+        try:
+            result = self.server.service.render(spec)
+        except SpecError, e:
+            self._send_json(400, dict(error = str(e)))
+        except QueueFull, e:
+            self._send_json(503, dict(error = str(e)))
+        except RenderTimeout, e:
+            self._send_json(504, dict(error = str(e)))
+        except RuntimeError, e:
+            self._send_json(500, dict(error = str(e)))
+        else:
+            result['image'] = base64.b64encode(result['image'])
+            self._send_json(200, result)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class RenderServer(ThreadingMixIn, HTTPServer):
+    '''threaded HTTP server dispatching to a :class:`RenderService`'''
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, service, verbose = False):
+        HTTPServer.__init__(self, address, RenderRequestHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+def main(argv = None):
+    '''command line server::
+
+        biograpy-server [options]
+    '''
+    from optparse import OptionParser
+    parser = OptionParser(usage = '%prog [options]')
+    parser.add_option('--host', default = '127.0.0.1',
+                      help = 'address to listen on [%default]')
+    parser.add_option('--port', type = 'int', default = 8080,
+                      help = 'port to listen on [%default]')
+    parser.add_option('--workers', type = 'int', default = 2,
+                      help = 'number of render processes [%default]')
+    parser.add_option('--queue-size', type = 'int', default = 16,
+                      help = 'renders waiting for a worker before rejecting requests [%default]')
+    parser.add_option('--timeout', type = 'float', default = 30.,
+                      help = 'render timeout in seconds [%default]')
+    parser.add_option('--max-tasks-per-child', type = 'int', default = None,
+                      help = 'replace a worker after this number of renders')
+    parser.add_option('--max-worker-memory', type = 'float', default = None,
+                      help = 'memory ceiling of a render process in megabytes')
+    parser.add_option('-v', '--verbose', action = 'store_true', default = False,
+                      help = 'log requests')
+    options, args = parser.parse_args(argv)
+    service = RenderService(workers = options.workers,
+                            queue_size = options.queue_size,
+                            timeout = options.timeout,
+                            max_tasks_per_child = options.max_tasks_per_child,
+                            max_worker_memory = options.max_worker_memory)
+    server = RenderServer((options.host, options.port), service, verbose = options.verbose)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    service.close()
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,399 @@
+'''
+Created on 19/ott/2026
+
+Data sources for per-position signals (coverage, conservation scores, ...)
+too big to be loaded in memory as python lists.
+
+Signals are stored on disk as a flat binary array of numbers, one value per
+position, optionally preceded by a fixed size header. They are memory mapped
+so only the bytes falling inside the drawn window are actually read, and are
+reduced to one value per pixel before being handed to matplotlib.
+
+A data source must expose:
+
+* `start` and `end` positions of the signal in the coordinate system
+* a `fetch(xmin, xmax, bins)` method returning a tuple of numpy arrays
+  ``(x, ymin, ymax, ymean)`` with at most `bins` values
+
+'''
+
+import os
+import struct
+import numpy as np
+
+
+def bin_signal(values, bins = None):
+    '''
+    reduce `values` to at most `bins` consecutive bins.
+    returns a tuple of arrays ``(first, ymin, ymax, ymean, counts)`` where
+    `first` is the index of the first value of each bin in `values`.
+    if `bins` is ``None`` or greater than ``len(values)`` one bin per value is
+    returned.
+    '''
+    n = len(values)
+    if (not bins) or (n <= bins):
+        ys = np.asarray(values, dtype = np.float64)
+        return np.arange(n), ys, ys, ys, np.ones(n, dtype = np.int64)
+    first = np.linspace(0, n, bins + 1).astype(np.int64)[:-1]
+    counts = np.diff(np.append(first, n))
+    ymin = np.minimum.reduceat(values, first).astype(np.float64)
+    ymax = np.maximum.reduceat(values, first).astype(np.float64)
+    ymean = np.add.reduceat(values, first, dtype = np.float64) / counts
+    return first, ymin, ymax, ymean, counts
+
+
+class MemmapSignal(object):
+    '''
+
+    Memory mapped view of a flat binary array storing one value per position.
+    Opening the file costs nothing, data is read only when :func:`fetch` is
+    called and only for the requested window.
+
+    ``signal = MemmapSignal('coverage.f32', dtype = 'float32', start = 1)``
+
+    Valid keyword arguments for :class:`MemmapSignal` are:
+
+        ===================== ==================================================
+        Key                   Description
+        ===================== ==================================================
+        dtype                 numpy dtype of the stored values. default is
+                              ``'float32'``, use ``'int16'``, ``'<i2'``, etc.
+                              for other formats
+        offset                header size in bytes to skip at the beginning of
+                              the file. default is ``0``
+        start                 coordinate of the first value in the file.
+                              default is ``1``
+        length                number of values to map. default is ``None`` and
+                              will be computed from the file size
+        ===================== ==================================================
+
+    '''
+
+    def __init__(self, path, dtype = 'float32', offset = 0, start = 1, length = None):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.offset = int(offset)
+        if length is None:
+            length = (os.path.getsize(path) - self.offset) // self.dtype.itemsize
+        self.length = int(length)
+        self.start = start
+        self.end = start + self.length - 1
+        self._data = None
+
+    def _get_data(self):
+        if self._data is None:
+            self._data = np.memmap(self.path,
+                                   dtype = self.dtype,
+                                   mode = 'r',
+                                   offset = self.offset,
+                                   shape = (self.length,))
+        return self._data
+
+    data = property(_get_data, doc = 'the memory mapped numpy array')
+
+    def window(self, xmin = None, xmax = None):
+        '''returns the array indexes ``(lo, hi)`` of the values falling
+        between `xmin` and `xmax` included'''
+        lo = 0
+        hi = self.length
+        if xmin is not None:
+            lo = min(max(int(xmin) - self.start, 0), self.length)
+        if xmax is not None:
+            hi = min(max(int(xmax) - self.start + 1, 0), self.length)
+        return lo, max(lo, hi)
+
+    def fetch(self, xmin = None, xmax = None, bins = None):
+        '''
+        returns ``(x, ymin, ymax, ymean)`` for the values falling between
+        `xmin` and `xmax`, reduced to at most `bins` values.
+        X values are the center of each bin.
+        '''
+        lo, hi = self.window(xmin, xmax)
+        first, ymin, ymax, ymean, counts = bin_signal(self.data[lo:hi], bins)
+        x = self.start + lo + first + (counts - 1) / 2.
+        return x, ymin, ymax, ymean
+
+    def close(self):
+        '''drop the memory map'''
+        self._data = None
+
+
+'''Multi resolution summaries
+
+A zoom file stores precomputed summaries of a signal at successive 2x
+reductions, so that a zoomed out view only reads a number of records
+proportional to the number of pixels, whatever the size of the window.
+
+File layout (little endian)::
+
+    magic           4 bytes  'BGPZ'
+    version         uint32
+    start           int64    coordinate of the first value
+    length          uint64   number of values in the original signal
+    levels          uint32   number of zoom levels
+    reserved        uint32
+    for each level:
+        bin_size    uint64   number of positions summarized by each record
+        count       uint64   number of records
+        offset      uint64   file offset of the first record
+    raw source (from version 2):
+        dtype       16 bytes numpy dtype of the raw values, '' if unknown
+        offset      uint64   header bytes of the raw file
+        path length uint16
+        path        utf-8 path of the raw file, relative to the zoom file
+    records         ZOOM_DTYPE arrays, one per level
+
+'''
+
+ZOOM_MAGIC = 'BGPZ'
+ZOOM_VERSION = 2
+ZOOM_HEADER = struct.Struct('<4sIqQII')
+ZOOM_LEVEL = struct.Struct('<QQQ')
+ZOOM_RAW = struct.Struct('<16sQH')
+ZOOM_DTYPE = np.dtype([('min', '<f4'), ('max', '<f4'), ('mean', '<f4'), ('count', '<u4')])
+
+
+def _summarize(values, bin_size):
+    '''summarize raw `values` in records of `bin_size` positions,
+    NaN values are considered missing'''
+    values = np.asarray(values, dtype = np.float64)
+    pad = (-len(values)) % bin_size
+    if pad:
+        values = np.append(values, np.empty(pad) * np.nan)
+    values = values.reshape(-1, bin_size)
+    valid = ~np.isnan(values)
+    records = np.zeros(len(values), dtype = ZOOM_DTYPE)
+    counts = valid.sum(1)
+    sums = np.where(valid, values, 0.).sum(1)
+    records['min'] = np.where(valid, values, np.inf).min(1)
+    records['max'] = np.where(valid, values, -np.inf).max(1)
+    records['count'] = counts
+    records['mean'] = sums / np.maximum(counts, 1)
+    return records
+
+
+def _merge_pairs(records):
+    '''merge consecutive couples of zoom records'''
+    if len(records) % 2:
+        empty = np.zeros(1, dtype = ZOOM_DTYPE)
+        empty['min'] = np.inf
+        empty['max'] = -np.inf
+        records = np.append(records, empty)
+    records = records.reshape(-1, 2)
+    merged = np.zeros(len(records), dtype = ZOOM_DTYPE)
+    counts = records['count'].astype(np.float64)
+    total = counts.sum(1)
+    merged['min'] = records['min'].min(1)
+    merged['max'] = records['max'].max(1)
+    merged['count'] = total
+    merged['mean'] = (records['mean'] * counts).sum(1) / np.maximum(total, 1)
+    return merged
+
+
+def build_zoom_file(signal, output, first_bin = 2, chunk_size = 1 << 22):
+    '''
+    build a zoom file from a :class:`MemmapSignal` (or any object exposing
+    `start`, `length` and a `data` array), writing to the `output` path.
+    the first level summarizes `first_bin` positions per record, every
+    following level halves the resolution until a single record is left.
+    data are processed in chunks of `chunk_size` values so memory usage does
+    not depend on the signal length. the path, dtype and offset of a 
+    :class:`MemmapSignal` are stored, so that :func:`open_signal` reads the
+    raw values when zoomed in past the finest level.
+    '''
+    raw_path = ''
+    raw_dtype = ''
+    raw_offset = 0
+    if getattr(signal, 'path', None):
+        raw_path = os.path.relpath(os.path.abspath(signal.path), 
+                                   os.path.dirname(os.path.abspath(output))).encode('utf-8')
+        raw_dtype = signal.dtype.str
+        raw_offset = signal.offset
+    bin_sizes = []
+    bin_size = first_bin
+    while True:
+        bin_sizes.append(bin_size)
+        if bin_size >= signal.length:
+            break
+        bin_size *= 2
+    counts = [-(-signal.length // b) for b in bin_sizes]
+    offset = ZOOM_HEADER.size + ZOOM_LEVEL.size * len(bin_sizes) + ZOOM_RAW.size + len(raw_path)
+    offsets = []
+    for count in counts:
+        offsets.append(offset)
+        offset += count * ZOOM_DTYPE.itemsize
+
+    fh = open(output, 'w+b')
+    fh.write(ZOOM_HEADER.pack(ZOOM_MAGIC, ZOOM_VERSION, signal.start, signal.length, len(bin_sizes), 0))
+    for level in zip(bin_sizes, counts, offsets):
+        fh.write(ZOOM_LEVEL.pack(*level))
+    fh.write(ZOOM_RAW.pack(raw_dtype, raw_offset, len(raw_path)) + raw_path)
+    '''first level from raw data '''
+    step = max(chunk_size // first_bin, 1) * first_bin
+    for lo in xrange(0, signal.length, step):
+        fh.write(_summarize(signal.data[lo:lo + step], first_bin).tostring())
+    '''following levels from the previous one '''
+    step = max(chunk_size // 2, 1) * 2
+    for level in range(1, len(bin_sizes)):
+        fh.flush()
+        previous = np.memmap(output, dtype = ZOOM_DTYPE, mode = 'r',
+                             offset = offsets[level - 1], shape = (counts[level - 1],))
+        fh.seek(offsets[level])
+        for lo in xrange(0, counts[level - 1], step):
+            fh.write(_merge_pairs(previous[lo:lo + step]).tostring())
+        del previous
+    fh.close()
+
+
+def is_zoom_file(path):
+    '''``True`` if `path` is a zoom file built by :func:`build_zoom_file`'''
+    fh = open(path, 'rb')
+    magic = fh.read(len(ZOOM_MAGIC))
+    fh.close()
+    return magic == ZOOM_MAGIC
+
+
+class ZoomSignal(object):
+    '''
+
+    Reads a zoom file built by :func:`build_zoom_file`.
+    :func:`fetch` picks the coarsest zoom level that still gives at least one
+    record per requested bin, so any window is drawn reading a number of
+    records proportional to the pixel width.
+
+    When the window is too narrow for the finest zoom level the values are
+    read from the `raw` data source if given, eg. the
+    :class:`MemmapSignal` the zoom file was built from, as returned by 
+    :func:`open_raw`.
+
+    ``signal = ZoomSignal('coverage.bgz', raw = MemmapSignal('coverage.f32'))``
+
+    '''
+
+    def __init__(self, path, raw = None):
+        self.path = path
+        self.raw = raw
+        fh = open(path, 'rb')
+        magic, version, self.start, self.length, nlevels, reserved = ZOOM_HEADER.unpack(fh.read(ZOOM_HEADER.size))
+        if magic != ZOOM_MAGIC:
+            raise ValueError('%s is not a zoom file' % path)
+        if version not in (1, ZOOM_VERSION):
+            raise ValueError('Unsupported zoom file version: %i' % version)
+        self.levels = []
+        for i in range(nlevels):
+            bin_size, count, offset = ZOOM_LEVEL.unpack(fh.read(ZOOM_LEVEL.size))
+            self.levels.append(dict(bin_size = bin_size, count = count, offset = offset, data = None))
+        self.raw_path = None
+        if version >= 2:
+            dtype, self.raw_offset, size = ZOOM_RAW.unpack(fh.read(ZOOM_RAW.size))
+            self.raw_dtype = dtype.rstrip('\0')
+            if size:
+                self.raw_path = os.path.join(os.path.dirname(os.path.abspath(path)), 
+                                             fh.read(size).decode('utf-8'))
+        fh.close()
+        self.end = self.start + self.length - 1
+
+    def open_raw(self):
+        '''returns a :class:`MemmapSignal` of the raw file the zoom file was
+        built from, or ``None`` if it is not known or was removed'''
+        if (self.raw_path is None) or (not os.path.exists(self.raw_path)):
+            return None
+        return MemmapSignal(self.raw_path, dtype = self.raw_dtype, offset = self.raw_offset, 
+                            start = self.start, length = self.length)
+
+    def _level_data(self, level):
+        if level['data'] is None:
+            level['data'] = np.memmap(self.path, dtype = ZOOM_DTYPE, mode = 'r',
+                                      offset = level['offset'], shape = (level['count'],))
+        return level['data']
+
+    def select_level(self, span, bins):
+        '''returns the coarsest zoom level with at least `bins` records in
+        `span` positions, or ``None`` if raw data should be used'''
+        selected = None
+        if bins:
+            for level in self.levels:
+                if level['bin_size'] * bins <= span:
+                    selected = level
+        if (selected is None) and (self.raw is None):
+            selected = self.levels[0]
+        return selected
+
+    def fetch(self, xmin = None, xmax = None, bins = None):
+        '''
+        returns ``(x, ymin, ymax, ymean)`` for the values falling between
+        `xmin` and `xmax`, reduced to at most `bins` values.
+        '''
+        if xmin is None:
+            xmin = self.start
+        if xmax is None:
+            xmax = self.end
+        xmin = max(int(xmin), self.start)
+        xmax = min(int(xmax), self.end)
+        level = self.select_level(xmax - xmin + 1, bins)
+        if level is None:
+            return self.raw.fetch(xmin, xmax, bins)
+        bin_size = level['bin_size']
+        lo = (xmin - self.start) // bin_size
+        hi = max((xmax - self.start) // bin_size + 1, lo)
+        records = self._level_data(level)[lo:hi]
+        covered = np.flatnonzero(records['count'] > 0)
+        records = records[covered]
+        n = len(records)
+        if not n:
+            empty = np.array([])
+            return empty, empty, empty, empty
+        positions = self.start + (lo + covered) * bin_size
+        first = np.arange(n)
+        if bins and (n > bins):
+            first = np.linspace(0, n, bins + 1).astype(np.int64)[:-1]
+        counts = records['count'].astype(np.float64)
+        ymin = np.minimum.reduceat(records['min'], first).astype(np.float64)
+        ymax = np.maximum.reduceat(records['max'], first).astype(np.float64)
+        ymean = np.add.reduceat(records['mean'] * counts, first) / np.add.reduceat(counts, first)
+        last = np.append(first[1:], n) - 1
+        x = (positions[first] + positions[last] + bin_size - 1) / 2.
+        return x, ymin, ymax, ymean
+
+    def close(self):
+        '''drop the memory maps'''
+        for level in self.levels:
+            level['data'] = None
+
+
+def open_signal(path, raw = None, **kwargs):
+    '''returns a :class:`ZoomSignal` if `path` is a zoom file, a
+    :class:`MemmapSignal` built with `kwargs` otherwise. zoom files read 
+    the values of the `raw` data source when zoomed in past their finest 
+    level, by default of the raw file they were built from'''
+    if is_zoom_file(path):
+        signal = ZoomSignal(path, raw = raw)
+        if signal.raw is None:
+            signal.raw = signal.open_raw()
+        return signal
+    return MemmapSignal(path, **kwargs)
+
+
+def main(argv = None):
+    '''command line zoom file builder::
+
+        biograpy-zoom [options] signal_file zoom_file
+    '''
+    import sys
+    from optparse import OptionParser
+    parser = OptionParser(usage = '%prog [options] signal_file zoom_file')
+    parser.add_option('--dtype', default = 'float32', help = 'numpy dtype of the signal values [%default]')
+    parser.add_option('--offset', type = 'int', default = 0, help = 'header bytes to skip [%default]')
+    parser.add_option('--start', type = 'int', default = 1, help = 'coordinate of the first value [%default]')
+    parser.add_option('--first-bin', type = 'int', default = 2, dest = 'first_bin',
+                      help = 'positions per record in the finest zoom level [%default]')
+    options, args = parser.parse_args(argv)
+    if len(args) != 2:
+        parser.error('a signal file and an output zoom file are required')
+    signal = MemmapSignal(args[0], dtype = options.dtype, offset = options.offset, start = options.start)
+    build_zoom_file(signal, args[1], first_bin = options.first_bin)
+    return 0
+
+
+if __name__ == '__main__':
+    main()
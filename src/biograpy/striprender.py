@@ -0,0 +1,288 @@
+'''
+Created on 19/ott/2026
+
+Raster output in horizontal strips.
+
+The height of a panel grows with the rows of its tracks, and matplotlib
+draws a raster image on a single canvas of the whole figure. With the
+:func:`~biograpy.drawer.Panel.save` `strip_height` option the panel is drawn
+in strips of `strip_height` pixels, each one on a canvas of its own, and the
+strips are compressed and written to the PNG or TIFF file as soon as they are
+drawn. The memory used by the image is given by the figure width and
+`strip_height`, not by the figure height::
+
+    panel.save('genes.png', strip_height = 512)
+
+Every strip draws the figure moved up by the height of the strips below it,
+so the image is the one written by matplotlib, but for the antialiasing of
+lines crossing the strip edges, that can differ by one color level. Features
+and axes lying out of a strip are hidden while drawing it.
+
+'''
+
+import zlib
+import struct
+import numpy as np
+import matplotlib
+from matplotlib.backends.backend_agg import RendererAgg
+
+FORMATS = ('png', 'tif', 'tiff')
+'''pixels drawn around the measured artist extents, for line widths and
+antialiasing'''
+MARGIN = 8
+
+
+def _extent(artists, renderer):
+    '''returns the display Y extent of `artists`, or ``None`` if it cannot
+    be measured'''
+    ys = []
+    for artist in artists:
+        try:
+            bbox = artist.get_window_extent(renderer)
+        except Exception:
+            return None
+        ys.append(bbox.ymin)
+        ys.append(bbox.ymax)
+    if not ys:
+        return None
+    return min(ys), max(ys)
+
+
+def _panel_extents(panel, renderer):
+    '''returns ``(ymin, ymax, artists)`` for the axes and for the features
+    of a drawn panel, in display coordinates'''
+    extents = []
+    for entry in panel._track_cache.values():
+        for axis in (entry['axis'], entry['cb_axis']):
+            if axis is not None:
+                try:
+                    bbox = axis.get_tightbbox(renderer)
+                except Exception:
+                    continue
+                extents.append((bbox.ymin, bbox.ymax, [axis]))
+    for feature in panel.Drawn_objects:
+        artists = list(feature.patches) + list(feature.feat_name)
+        extent = _extent(artists, renderer)
+        if extent is not None:
+            extents.append((extent[0], extent[1], artists))
+    return extents
+
+
+def _savefig_colors(fig):
+    '''set the figure patch colors used by savefig, returns the previous
+    ones for :func:`_restore_colors`'''
+    colors = fig.get_frameon(), fig.get_facecolor(), fig.get_edgecolor()
+    fig.set_frameon(matplotlib.rcParams['savefig.frameon'])
+    fig.set_facecolor(matplotlib.rcParams['savefig.facecolor'])
+    fig.set_edgecolor(matplotlib.rcParams['savefig.edgecolor'])
+    return colors
+
+
+def _restore_colors(fig, colors):
+    frameon, facecolor, edgecolor = colors
+    fig.set_frameon(frameon)
+    fig.set_facecolor(facecolor)
+    fig.set_edgecolor(edgecolor)
+
+
+def draw_strip(fig, extents, bottom, rows):
+    '''
+    returns the RGBA array of the `rows` pixel rows of `fig` above `bottom`,
+    in display coordinates. the artists of the ``(ymin, ymax, artists)``
+    `extents` lying out of the strip are hidden while drawing it
+    '''
+    dpi = fig.dpi
+    width, height = int(fig.bbox.width), int(fig.bbox.height)
+    top = bottom + rows
+    points = fig.bbox_inches.get_points().copy()
+    moved = points.copy()
+    moved[:, 1] -= bottom / dpi
+    hidden = []
+    for ymin, ymax, artists in extents:
+        if (ymax + MARGIN < bottom) or (ymin - MARGIN > top):
+            hidden.extend([artist for artist in artists if artist.get_visible()])
+    fig.bbox_inches.set_points(moved)
+    for artist in hidden:
+        artist.set_visible(False)
+    try:
+        '''as the canvas of the whole figure, paths are flipped by the
+        integer height and texts by the height with its fraction'''
+        renderer = RendererAgg(fig.bbox.width, rows + fig.bbox.height - height, dpi)
+        fig.draw(renderer)
+    finally:
+        for artist in hidden:
+            artist.set_visible(True)
+        fig.bbox_inches.set_points(points)
+    return np.frombuffer(renderer.buffer_rgba(), np.uint8).reshape(rows, width, 4)
+
+
+def render_strips(panel, strip_height):
+    '''
+    yields the image of a panel already drawn by
+    :func:`~biograpy.drawer.Panel._draw_tracks` as RGBA arrays of
+    `strip_height` rows, from the top. the last strip can be shorter.
+    '''
+    fig = panel.fig
+    height = int(fig.bbox.height)
+    extents = _panel_extents(panel, RendererAgg(1, 1, fig.dpi))
+    '''the figure patch is drawn as savefig does'''
+    colors = _savefig_colors(fig)
+    try:
+        top = height
+        while top > 0:
+            rows = min(strip_height, top)
+            bottom = top - rows
+            yield draw_strip(fig, extents, bottom, rows)
+            top = bottom
+    finally:
+        _restore_colors(fig, colors)
+
+
+def uniform_strips(strips, rows):
+    '''yields the pixel rows of `strips`, of any height, in strips of
+    `rows` rows, as TIFF strips must be. the last strip can be shorter'''
+    pending = []
+    count = 0
+    for strip in strips:
+        pending.append(strip)
+        count += strip.shape[0]
+        if count >= rows:
+            joined = np.concatenate(pending)
+            while len(joined) >= rows:
+                yield joined[:rows]
+                joined = joined[rows:]
+            pending = [joined]
+            count = len(joined)
+    if count:
+        yield np.concatenate(pending)
+
+
+def _horizontal_differences(strip):
+    '''each byte minus the same sample of the previous pixel, the PNG Sub
+    filter and the TIFF horizontal predictor'''
+    rows = strip.reshape(strip.shape[0], -1)
+    differences = rows.copy()
+    differences[:, 4:] -= rows[:, :-4]
+    return differences
+
+
+def _png_chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+
+def write_png(fh, width, height, strips, dpi = None):
+    '''write the RGBA `strips` as a `width` x `height` PNG image to `fh`'''
+    fh.write('\x89PNG\r\n\x1a\n')
+    fh.write(_png_chunk('IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+    if dpi:
+        dots_per_meter = int(round(dpi / 0.0254))
+        fh.write(_png_chunk('pHYs', struct.pack('>IIB', dots_per_meter, dots_per_meter, 1)))
+    compressor = zlib.compressobj(6)
+    for strip in strips:
+        rows = np.empty((strip.shape[0], width * 4 + 1), np.uint8)
+        rows[:, 0] = 1# Sub filter
+        rows[:, 1:] = _horizontal_differences(strip)
+        data = compressor.compress(rows.tostring())
+        if data:
+            fh.write(_png_chunk('IDAT', data))
+    fh.write(_png_chunk('IDAT', compressor.flush()))
+    fh.write(_png_chunk('IEND', ''))
+
+
+'''TIFF field types: (struct code, bytes)'''
+SHORT, LONG, RATIONAL = 3, 4, 5
+TIFF_TYPES = {SHORT : ('H', 2), LONG : ('I', 4), RATIONAL : ('II', 8)}
+
+
+def write_tiff(fh, width, height, strips, dpi = None):
+    '''write the RGBA `strips` as a `width` x `height` deflate compressed
+    TIFF image to `fh`, that must be seekable'''
+    start = fh.tell()
+    fh.write('II*\x00\x00\x00\x00\x00')# the IFD offset is written at the end
+    offsets = []
+    counts = []
+    rows_per_strip = None
+    for strip in strips:
+        if rows_per_strip is None:
+            rows_per_strip = strip.shape[0]
+        data = zlib.compress(_horizontal_differences(strip).tostring(), 6)
+        offsets.append(fh.tell() - start)
+        counts.append(len(data))
+        fh.write(data)
+    if (fh.tell() - start) % 2:
+        fh.write('\x00')
+    fields = [(256, LONG, [width]),
+              (257, LONG, [height]),
+              (258, SHORT, [8, 8, 8, 8]),# bits per sample
+              (259, SHORT, [8]),# deflate compression
+              (262, SHORT, [2]),# RGB
+              (273, LONG, offsets),
+              (277, SHORT, [4]),# samples per pixel
+              (278, LONG, [rows_per_strip or height]),
+              (279, LONG, counts),
+              (284, SHORT, [1]),# chunky planar configuration
+              (317, SHORT, [2]),# horizontal predictor
+              (338, SHORT, [2]),]# unassociated alpha
+    if dpi:
+        fields.extend([(282, RATIONAL, [int(round(dpi * 100)), 100]),
+                       (283, RATIONAL, [int(round(dpi * 100)), 100]),
+                       (296, SHORT, [2]),])# inches
+    fields.sort()
+    ifd_offset = fh.tell() - start
+    values_offset = ifd_offset + 2 + 12 * len(fields) + 4
+    entries = []
+    values = []
+    for tag, field_type, field_values in fields:
+        code, size = TIFF_TYPES[field_type]
+        count = len(field_values) * size / struct.calcsize('<' + code)
+        data = struct.pack('<' + code[0] * len(field_values), *field_values)
+        if len(data) <= 4:
+            entries.append(struct.pack('<HHI', tag, field_type, count) + data.ljust(4, '\x00'))
+        else:
+            entries.append(struct.pack('<HHII', tag, field_type, count, values_offset))
+            values.append(data)
+            values_offset += len(data)
+    fh.write(struct.pack('<H', len(fields)) + ''.join(entries) + struct.pack('<I', 0) + ''.join(values))
+    end = fh.tell()
+    fh.seek(start + 4)
+    fh.write(struct.pack('<I', ifd_offset))
+    fh.seek(end)
+
+
+def save(panel, output, strip_height, format = None):
+    '''
+    write the image of a panel drawn by
+    :func:`~biograpy.drawer.Panel._draw_tracks` to `output`, a file path or a
+    file-like object, drawing it in strips of `strip_height` pixels. `format`
+    can be ``'png'``, ``'tif'`` or ``'tiff'``, and is taken from the file
+    extension of a path if not given
+    '''
+    format = output_format(output, format)
+    fig = panel.fig
+    width, height = int(fig.bbox.width), int(fig.bbox.height)
+    strips = render_strips(panel, int(strip_height))
+    if isinstance(output, basestring):
+        fh = open(output, 'wb')
+    else:
+        fh = output
+    try:
+        if format == 'png':
+            write_png(fh, width, height, strips, dpi = fig.dpi)
+        else:
+            write_tiff(fh, width, height, strips, dpi = fig.dpi)
+    finally:
+        strips.close()
+        if fh is not output:
+            fh.close()
+
+
+def output_format(output, format = None):
+    '''returns the raster format of `output`, raises ``ValueError`` if it
+    cannot be written in strips'''
+    if format is None:
+        format = 'png'
+        if isinstance(output, basestring) and ('.' in output):
+            format = output.rsplit('.', 1)[1].lower()
+    if format not in FORMATS:
+        raise ValueError('Only png and tiff images can be written in strips, not %s' % format)
+    return format
@@ -0,0 +1,235 @@
+'''
+Created on 19/ott/2026
+
+Shared glyph definitions for SVG output.
+
+The matplotlib SVG backend writes the full path data and style of every
+patch. :func:`share_glyphs` rewrites an SVG document so that:
+
+* paths drawn more than once with the same shape, such as genes of the same
+  length, exons, markers and grid lines, are defined once in ``<defs>`` and
+  placed with ``<use>``
+* rectangles without a stroke are drawn from a single unit square scaled
+  with a ``transform``, since scaling does not change how they look
+* styles used more than once become CSS classes
+* clip paths are dropped from the glyphs lying well inside their clip
+  rectangle, which is the case for most of the features
+
+Everything else, including the ``<a>`` links and ids of the features, is left
+as written by matplotlib. Use it through :func:`~biograpy.drawer.Panel.save`::
+
+    panel.save('genes.svg', shared_glyphs = True)
+
+'''
+
+import re
+
+PATH_RE = re.compile(r'<path\s([^>]*?)\s*/>', re.S)
+ATTR_RE = re.compile(r'([\w:-]+)="([^"]*)"')
+TOKEN_RE = re.compile(r'[A-Za-z]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+SVG_START_RE = re.compile(r'<svg\s[^>]*>')
+CLIP_RECT_RE = re.compile(r'<clipPath\s+id="([^"]+)"\s*>\s*<rect\s([^>]*?)\s*/>', re.S)
+
+'''path commands with absolute coordinate pairs, as written by matplotlib'''
+PAIR_COMMANDS = {'M' : 1, 'L' : 1, 'Q' : 2, 'C' : 3}
+UNIT_SQUARE = 'M 0 0 L 1 0 L 1 1 L 0 1 z'
+'''glyphs take these from the <use>, not from the matplotlib * CSS rule'''
+INHERITED_STYLE = 'stroke-linecap:inherit;stroke-linejoin:inherit;stroke-miterlimit:inherit;'
+
+
+def _number(value):
+    '''short text of a coordinate, rounded to 1/1000 of a pixel'''
+    text = '%.3f' % value
+    text = text.rstrip('0').rstrip('.')
+    if text == '-0':
+        text = '0'
+    return text
+
+
+def _parse_path(d):
+    '''returns a list of ``(command, [(x, y), ...])`` or ``None`` if the
+    path uses commands not written by matplotlib'''
+    tokens = TOKEN_RE.findall(d)
+    commands = []
+    i = 0
+    while i < len(tokens):
+        command = tokens[i]
+        i += 1
+        if command in ('z', 'Z'):
+            commands.append((command, []))
+            continue
+        if command not in PAIR_COMMANDS:
+            return None
+        n = PAIR_COMMANDS[command] * 2
+        try:
+            values = [float(token) for token in tokens[i:i + n]]
+        except ValueError:
+            return None
+        if len(values) != n:
+            return None
+        i += n
+        commands.append((command, zip(values[::2], values[1::2])))
+    if not commands or commands[0][0] != 'M':
+        return None
+    return commands
+
+
+def _rectangle(commands):
+    '''returns ``(x, y, width, height)`` if the path is an axis aligned
+    rectangle'''
+    names = [command for command, points in commands]
+    if names not in (['M', 'L', 'L', 'L', 'z'], ['M', 'L', 'L', 'L', 'L', 'z']):
+        return None
+    points = [points[0] for command, points in commands if points]
+    if len(points) == 5:
+        if points[4] != points[0]:
+            return None
+        points = points[:4]
+    for i in range(4):
+        (x1, y1), (x2, y2) = points[i], points[(i + 1) % 4]
+        if (x1 != x2) and (y1 != y2):
+            return None
+    xs = [x for x, y in points]
+    ys = [y for x, y in points]
+    if (len(set(xs)) != 2) or (len(set(ys)) != 2):
+        return None
+    return min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)
+
+
+def _shape(commands):
+    '''returns the path moved to the origin and its original position'''
+    x0, y0 = commands[0][1][0]
+    parts = []
+    for command, points in commands:
+        parts.append(command)
+        for x, y in points:
+            parts.append(_number(x - x0))
+            parts.append(_number(y - y0))
+    return ' '.join(parts), x0, y0
+
+
+def _stroke_width(style):
+    declarations = dict([item.split(':', 1) for item in style.split(';') if ':' in item])
+    if declarations.get('stroke', 'none') == 'none':
+        return 0.
+    try:
+        return float(declarations.get('stroke-width', 1))
+    except ValueError:
+        return 1.
+    
+
+def _clip_rectangles(svg):
+    '''returns the ``(xmin, ymin, xmax, ymax)`` of the rectangular clip 
+    paths by url'''
+    rectangles = {}
+    for clip_id, attrs in CLIP_RECT_RE.findall(svg):
+        values = dict(ATTR_RE.findall(attrs))
+        try:
+            x, y = float(values.get('x', 0)), float(values.get('y', 0))
+            rectangles['url(#%s)' % clip_id] = (x, y, x + float(values['width']), y + float(values['height']))
+        except (KeyError, ValueError):
+            pass
+    return rectangles
+
+
+def _inside(bounds, rectangle, margin):
+    return (bounds[0] - margin >= rectangle[0]) and (bounds[1] - margin >= rectangle[1]) and \
+           (bounds[2] + margin <= rectangle[2]) and (bounds[3] + margin <= rectangle[3])
+
+
+def share_glyphs(svg, min_count = 2):
+    '''
+    returns the `svg` document text with repeated glyphs and styles shared.
+    shapes and styles are shared when used at least `min_count` times.
+    '''
+    '''first pass: find the glyph of every path'''
+    clip_rectangles = _clip_rectangles(svg)
+    glyphs = []
+    shape_counts = {}
+    style_counts = {}
+    for match in PATH_RE.finditer(svg):
+        attrs = ATTR_RE.findall(match.group(1))
+        names = [name for name, value in attrs]
+        glyph = None
+        if ('d' in names) and ('id' not in names) and ('transform' not in names):
+            values = dict(attrs)
+            commands = _parse_path(values['d'])
+            if commands is not None:
+                stroke_width = _stroke_width(values.get('style', ''))
+                rectangle = _rectangle(commands)
+                if (rectangle is not None) and rectangle[2] and rectangle[3] and not stroke_width:
+                    glyph = (UNIT_SQUARE, rectangle)
+                else:
+                    shape, x0, y0 = _shape(commands)
+                    glyph = (shape, (x0, y0))
+                shape_counts[glyph[0]] = shape_counts.get(glyph[0], 0) + 1
+                clip = clip_rectangles.get(values.get('clip-path', None), None)
+                if clip is not None:
+                    '''control points bound the curves, the margin covers 
+                    strokes and miter joins'''
+                    xs = [x for command, points in commands for x, y in points]
+                    ys = [y for command, points in commands for x, y in points]
+                    if _inside((min(xs), min(ys), max(xs), max(ys)), clip, 10 * stroke_width + 1):
+                        attrs = [(name, value) for name, value in attrs if name != 'clip-path']
+                        names.remove('clip-path')
+        if 'style' in names:
+            style = dict(attrs)['style']
+            style_counts[style] = style_counts.get(style, 0) + 1
+        glyphs.append((attrs, glyph))
+
+    shape_ids = {}
+    for shape, count in shape_counts.items():
+        if (count >= min_count) or (shape == UNIT_SQUARE):
+            shape_ids[shape] = 'glyph%i' % len(shape_ids)
+    style_classes = {}
+    for style, count in style_counts.items():
+        if count >= min_count:
+            style_classes[style] = 's%i' % len(style_classes)
+
+    '''second pass: write the paths'''
+    def replace(match, glyphs = iter(glyphs)):
+        attrs, glyph = glyphs.next()
+        tag = 'path'
+        out = []
+        clip_path = None
+        if (glyph is not None) and (glyph[0] in shape_ids):
+            tag = 'use'
+            out.append('xlink:href="#%s"' % shape_ids[glyph[0]])
+            if glyph[0] == UNIT_SQUARE:
+                x, y, width, height = glyph[1]
+                out.append('transform="matrix(%s 0 0 %s %s %s)"' % tuple(map(_number, (width, height, x, y))))
+            else:
+                x, y = glyph[1]
+                out.append('x="%s" y="%s"' % (_number(x), _number(y)))
+        for name, value in attrs:
+            if (name == 'd') and (tag == 'use'):
+                continue
+            if (name == 'clip-path') and (tag == 'use'):
+                clip_path = value# the use position would move the clip path
+                continue
+            if (name == 'style') and (value in style_classes):
+                out.append('class="%s"' % style_classes[value])
+                continue
+            out.append('%s="%s"' % (name, value))
+        element = '<%s %s/>' % (tag, ' '.join(out))
+        if clip_path is not None:
+            element = '<g clip-path="%s">%s</g>' % (clip_path, element)
+        return element
+
+    svg = PATH_RE.sub(replace, svg)
+
+    if not (shape_ids or style_classes):
+        return svg
+    defs = [' <defs>\n']
+    if style_classes:
+        defs.append('  <style type="text/css">\n')
+        for style, name in sorted(style_classes.items(), key = lambda item: int(item[1][1:])):
+            defs.append('.%s{%s}\n' % (name, style))
+        defs.append('  </style>\n')
+    for shape, name in sorted(shape_ids.items(), key = lambda item: int(item[1][5:])):
+        defs.append('  <path d="%s" id="%s" style="%s"/>\n' % (shape, name, INHERITED_STYLE))
+    defs.append(' </defs>\n')
+    start = SVG_START_RE.search(svg)
+    if start is None:
+        raise ValueError('Not an SVG document')
+    return svg[:start.end()] + '\n' + ''.join(defs) + svg[start.end():].lstrip('\n')
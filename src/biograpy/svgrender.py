@@ -0,0 +1,697 @@
+'''
+Created on 19/ott/2026
+
+Direct SVG output.
+
+:class:`SVGRenderer` writes the SVG of a :class:`~biograpy.drawer.Panel`
+straight from the feature geometry, without building the matplotlib artists
+of the features. It is used by :func:`~biograpy.drawer.Panel.save` with the
+``svg`` backend::
+
+    panel.save('genes.svg', backend = 'svg')
+
+Features are placed in rows as :class:`~biograpy.tracks.BaseTrack` does for
+all its `sort_by` modes, but feature names are measured from their length and
+font size instead of the rendered text, so crowded tracks can be arranged in
+a slightly different number of rows than with matplotlib. The elements of
+each feature are written to the output as soon as they are computed, names
+are written as ``<text>`` and not as glyph paths.
+
+These tracks are drawn directly:
+
+* :class:`~biograpy.tracks.BaseTrack` without colorbar, Y ticks, `max_rows`,
+  `x_use_sequence` or `feature_labels` other than ``'all'``, containing only :class:`~biograpy.features.Simple`,
+  :class:`~biograpy.features.GenericSeqFeature`,
+  :class:`~biograpy.features.GeneSeqFeature`,
+  :class:`~biograpy.features.SegmentedFeature`,
+  :class:`~biograpy.features.SinglePositionFeature` with ``'o'`` or ``'s'``
+  markers and their compact versions, with the default square `boxstyle`
+
+every other track, such as :class:`~biograpy.tracks.PlotTrack` and tracks
+with a colorbar, is drawn by matplotlib at the same position in a separate
+figure, and its SVG is included in the output.
+
+'''
+
+import re
+import gzip
+import bisect
+from cStringIO import StringIO
+from xml.sax.saxutils import escape, quoteattr
+
+import matplotlib
+from matplotlib.colors import colorConverter, rgb2hex
+from matplotlib.font_manager import FontProperties
+
+from biograpy import tracks, features
+from biograpy.figurepool import FigurePool
+from biograpy.svgglyphs import SVG_START_RE
+
+'''square boxes without padding are plain rectangles'''
+SQUARE_BOX_RE = re.compile(r'^\s*square\s*,\s*pad\s*=\s*0*\.?0*\s*$')
+ID_RE = re.compile(r'(\sid="|url\(#|xlink:href="#)')
+SVG_HEADER = '''<?xml version="1.0" encoding="utf-8" standalone="no"?>
+<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1//EN"
+  "http://www.w3.org/Graphics/SVG/1.1/DTD/svg11.dtd">
+<svg height="%(height)spt" version="1.1" viewBox="0 0 %(width)s %(height)s" width="%(width)spt" xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">
+ <defs>
+  <style type="text/css">
+*{stroke-linecap:butt;stroke-linejoin:round;}
+  </style>
+ </defs>
+ <rect height="%(height)s" style="fill:#ffffff;" width="%(width)s" x="0" y="0"/>
+'''
+MARKERS = ('o', 's')
+
+
+def _number(value):
+    return ('%.2f' % value).rstrip('0').rstrip('.')
+
+
+def _text(value):
+    '''xml text of a label, utf-8 encoded'''
+    if not isinstance(value, basestring):
+        value = str(value)
+    if isinstance(value, unicode):
+        value = value.encode('utf-8')
+    return escape(value)
+
+
+_colors = {}
+def _color(color):
+    '''returns the svg color and the alpha of a matplotlib color'''
+    try:
+        return _colors[color]
+    except (KeyError, TypeError):
+        r, g, b, a = colorConverter.to_rgba(color)
+        value = rgb2hex((r, g, b)), a
+        try:
+            _colors[color] = value
+        except TypeError:# unhashable colors
+            pass
+        return value
+
+
+def _paint(fc, ec, lw, alpha):
+    '''returns the css style of a matplotlib patch'''
+    style = []
+    if fc is None:
+        style.append('fill:none;')
+    else:
+        fill, fill_alpha = _color(fc)
+        if alpha is not None:
+            fill_alpha = alpha
+        style.append('fill:%s;' % fill)
+        if fill_alpha < 1:
+            style.append('fill-opacity:%s;' % _number(max(fill_alpha, 0)))
+    if lw and (ec is not None):
+        stroke, stroke_alpha = _color(ec)
+        if alpha is not None:
+            stroke_alpha = alpha
+        style.append('stroke:%s;stroke-width:%s;' % (stroke, _number(lw)))
+        if stroke_alpha < 1:
+            style.append('stroke-opacity:%s;' % _number(max(stroke_alpha, 0)))
+    return ''.join(style)
+
+
+def _patch_paint(feat, lw = None, alpha = None):
+    ec = feat.ec
+    if ec is None:
+        ec = matplotlib.rcParams['patch.edgecolor']
+    if lw is None:
+        lw = feat.lw
+    if alpha is None:
+        alpha = feat.alpha
+    if alpha is not None:
+        alpha = min(alpha, 1.)
+    return _paint(feat.fc, ec, lw, alpha)
+
+
+'''feature shapes in data coordinates, the style comes last: ``('rect', x0, y0, x1, y1, style)``,
+``('polygon', points, style)``, ``('line', points, style)`` and
+``('marker', x, y, marker, size, style)``, marker size is in points'''
+
+def _box_shapes(feat):
+    return [('rect', feat.start, feat.Y, feat.end, feat.Y + feat.height, _patch_paint(feat))]
+
+
+def _gene_shapes(feat):
+    body_width = feat.height * .6667
+    head_width = feat.height
+    head_length = feat.head_length
+    y = feat.Y
+    '''the half arrow drawn by matplotlib FancyArrow'''
+    if feat.strand == 1:
+        points = [(feat.end, y), (feat.end - head_length, y + head_width / 2.),
+                  (feat.end - head_length, y + body_width / 2.),
+                  (feat.start, y + body_width / 2.), (feat.start, y)]
+    elif feat.strand == -1:
+        points = [(feat.start, y), (feat.start + head_length, y + head_width / 2.),
+                  (feat.start + head_length, y + body_width / 2.),
+                  (feat.end, y + body_width / 2.), (feat.end, y)]
+    else:
+        raise ValueError('Gene feature must have strand equal to 1 or -1')
+    shapes = []
+    if feat.end != feat.start:
+        shapes.append(('polygon', points, _patch_paint(feat)))
+    exon_style = None
+    for exon in feat.exons:
+        if isinstance(exon, tuple):
+            exon_start, exon_end = exon
+        else:
+            exon_start, exon_end = int(exon.location.start.position), int(exon.location.end.position)
+        if exon_style is None:
+            exon_style = _patch_paint(feat, lw = 0, alpha = feat.alpha + 0.1)
+        shapes.append(('rect', exon_start, y, exon_end, y + body_width / 2., exon_style))
+    return shapes
+
+
+def _segmented_shapes(feat):
+    if not feat.segments:
+        return _box_shapes(feat)
+    shapes = []
+    style = _patch_paint(feat)
+    junction_style = _paint(None, feat.ec, 1, .5)
+    junction_start = None
+    for segment_start, segment_end in feat.segments:
+        shapes.append(('rect', segment_start, feat.Y, segment_end, feat.Y + feat.height, style))
+        if junction_start is not None:
+            junction_end = float(segment_start)
+            junction_middle = (junction_start + junction_end) / 2.
+            Yends = feat.Y + feat.height / 2.
+            Ymiddle = feat.Y + feat.height
+            shapes.append(('line', [(junction_start, Yends), (junction_middle, Ymiddle),
+                                    (junction_end, Yends)], junction_style))
+        junction_start = float(segment_end)
+    return shapes
+
+
+def _position_shapes(feat):
+    style = _paint(feat.fc, 'k', matplotlib.rcParams['lines.markeredgewidth'], feat.alpha)
+    return [('marker', feat.start, feat.Y, feat.marker, feat.markersize, style)]
+
+
+SHAPES = {features.Simple : _box_shapes,
+          features.CompactSimple : _box_shapes,
+          features.GenericSeqFeature : _box_shapes,
+          features.CompactGenericSeqFeature : _box_shapes,
+          features.GeneSeqFeature : _gene_shapes,
+          features.CompactGeneSeqFeature : _gene_shapes,
+          features.SegmentedFeature : _segmented_shapes,
+          features.SinglePositionFeature : _position_shapes,
+          features.CompactSinglePositionFeature : _position_shapes,}
+
+
+def _shapes_extent(shapes):
+    '''returns the X extent in data coordinates and the extra width of the
+    markers in points'''
+    xs = []
+    marker = 0.
+    for shape in shapes:
+        if shape[0] == 'rect':
+            xs.extend(shape[1:4:2])
+        elif shape[0] == 'marker':
+            xs.append(shape[1])
+            marker = max(marker, shape[4] / 2.)
+        else:
+            xs.extend([x for x, y in shape[1]])
+    return min(xs), max(xs), marker
+
+
+def _collapse(margins):
+    '''returns the rows of feature indexes, filled as
+    :func:`~biograpy.tracks.BaseTrack._collapse` does: each row takes the
+    remaining features not colliding with the ones already in the row'''
+    rows = []
+    remaining = range(len(margins))
+    while remaining:
+        starts = []
+        ends = []
+        row = []
+        left = []
+        for i in remaining:
+            start, end = margins[i]
+            k = bisect.bisect_left(starts, start)
+            if (k and (ends[k - 1] >= start)) or ((k < len(starts)) and (starts[k] <= end)):
+                left.append(i)
+            else:
+                starts.insert(k, start)
+                ends.insert(k, end)
+                row.append(i)
+        rows.append(row)
+        remaining = left
+    return rows
+
+
+class SVGRenderer(object):
+    '''
+
+    Writes the SVG of a :class:`~biograpy.drawer.Panel` to a file handle::
+
+        SVGRenderer(panel, xmin = 1000, xmax = 5000).render(fh)
+
+    Class attributes used to measure text:
+
+        ===================== ==================================================
+        Key                   Description
+        ===================== ==================================================
+        char_width            average width of a character, in font sizes.
+                              default is ``0.6``
+        ascent                height of the text over the baseline, in font
+                              sizes. default is ``0.8``
+        ===================== ==================================================
+
+    '''
+    char_width = 0.6
+    ascent = 0.8
+
+    def __init__(self, panel, xmin = None, xmax = None):
+        self.panel = panel
+        self.xmin = xmin
+        self.xmax = xmax
+        self._classes = {}
+        self._clip_count = 0
+        self.figure_pool = None
+        self._fallbacks = []# panels not closed yet
+
+    def render(self, fh):
+        '''lay out the panel and write its SVG document to `fh`'''
+        try:
+            self._write(fh, self._layout())
+        finally:
+            for fallback in self._fallbacks:
+                fallback.close()
+            self._fallbacks = []
+            if self.figure_pool is not None:
+                self.figure_pool.clear()
+                self.figure_pool = None
+
+    def _direct(self, track):
+        '''``True`` if the track can be drawn without matplotlib'''
+        if type(track) is not tracks.BaseTrack:
+            return False
+        if track.draw_cb or track.x_use_sequence or track.max_rows or (track.feature_labels != 'all') \
+           or (track.yticks_major is not None) \
+           or (track.yticks_minor is not None) or ('left' in track.draw_axis) \
+           or ('right' in track.draw_axis):
+            return False
+        for feat in track.features:
+            if type(feat) not in SHAPES:
+                return False
+            if (SHAPES[type(feat)] is _position_shapes) and (feat.marker not in MARKERS):
+                return False
+            if not SQUARE_BOX_RE.match(feat.boxstyle):
+                return False
+        return True
+
+    def _layout(self):
+        '''place the features of every track and the track axes, as
+        :func:`~biograpy.drawer.Panel._draw_tracks` does'''
+        panel = self.panel
+        if self.xmin:
+            panel._xlim_options[0] = self.xmin
+        if self.xmax:
+            panel._xlim_options[1] = self.xmax
+        panel.xmin, panel.xmax = panel._xlim_options
+        Xs = []
+        cbars = False
+        for track in panel.tracks:
+            if track.features:
+                Xs.append(track.xmin)
+                Xs.append(track.xmax)
+                if track.draw_cb:
+                    if cbars != 'label':
+                        cbars = 'simple'
+                        if track.cb_label:
+                            cbars = 'label'
+        if panel.xmin == None:
+            panel.xmin = min(Xs)
+        if panel.xmax == None:
+            panel.xmax = max(Xs)
+        '''set colorbar dimension '''
+        self.cbar_extent = 0.015
+        self.cbar_axis_space = 0.05
+        self.cbar_right_pad = 0.01
+        if cbars == 'label':
+            self.cbar_right_pad = 0.03
+        axis_width = 1. - 2 * panel.hpadding
+        if cbars:
+            axis_width -= (self.cbar_extent + self.cbar_axis_space + self.cbar_right_pad)
+        self.width = panel.fig_width * 72.
+        self.axis_left = panel.hpadding * self.width
+        self.axis_width = axis_width * self.width
+        self.xscale = self.axis_width / float(max(panel.xmax - panel.xmin, 1))
+        self.label_font = FontProperties(size = 'x-small', family = 'serif')
+
+        entries = []
+        panel.drawn_lines = 0
+        track_height_user_specified = False
+        for track_num, track in enumerate(panel.tracks):
+            panel._check_cancelled()
+            if not track.features:
+                continue
+            if track.track_height and not panel._auto_fig_height:
+                track_height_user_specified = True
+            if track_height_user_specified and not track.track_height:
+                track_height_user_specified = False
+            last = track_num + 1 == len(panel.tracks)
+            if self._direct(track):
+                entry = self._layout_track(track)
+            else:
+                entry = self._layout_fallback(track, last)
+            entry.update(track = track, last = last)
+            panel.drawn_lines += entry['lines']
+            entries.append(entry)
+        if panel._auto_fig_height:
+            panel.fig_height = panel._estimate_fig_height()
+            panel.vpadding = (float(panel.padding) / panel.dpi) / panel.fig_height
+            panel.vtrack_padding = (float(panel.track_padding) / panel.dpi) / panel.fig_height
+        self.height = panel.fig_height * 72.
+
+        '''arrange tracks'''
+        default_figure_bottom_space = panel.vpadding + float(panel.figure_bottom_space) / panel.dpi
+        axis_bottom_pad = 1.0 - default_figure_bottom_space
+        axis_scale = None
+        for entry in entries:
+            track = entry['track']
+            if track_height_user_specified:
+                axis_height = track.track_height / float(panel.fig_height)
+            elif axis_scale:
+                axis_height = axis_scale * entry['lines']
+            else:
+                axis_height = (float(entry['lines']) / panel.drawn_lines) - panel.vpadding / (2. * len(panel.tracks)) \
+                              - default_figure_bottom_space / len(panel.tracks)
+                axis_scale = axis_height / float(entry['lines'])
+            axis_bottom_pad -= (axis_height + panel.vtrack_padding / 2.)
+            entry['rect'] = [panel.hpadding, axis_bottom_pad, axis_width, axis_height]
+        return entries
+
+    def _layout_track(self, track):
+        '''returns the features of `track` with their shapes, name and Y
+        offset, and the track lines and Y limits'''
+        panel = self.panel
+        track._color_features()
+        xoffset = panel.xmin
+        font_size = self.label_font.get_size_in_points()
+        items = []
+        margins = []
+        for feat in track.features:
+            shapes = SHAPES[type(feat)](feat)
+            start, end, marker = _shapes_extent(shapes)
+            left = (start - xoffset) * self.xscale - marker
+            right = (end - xoffset) * self.xscale + marker
+            text_x = None
+            if feat.name:
+                text_x = feat.start
+                if (feat.start < xoffset) and (xoffset <= feat.end):
+                    text_x += xoffset
+                text_left = (text_x - xoffset) * self.xscale
+                left = min(left, text_left)
+                right = max(right, text_left + len(feat.name) * font_size * self.char_width)
+            items.append([feat, shapes, text_x, (start, end), 0.])
+            margins.append((left, right))
+        if track.sort_by == 'collapse':
+            rows = [[items[i] for i in row] for row in _collapse(margins)]
+        else:
+            if track.sort_by is None:
+                order = range(len(items))
+            else:
+                index = dict([(id(feat), i) for i, feat in enumerate(track.features)])
+                order = [index[id(feat)] for feat in track._order_by(track._sort_keys())]
+            rows = [[items[i]] for i in order]
+        Ycord = track._origin_Ycord
+        for row in rows:
+            for item in row:
+                item[4] = Ycord
+            Ycord -= track._betw_feat_space
+        if track.show_name == 'top':
+            ylim = (Ycord, track.ymax + 2.5)
+            name_y = track.ymax + 1.5
+        elif track.show_name == 'bottom':
+            ylim = (Ycord - 1, track.ymax + 1.5)
+            name_y = Ycord
+        else:
+            ylim = (Ycord, track.ymax + 1.5)
+            name_y = None
+        return dict(items = items, lines = track._origin_lines + len(rows),
+                    ylim = ylim, name_y = name_y, fallback = None)
+
+    def _layout_fallback(self, track, last):
+        '''lay out `track` with matplotlib in a panel of its own'''
+        from biograpy.drawer import Panel
+        panel = self.panel
+        if self.figure_pool is None:
+            self.figure_pool = FigurePool(max_size = 1)
+        fallback = Panel(fig_width = panel.fig_width * panel.dpi, fig_dpi = panel.dpi,
+                         grid = panel.grid, track_padding = panel.track_padding,
+                         start_position = panel.start_position, padding = panel.padding,
+                         xmin = panel.xmin, xmax = panel.xmax, figure_pool = self.figure_pool)
+        fallback.add_track(track)
+        if not last:# keep the axis of a track followed by other tracks
+            fallback.add_track(tracks.BaseTrack())
+        self._fallbacks.append(fallback)
+        fallback._draw_tracks()
+        return dict(fallback = fallback, lines = track.drawn_lines)
+
+    def _class(self, style):
+        '''css class of a style, defined at the end of the document'''
+        try:
+            return self._classes[style]
+        except KeyError:
+            name = self._classes[style] = 's%i' % len(self._classes)
+            return name
+
+    def _write(self, fh, entries):
+        panel = self.panel
+        fh.write(SVG_HEADER % dict(width = _number(self.width), height = _number(self.height)))
+        auto_X_major_ticks, auto_X_minor_ticks = panel._auto_xticks()
+        self.grid = []
+        if (panel.grid == 'major') or (panel.grid == 'both'):
+            self.grid.extend([(X, self._class('fill:none;stroke:#808080;stroke-opacity:0.66;stroke-width:1;stroke-dasharray:1,3;'))
+                              for X in auto_X_major_ticks])
+        if (panel.grid == 'minor') or (panel.grid == 'both'):
+            self.grid.extend([(X, self._class('fill:none;stroke:#808080;stroke-opacity:0.33;stroke-width:1;stroke-dasharray:1,3;'))
+                              for X in auto_X_minor_ticks])
+        self._feature_count = 0
+        for track_num, entry in enumerate(entries):
+            panel._check_cancelled()
+            left, bottom, width, height = entry['rect']
+            entry['box'] = (left * self.width, (1. - bottom - height) * self.height,
+                            width * self.width, height * self.height)
+            fh.write(' <g id="track%i">\n' % track_num)
+            if entry['fallback'] is not None:
+                self._write_fallback(fh, entry, track_num)
+            else:
+                self._write_track(fh, entry, auto_X_major_ticks, auto_X_minor_ticks)
+            fh.write(' </g>\n')
+        if self._classes:
+            fh.write(' <defs>\n  <style type="text/css">\n')
+            for style, name in sorted(self._classes.items(), key = lambda item: int(item[1][1:])):
+                fh.write('.%s{%s}\n' % (name, style))
+            fh.write('  </style>\n </defs>\n')
+        fh.write('</svg>\n')
+
+    def _write_track(self, fh, entry, auto_X_major_ticks, auto_X_minor_ticks):
+        panel = self.panel
+        track = entry['track']
+        box_x, box_y, box_width, box_height = entry['box']
+        ybottom, ytop = entry['ylim']
+        xmin = panel.xmin
+        xscale = self.xscale
+        yscale = box_height / float(ytop - ybottom)
+        X = lambda x: _number(box_x + (x - xmin) * xscale)
+        Y = lambda y: _number(box_y + (ytop - y) * yscale)
+        self._clip_count += 1
+        clip = 'clip%i' % self._clip_count
+        fh.write('  <defs><clipPath id="%s"><rect height="%s" width="%s" x="%s" y="%s"/></clipPath></defs>\n' %
+                 (clip, _number(box_height), _number(box_width), _number(box_x), _number(box_y)))
+        '''grid'''
+        for x, name in self.grid:
+            if panel.xmin <= x <= panel.xmax:
+                fh.write('  <path class="%s" d="M %s %s L %s %s"/>\n' % (name, X(x), _number(box_y), X(x), _number(box_y + box_height)))
+        '''features'''
+        label_style = self._class('font-family:%s;font-size:%spx;' % (self.label_font.get_family()[0], _number(self.label_font.get_size_in_points())))
+        label_ascent = self.label_font.get_size_in_points() * self.ascent
+        for feat, shapes, text_x, (start, end), offset in entry['items']:
+            feat_id = 'feature%i' % self._feature_count
+            self._feature_count += 1
+            element = []
+            if feat.url:
+                element.append('  <a xlink:href=%s>' % quoteattr(feat.url))
+            top = feat.Y + feat.height + offset
+            clipped = (start < panel.xmin) or (end > panel.xmax) or (top > ytop) or (feat.Y + offset < ybottom)
+            if clipped:
+                element.append('<g clip-path="url(#%s)" id="%s">' % (clip, feat_id))
+            else:
+                element.append('<g id="%s">' % feat_id)
+            for shape in shapes:
+                kind = shape[0]
+                if kind == 'rect':
+                    x0, y0, x1, y1 = shape[1:5]
+                    element.append('<rect class="%s" height="%s" width="%s" x="%s" y="%s"/>' %
+                                   (self._class(shape[-1]), _number((y1 - y0) * yscale), _number((x1 - x0) * xscale),
+                                    X(x0), Y(y1 + offset)))
+                elif kind == 'marker':
+                    x, y, marker, size = shape[1:5]
+                    if marker == 'o':
+                        element.append('<circle class="%s" cx="%s" cy="%s" r="%s"/>' %
+                                       (self._class(shape[-1]), X(x), Y(y + offset), _number(size / 2.)))
+                    else:
+                        cx = box_x + (x - xmin) * xscale
+                        cy = box_y + (ytop - y - offset) * yscale
+                        element.append('<rect class="%s" height="%s" width="%s" x="%s" y="%s"/>' %
+                                       (self._class(shape[-1]), _number(size), _number(size),
+                                        _number(cx - size / 2.), _number(cy - size / 2.)))
+                else:
+                    d = 'M ' + ' L '.join(['%s %s' % (X(x), Y(y + offset)) for x, y in shape[1]])
+                    if kind == 'polygon':
+                        d += ' z'
+                    element.append('<path class="%s" d="%s"/>' % (self._class(shape[-1]), d))
+            element.append('</g>')
+            if (text_x is not None) and (panel.xmin <= text_x <= panel.xmax):
+                text_y = box_y + (ytop - (feat.Y - feat.height / 5. + offset)) * yscale + label_ascent
+                element.append('<text class="%s" x="%s" y="%s">%s</text>' % (label_style, X(text_x), _number(text_y), _text(feat.name)))
+            if feat.url:
+                element.append('</a>')
+            element.append('\n')
+            fh.write(''.join(element))
+        '''track name'''
+        if entry['name_y'] is not None:
+            font = track.name_font_feat
+            name_style = self._class('font-family:%s;font-size:%spx;font-weight:600;' % (track.name_font_family, _number(font.get_size_in_points())))
+            text_y = box_y + (ytop - entry['name_y']) * yscale - font.get_size_in_points() * (1 - self.ascent)
+            fh.write('  <text class="%s" x="%s" y="%s">%s</text>\n' % (name_style, X(panel.xmin + panel.xmax * 0.01),
+                                                                      _number(text_y), _text(track.name)))
+        self._write_axis(fh, entry, auto_X_major_ticks, auto_X_minor_ticks)
+
+    def _write_axis(self, fh, entry, auto_X_major_ticks, auto_X_minor_ticks):
+        '''spines, X ticks and tick labels, following the rules of
+        :func:`~biograpy.drawer.Panel._draw_tracks`'''
+        panel = self.panel
+        track = entry['track']
+        box_x, box_y, box_width, box_height = entry['box']
+        draw_axis = list(track.draw_axis)
+        if entry['last'] and ('force no axis' not in draw_axis):
+            draw_axis.append('bottom')
+        if not panel.track_padding:
+            if not entry['last']:
+                for spine in ('bottom', 'top'):
+                    if spine in draw_axis:
+                        draw_axis.remove(spine)
+            if 'top' in draw_axis:
+                draw_axis.remove('top')
+        spine_style = self._class('fill:none;stroke:%s;stroke-width:%s;stroke-linecap:square;stroke-linejoin:miter;' %
+                                  (_color(matplotlib.rcParams['axes.edgecolor'])[0], _number(matplotlib.rcParams['axes.linewidth'])))
+        sides = [side for side in ('bottom', 'top') if side in draw_axis]
+        for side in sides:
+            y = _number(side == 'bottom' and box_y + box_height or box_y)
+            fh.write('  <path class="%s" d="M %s %s L %s %s"/>\n' % (spine_style, _number(box_x), y, _number(box_x + box_width), y))
+        if 'bottom' not in draw_axis:
+            return
+        xmin, xmax = panel.xmin, panel.xmax
+        X = lambda x: box_x + (x - xmin) * self.xscale
+        major_ticks = auto_X_major_ticks
+        major_labels = None
+        if track.xticks_major != None:
+            major_ticks = track.xticks_major
+            if (track.xticklabels_major != None) and len(track.xticklabels_major) == len(track.xticks_major):
+                major_labels = track.xticklabels_major
+        minor_ticks = auto_X_minor_ticks
+        minor_labels = []
+        if track.xticks_minor != None:
+            minor_ticks = track.xticks_minor
+            if (track.xticklabels_minor != None) and len(track.xticklabels_minor) == len(track.xticks_minor):
+                minor_labels = track.xticklabels_minor
+        if major_labels == None:
+            major_labels = []
+            for i in major_ticks:
+                if isinstance(i, (float, int)):
+                    major_labels.append(i + panel.start_position)
+                else:
+                    major_labels.append(i)
+        show_labels = entry['last'] or track.show_xticklabels
+        for ticks, labels, which, fontsize in ((major_ticks, major_labels, 'major', track.tickfontsize),
+                                               (minor_ticks, minor_labels, 'minor', track.tickfontsize_minor)):
+            size = matplotlib.rcParams['xtick.%s.size' % which]
+            tick_style = self._class('fill:none;stroke:%s;stroke-width:%s;' % (_color(matplotlib.rcParams['xtick.color'])[0],
+                                                                               _number(matplotlib.rcParams['xtick.%s.width' % which])))
+            if matplotlib.rcParams['xtick.direction'] == 'out':
+                size = -size
+            d = []
+            for tick in ticks:
+                if xmin <= tick <= xmax:
+                    x = _number(X(tick))
+                    for side in sides:
+                        if side == 'bottom':
+                            d.append('M %s %s L %s %s' % (x, _number(box_y + box_height), x, _number(box_y + box_height - size)))
+                        else:
+                            d.append('M %s %s L %s %s' % (x, _number(box_y), x, _number(box_y + size)))
+            if d:
+                fh.write('  <path class="%s" d="%s"/>\n' % (tick_style, ' '.join(d)))
+            if show_labels and labels:
+                font = FontProperties(size = fontsize)
+                label_style = self._class('font-family:%s;font-size:%spx;text-anchor:middle;' % (font.get_family()[0], _number(font.get_size_in_points())))
+                text_y = _number(box_y + box_height + max(-size, 0) + matplotlib.rcParams['xtick.%s.pad' % which] +
+                                 font.get_size_in_points() * self.ascent)
+                for tick, label in zip(ticks, labels):
+                    if xmin <= tick <= xmax:
+                        fh.write('  <text class="%s" x="%s" y="%s">%s</text>\n' % (label_style, _number(X(tick)), text_y, _text(label)))
+
+    def _write_fallback(self, fh, entry, track_num):
+        '''draw the track with matplotlib at its position in the panel and
+        include the svg'''
+        panel = self.panel
+        track = entry['track']
+        fallback = entry['fallback']
+        try:
+            fallback.fig.set_figheight(panel.fig_height)
+            cache = fallback._track_cache[id(track)]
+            left, bottom, width, height = entry['rect']
+            cache['axis'].set_position(entry['rect'])
+            if cache['cb_axis'] is not None:
+                cache['cb_axis'].set_position([left + width + self.cbar_axis_space - self.cbar_right_pad,
+                                               bottom, self.cbar_extent, height])
+            svg = StringIO()
+            fallback.fig.savefig(svg, dpi = fallback.fig.get_dpi(), format = 'svg', transparent = True)
+            self._feature_count += len(track.features)
+        finally:
+            fallback.close()
+            self._fallbacks.remove(fallback)
+            '''the feature artists belong to the fallback figure'''
+            for feat in track.features:
+                feat.reset()
+            track.invalidate()
+        svg = svg.getvalue()
+        start = SVG_START_RE.search(svg)
+        body = svg[start.end():svg.rindex('</svg>')]
+        prefix = 't%i_' % track_num
+        fh.write(ID_RE.sub(lambda match: match.group(1) + prefix, body))
+
+
+def save(panel, output, xmin = None, xmax = None, format = None):
+    '''write the svg of `panel` with :class:`SVGRenderer` to `output`, a
+    file path or a file-like object. `format` can be ``'svg'`` or
+    ``'svgz'``, and is taken from the file extension of a path if not
+    given'''
+    if format is None:
+        format = 'svg'
+        if isinstance(output, basestring) and ('.' in output):
+            format = output.rsplit('.', 1)[1]
+    if format not in ('svg', 'svgz'):
+        raise ValueError('The svg backend only writes svg and svgz files, not %s' % format)
+    renderer = SVGRenderer(panel, xmin = xmin, xmax = xmax)
+    if isinstance(output, basestring):
+        if format == 'svgz':
+            fh = gzip.open(output, 'wb')
+        else:
+            fh = open(output, 'wb')
+        try:
+            renderer.render(fh)
+        finally:
+            fh.close()
+    elif format == 'svgz':
+        fh = gzip.GzipFile(fileobj = output, mode = 'wb')
+        renderer.render(fh)
+        fh.close()
+    else:
+        renderer.render(output)
@@ -0,0 +1,40 @@
+'''
+Created on 19/ott/2026
+
+Panels and image comparisons shared by the rendering tests
+'''
+import numpy as np
+from PIL import Image
+from biograpy import Panel, tracks, features
+
+def tall_panel(count = 60):
+    '''a panel of `count` overlapping features, a plot and a colorbar'''
+    panel = Panel(fig_width = 400)
+    panel.add_track(tracks.BaseTrack(*[features.Simple(i * 10, i * 10 + 300, name = 'feature %i' % i) for i in range(count)],
+                                     name = 'features'))
+    panel.add_track(tracks.PlotTrack(features.PlotFeature([0.1, 0.5, -0.3, 0.8], x = [0, 200, 400, 900]), name = 'plot'))
+    panel.add_track(tracks.BaseTrack(features.Simple(10, 300, name = 'last', score = .4, use_score_for_color = True),
+                                     draw_cb = True))
+    return panel
+
+def scene_panel():
+    '''a panel with urls, a legend and a labelled colorbar'''
+    panel = Panel(fig_width = 500)
+    panel.add_track(tracks.BaseTrack(*[features.Simple(i * 40, i * 40 + 150, name = 'feature %i' % i,
+                                                       fc = 'red', color_by_cm = False, url = 'http://example.org/%i' % i) for i in range(12)],
+                                     name = 'features'))
+    panel.add_track(tracks.PlotTrack(features.PlotFeature([0.1, 0.5, -0.3, 0.8], x = [0, 200, 400, 600],
+                                                          label = 'signal'),
+                                     name = 'plot', draw_legend = True))
+    panel.add_track(tracks.BaseTrack(features.Simple(10, 300, name = 'scored', score = .4, use_score_for_color = True),
+                                     draw_cb = True, cb_label = 'score'))
+    return panel
+
+def image(output):
+    '''RGBA pixels, as ints, of the image written to the file like `output`'''
+    output.seek(0)
+    return np.asarray(Image.open(output).convert('RGBA')).astype(int)
+
+def same(image1, image2):
+    '''lines crossing the strip or band edges can be antialiased differently'''
+    return image1.shape == image2.shape and abs(image1 - image2).max() <= 1
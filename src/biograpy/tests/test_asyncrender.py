@@ -0,0 +1,69 @@
+import unittest
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from biograpy import Panel, tracks, features
+from biograpy.drawer import RenderCancelled
+from biograpy.figurepool import FigurePool
+from biograpy.asyncrender import asyncio, render_spec_async
+
+def make_panel(**kwargs):
+    panel = Panel(fig_width = 500, **kwargs)
+    panel.add_track(tracks.BaseTrack(features.Simple(100, 500, name = 'feat1'),
+                                     features.Simple(300, 900, name = 'feat2')))
+    return panel
+
+class TestAsyncRender(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers = 1)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.loop.close()
+
+    def test_save_async(self):
+        panel = make_panel()
+        fh = tempfile.TemporaryFile()
+        future = panel.save_async(fh, format = 'png', loop = self.loop, executor = self.executor)
+        htmlmap = self.loop.run_until_complete(future)
+        self.assertTrue('href="#feat1"' in htmlmap)
+        fh.seek(0)
+        self.assertEqual(fh.read(4), '\x89PNG')
+        panel.close()
+
+    def test_cancel_pending(self):
+        pool = FigurePool()
+        blocker = threading.Event()
+        self.executor.submit(blocker.wait)
+        panel = make_panel(figure_pool = pool)
+        future = panel.save_async(tempfile.TemporaryFile(), format = 'png',
+                                  loop = self.loop, executor = self.executor)
+        future.cancel()
+        self.assertRaises(asyncio.CancelledError, self.loop.run_until_complete, future)
+        self.assertTrue(panel.cancel_event.is_set())
+        self.assertEqual(pool.stats()['in_use'], 0)
+        blocker.set()
+        pool.clear()
+
+    def test_cancel_event(self):
+        panel = make_panel()
+        panel.cancel_event = threading.Event()
+        panel.cancel_event.set()
+        self.assertRaises(RenderCancelled, panel.save, tempfile.TemporaryFile(), format = 'png')
+        self.assertEqual(panel.Drawn_objects, [])
+        panel.close()
+
+    def test_render_spec_process(self):
+        executor = ProcessPoolExecutor(max_workers = 1)
+        spec = dict(panel = dict(fig_width = 500),
+                    tracks = [dict(features = [dict(start = 1, end = 100, name = 'feat1')])])
+        result = self.loop.run_until_complete(render_spec_async(spec, loop = self.loop, executor = executor))
+        executor.shutdown()
+        self.assertEqual(result['image'][:4], '\x89PNG')
+
+def test_suite():
+    return unittest.makeSuite(TestAsyncRender)
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,78 @@
+import unittest
+from cStringIO import StringIO
+from biograpy import Panel, tracks, features
+from biograpy.diagnostics import live_objects, memory_usage, start_tracing, stop_tracing, top_allocations
+
+def draw(feats, **kwargs):
+    panel = Panel(fig_width = 500, **kwargs)
+    panel.add_track(tracks.BaseTrack(*feats, name = 'features', max_rows = 2))
+    panel.save(StringIO(), format = 'png')
+    panel.close()
+    return panel
+
+def feature_list():
+    return [features.Simple(i * 20, i * 20 + 300, name = 'feature %i' % i) for i in range(20)]
+
+
+class TestRelease(unittest.TestCase):
+    def test_close(self):
+        '''without release_artists the features keep the artists'''
+        feats = feature_list()
+        draw(feats)
+        self.assertTrue(feats[0].patches)
+
+    def test_release(self):
+        feats = feature_list()
+        before = live_objects()
+        panel = draw(feats, release_artists = True)
+        self.assertTrue(panel.htmlmap)
+        self.assertEqual(panel.Drawn_objects, [])
+        self.assertTrue(panel.fig is None)
+        for feat in feats:
+            self.assertEqual((feat.patches, feat.feat_name), ([], []))
+        self.assertTrue(panel.tracks[0].overflow_feature is None)
+        after = live_objects()
+        self.assertEqual(after['pyplot_figures'], before['pyplot_figures'])
+        self.assertEqual(after['figures'], before['figures'])
+        self.assertTrue(after['artists'] <= before['artists'])
+        '''the features can be drawn again'''
+        panel = draw(feats, release_artists = True)
+        self.assertTrue('feature 0' in panel.htmlmap)
+        panel.close()
+
+    def test_release_before_close(self):
+        panel = Panel(fig_width = 500, release_artists = True)
+        panel.release()
+        panel.close()
+        self.assertTrue(panel.fig is None)
+
+
+class TestDiagnostics(unittest.TestCase):
+    def test_live_objects(self):
+        feats = feature_list()
+        counts = live_objects()
+        self.assertTrue(counts['features'] >= len(feats))
+        self.assertTrue(memory_usage() > 0)
+
+    def test_tracing(self):
+        try:
+            import tracemalloc
+        except ImportError:
+            self.assertRaises(ImportError, start_tracing)
+            return
+        start_tracing()
+        try:
+            feature_list()
+            allocations = top_allocations(limit = 3)
+            self.assertTrue(0 < len(allocations) <= 3)
+        finally:
+            stop_tracing()
+        self.assertRaises(RuntimeError, top_allocations)
+
+
+def test_suite():
+    return unittest.TestSuite([unittest.makeSuite(TestRelease),
+                               unittest.makeSuite(TestDiagnostics)])
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,254 @@
+import unittest
+import pickle
+import tempfile
+from cStringIO import StringIO
+from Bio.SeqFeature import SeqFeature, FeatureLocation
+from matplotlib.collections import Collection
+from biograpy import Panel, tracks, features, benchmark
+from biograpy.scene import build_scene, render_scene
+
+class TestFeatureStyle(unittest.TestCase):
+    def test_shared(self):
+        feat1 = features.Simple(10, 100, cm = 'Blues', lw = 1)
+        feat2 = features.Simple(50, 150, cm = 'Blues', lw = 1)
+        self.assertTrue(feat1.feature_style is feat2.feature_style)
+        self.assertFalse(feat1.feature_style is features.Simple(10, 100).feature_style)
+        self.assertEqual(feat1.fc, feat1.cm(0))
+
+    def test_set_option(self):
+        feat1 = features.Simple(10, 100)
+        feat2 = features.Simple(50, 150)
+        feat1.lw = 2
+        self.assertEqual(feat1.lw, 2)
+        self.assertEqual(feat2.lw, 0.5)
+        feat1.fc = 'r'
+        self.assertEqual(feat1.fc, 'r')
+        self.assertEqual(feat2.fc, feat2.cm(0))
+        self.assertTrue(feat1.feature_style is features.Simple(10, 100, lw = 2).feature_style)
+
+    def test_use_score_for_color(self):
+        feat = features.Simple(10, 100, color_by_cm = False, use_score_for_color = True)
+        self.assertTrue(feat.color_by_cm)
+
+    def test_shared_after_save(self):
+        '''tracks set colors and colormap values without changing styles'''
+        feats = [features.CompactSimple(i * 10, i * 10 + 50) for i in range(200)]
+        feats.append(features.CompactSimple(10, 50, score = .5, use_score_for_color = True))
+        feats.append(features.SecStructFeature(betas = [(10, 30)], alphah = [(50, 80)]))
+        panel = Panel(fig_width = 500)
+        panel.add_track(tracks.BaseTrack(*feats))
+        panel.add_track(tracks.PlotTrack(features.BarPlotFeature([1., 2., 3.], x = [10, 20, 30])))
+        panel.save(StringIO(), format = 'png')
+        panel.close()
+        self.assertEqual(len(set([id(feat.feature_style) for feat in feats[:200]])), 1)
+        self.assertEqual(len(set([feat.fc for feat in feats[:200]])), 200)
+        self.assertEqual(feats[200].cm_value, .5)
+        self.assertEqual(feats[-1].lw, 2)
+        self.assertTrue(feats[-1].feature_style is features.Simple(0, 1, lw = 2).feature_style)
+
+    def test_cm_value(self):
+        feat = features.Simple(10, 100, cm = 'Blues', cm_value = .8)
+        self.assertEqual(feat.fc, feat.cm(.8))
+        self.assertTrue(feat.feature_style is features.Simple(10, 100, cm = 'Blues').feature_style)
+
+
+class TestCompactFeatures(unittest.TestCase):
+    def test_no_dict(self):
+        feat = features.CompactGeneSeqFeature(None, start = 10, end = 300, strand = -1, name = 'gene')
+        self.assertFalse(hasattr(feat, '__dict__'))
+        self.assertRaises(AttributeError, setattr, feat, 'unknown', 1)
+        classic = features.GeneSeqFeature(None, start = 10, end = 300, strand = -1, name = 'gene')
+        for attr in ('start', 'end', 'strand', 'head_length', 'height', 'type', 'name', 'fc', 'alpha'):
+            self.assertEqual(getattr(feat, attr), getattr(classic, attr))
+
+    def test_type_checks(self):
+        for classic, compact in ((features.Simple, features.CompactSimple),
+                                 (features.GenericSeqFeature, features.CompactGenericSeqFeature),
+                                 (features.GeneSeqFeature, features.CompactGeneSeqFeature),
+                                 (features.SinglePositionFeature, features.CompactSinglePositionFeature)):
+            self.assertTrue(issubclass(compact, classic))
+            self.assertTrue(issubclass(compact, features.BaseGraphicFeature))
+            self.assertFalse(issubclass(classic, compact))
+        self.assertTrue(isinstance(features.CompactSimple(10, 100), features.Simple))
+        gene = features.CompactGeneSeqFeature(None, start = 10, end = 300, strand = 1)
+        self.assertTrue(isinstance(gene, features.GeneSeqFeature))
+        self.assertFalse(isinstance(gene, features.Simple))
+        self.assertTrue(hasattr(features.Simple(10, 100), '__dict__'))
+
+    def test_draw(self):
+        htmlmaps = []
+        for simple, single in ((features.Simple, features.SinglePositionFeature),
+                               (features.CompactSimple, features.CompactSinglePositionFeature)):
+            panel = Panel(fig_width = 500)
+            panel.add_track(tracks.BaseTrack(simple(100, 500, name = 'feat1', url = 'a'),
+                                             simple(300, 900, name = 'feat2', url = 'b'),
+                                             single(None, start = 400, name = 'site', url = 'c')))
+            panel.save(tempfile.TemporaryFile(), format = 'png')
+            panel.close()
+            htmlmaps.append(panel.htmlmap)
+        self.assertEqual(htmlmaps[0], htmlmaps[1])
+
+    def test_pickle(self):
+        for feature_class in (features.Simple, features.CompactSimple):
+            feat = feature_class(10, 100, name = 'feat', fc = 'r')
+            for protocol in (0, 2):
+                copy = pickle.loads(pickle.dumps(feat, protocol))
+                self.assertEqual((copy.start, copy.end, copy.name, copy.fc), (10, 100, 'feat', 'r'))
+
+    def test_memory(self):
+        classic = benchmark.feature_memory(benchmark._simple_factory(features.Simple), 100)[0]
+        compact = benchmark.feature_memory(benchmark._simple_factory(features.CompactSimple), 100)[0]
+        self.assertTrue(compact < classic)
+
+def location(start, end, type = 'region'):
+    return SeqFeature(FeatureLocation(start, end), type = type)
+
+class TestCompositeFeatures(unittest.TestCase):
+    def panel(self):
+        panel = Panel(fig_width = 600)
+        self.tm = features.TMFeature(TM = [location(20, 40, 'TM'), location(80, 100, 'TM')],
+                                     cyto = [location(0, 20)], non_cyto = [location(40, 80), location(100, 200)],
+                                     name = 'tm')
+        self.ss = features.SecStructFeature(betas = [location(10, 30), location(60, 65)],
+                                            alphah = [location(90, 140), location(160, 190)],
+                                            name = 'ss', filter_struct_length = 10)
+        panel.add_track(tracks.BaseTrack(self.tm, self.ss, sort_by = None))
+        return panel
+
+    def test_collections(self):
+        '''one collection for each kind of element'''
+        panel = self.panel()
+        panel.save(StringIO(), format = 'png')
+        self.assertEqual(len(self.tm.patches), 3)
+        self.assertEqual(len(self.ss.patches), 3)
+        for patch in self.tm.patches + self.ss.patches:
+            self.assertTrue(isinstance(patch, Collection))
+        '''the short strand is filtered, coils join the structures'''
+        self.assertEqual([len(patch.get_paths()) for patch in self.ss.patches], [1, 2, 3])
+        '''drawing again does not duplicate the elements'''
+        self.tm.reset()
+        self.tm.render()
+        self.assertEqual(len(self.tm.map_regions), 5)
+        panel.close()
+
+    def test_map_regions(self):
+        panel = self.panel()
+        panel.save(StringIO(), format = 'png')
+        self.assertEqual([alt for alt, coords in self.areas(panel.htmlmap)],
+                         ['TM', 'TM', 'cyto', 'non cyto', 'non cyto', 'tm',
+                          'beta strand', 'alpha helix', 'alpha helix', 'ss'])
+        '''regions follow the X axis, and lie in the feature area'''
+        coords = [area_coords for alt, area_coords in self.areas(panel.htmlmap)]
+        self.assertTrue(coords[0][0] < coords[1][0])
+        self.assertTrue(coords[5][0] <= coords[2][0] and coords[4][2] <= coords[5][2])
+        '''scenes keep the regions, their rounded coordinates can move areas 
+        by a pixel'''
+        scene_map = render_scene(build_scene(panel), StringIO(), format = 'png')
+        for area, scene_area in zip(self.areas(panel.htmlmap), self.areas(scene_map)):
+            self.assertEqual(area[0], scene_area[0])
+            self.assertTrue(max([abs(a - b) for a, b in zip(area[1], scene_area[1])]) <= 1)
+        panel.close()
+
+    def test_from_string(self):
+        '''per-residue strings give the extents of the SeqFeatures'''
+        tm = features.TMFeature.from_string('i' * 20 + 'M' * 20 + 'o' * 40 + 'M' * 20 + 'o' * 100, name = 'tm')
+        self.assertEqual(tm.TM_starts, [(20, 40), (80, 100)])
+        self.assertEqual(tm.cyto_starts, [(0, 20)])
+        self.assertEqual(tm.non_cyto_starts, [(40, 80), (100, 200)])
+        self.assertEqual((tm.start, tm.end, tm.type), (0, 200, 'transmembrane'))
+        ss = features.SecStructFeature.from_string('--EEE-HHHHHHHH--EE', offset = 1, filter_struct_length = 3)
+        self.assertEqual(ss.betas, [[3, 6]])
+        self.assertEqual(ss.alphah, [[7, 15]])
+        self.assertEqual(ss.coil, [[1, 3], [6, 7], [15, 17]])
+        self.assertEqual((ss.start, ss.end), (1, 17))
+        '''drawn as the SeqFeatures'''
+        panel = self.panel()
+        panel.save(StringIO(), format = 'png')
+        expected = self.areas(panel.htmlmap)
+        panel.close()
+        panel = Panel(fig_width = 600)
+        panel.add_track(tracks.BaseTrack(tm, features.SecStructFeature(betas = [(10, 30), (60, 65)], alphah = [(90, 140), (160, 190)],
+                                                                         name = 'ss', filter_struct_length = 10),
+                                         sort_by = None))
+        panel.save(StringIO(), format = 'png')
+        self.assertEqual(self.areas(panel.htmlmap), expected)
+        panel.close()
+
+    @staticmethod
+    def areas(htmlmap):
+        '''``(alt, coords)`` of the map areas'''
+        return [(area.split('alt="')[1].split('"')[0],
+                 map(int, area.split('coords="')[1].split('"')[0].split(',')))
+                for area in htmlmap.split('\n')[1:-1]]
+
+class TestBarPlot(unittest.TestCase):
+    def draw(self, feat, fig_width = 500, **kwargs):
+        panel = Panel(fig_width = fig_width)
+        panel.add_track(tracks.PlotTrack(feat, **kwargs))
+        panel.save(StringIO(), format = 'png')
+        return panel
+
+    def bars(self, feat):
+        '''``(left, right, bottom, top)`` of the drawn bars'''
+        return [(path.vertices[:, 0].min(), path.vertices[:, 0].max(),
+                 path.vertices[:, 1].min(), path.vertices[:, 1].max())
+                for path in feat.patches[0].get_paths()]
+
+    def test_collection(self):
+        feat = features.BarPlotFeature([1., -2., 3.], x = [10, 50, 90], width = 10, color_by_cm = True)
+        self.draw(feat, ymin = -3, ymax = 4).close()
+        self.assertEqual(len(feat.patches), 1)
+        self.assertEqual(self.bars(feat), [(5, 15, 0, 1), (45, 55, -2, 0), (85, 95, 0, 3)])
+        colors = feat.patches[0].get_facecolors()
+        self.assertEqual(len(colors), 3)
+        self.assertEqual(tuple(colors[1])[:3], tuple(feat.cm(0.))[:3])
+
+    def test_binning(self):
+        '''more bars than pixels are merged, keeping their range'''
+        y = [float(i % 7) - 3 for i in range(10000)]
+        feat = features.BarPlotFeature(y, align = 'edge', width = 1, label = 'bars')
+        panel = self.draw(feat, ymin = -3, ymax = 4)
+        bars = self.bars(feat)
+        self.assertTrue(len(bars) <= panel.fig_width * panel.dpi)
+        self.assertEqual((bars[0][0], bars[-1][1]), (1, 10001))
+        self.assertEqual((min([bar[2] for bar in bars]), max([bar[3] for bar in bars])), (-3, 3))
+        '''one legend entry and html map area for the collection'''
+        self.assertEqual(panel.htmlmap.count('<area'), 1)
+        scene = build_scene(panel)
+        panel.close()
+        self.assertEqual(len(scene.data['axes'][0]['glyphs']), len(bars))
+        self.assertEqual(len([glyph for glyph in scene.data['axes'][0]['glyphs'] if glyph[-1]]), 1)
+
+    def test_colorbar_pixels(self):
+        '''colorbars leave fewer pixels to the bars'''
+        feat = features.BarPlotFeature([float(i % 7) for i in range(10000)], align = 'edge', width = 1)
+        panel = Panel(fig_width = 500)
+        panel.add_track(tracks.PlotTrack(feat, ymin = 0, ymax = 7))
+        panel.add_track(tracks.BaseTrack(features.Simple(1, 10000, score = .5, use_score_for_color = True),
+                                         draw_cb = True, cb_label = 'score'))
+        panel.save(StringIO(), format = 'png')
+        width = panel.track_axes[0].get_window_extent().width
+        panel.close()
+        self.assertTrue(width < panel.fig_width * panel.dpi * (1 - 2 * panel.hpadding) - 10)
+        self.assertTrue(len(self.bars(feat)) <= width)
+
+    def test_error_bars(self):
+        '''bars with errors are not merged'''
+        feat = features.BarPlotFeature([1.] * 2000, yerr = .5, xerr = [.2] * 2000)
+        self.draw(feat, ymin = 0, ymax = 2).close()
+        self.assertEqual(len(self.bars(feat)), 2000)
+        errors = feat.patches[1]
+        self.assertTrue(isinstance(errors, Collection))
+        self.assertEqual(len(errors.get_segments()), 4000)
+        self.assertEqual(tuple(errors.get_segments()[0][:, 1]), (.5, 1.5))
+        self.assertEqual(len(feat.patches), 4)
+
+
+def test_suite():
+    return unittest.TestSuite([unittest.makeSuite(TestFeatureStyle),
+                               unittest.makeSuite(TestCompactFeatures),
+                               unittest.makeSuite(TestCompositeFeatures),
+                               unittest.makeSuite(TestBarPlot)])
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,71 @@
+import unittest
+import tempfile
+import matplotlib.pyplot as plt
+from biograpy import Panel, tracks, features
+from biograpy.figurepool import FigurePool
+
+class TestFigurePool(unittest.TestCase):
+    def render(self, pool, width = 500):
+        panel = Panel(fig_width = width, figure_pool = pool)
+        panel.add_track(tracks.BaseTrack(features.Simple(100, 500, name = 'feat1'),
+                                         features.Simple(300, 900, name = 'feat2'),
+                                         name = 'test'))
+        fh = tempfile.TemporaryFile()
+        panel.save(fh, format = 'png')
+        panel.close()
+        fh.seek(0)
+        return fh.read(), panel.htmlmap
+
+    def test_reuse(self):
+        pool = FigurePool(max_size = 2)
+        first = self.render(pool)
+        for i in range(5):
+            self.assertEqual(self.render(pool), first)
+        stats = pool.stats()
+        self.assertEqual((stats['created'], stats['reused']), (1, 5))
+        self.assertEqual((stats['idle'], stats['in_use']), (1, 0))
+        self.assertEqual(stats['leaked_artists'], 0)
+        pool.clear()
+        self.assertEqual(pool.stats()['idle'], 0)
+
+    def test_max_size(self):
+        pool = FigurePool(max_size = 1)
+        panels = [Panel(fig_width = 500, figure_pool = pool) for i in range(3)]
+        self.assertEqual(pool.stats()['in_use'], 3)
+        for panel in panels:
+            panel.close()
+        stats = pool.stats()
+        self.assertEqual((stats['idle'], stats['closed']), (1, 2))
+        pool.clear()
+
+    def test_sizes(self):
+        pool = FigurePool()
+        self.render(pool, 500)
+        self.render(pool, 800)
+        self.assertEqual(pool.stats()['created'], 2)
+        self.assertRaises(ValueError, pool.release, plt.figure(1))
+        plt.close(1)
+        pool.clear()
+
+    def test_close_twice(self):
+        '''a second close leaves the pooled figure alone'''
+        pool = FigurePool()
+        panel = Panel(fig_width = 500, figure_pool = pool)
+        panel.close()
+        self.assertTrue(panel.fig is None)
+        panel.close()
+        self.assertTrue(panel.closed)
+        self.assertEqual(pool.stats()['idle'], 1)
+        first = self.render(pool)
+        self.assertEqual(pool.stats()['reused'], 1)
+        '''figures closed in pyplot are not handed out'''
+        plt.close('all')
+        self.assertEqual(self.render(pool), first)
+        self.assertEqual(pool.stats()['created'], 2)
+        pool.clear()
+
+def test_suite():
+    return unittest.makeSuite(TestFigurePool)
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,67 @@
+import unittest
+import os
+import tempfile
+from StringIO import StringIO
+from biograpy import Panel, features
+from biograpy.importers import read_tracks, read_intervals, read_tables
+
+GFF = '''##gff-version 3
+chr1\ttest\tgene\t101\t900\t.\t+\t.\tID=gene1;Name=ABC1
+chr1\ttest\tmRNA\t101\t900\t.\t+\t.\tID=mrna1;Parent=gene1;Name=ABC1-001
+chr1\ttest\texon\t101\t200\t.\t+\t.\tParent=mrna1
+chr1\ttest\texon\t401\t500\t.\t+\t.\tParent=mrna1
+chr1\ttest\texon\t801\t900\t.\t+\t.\tParent=mrna1
+###
+chr1\ttest\tsite\t300\t300\t0.5\t.\t.\tID=site1
+chr2\ttest\tregion\t1\t100\t.\t.\t.\tID=region%3B1
+'''
+
+BED = '''chr1\t100\t900\ttx1\t0\t+\t100\t900\t0\t3\t100,100,100,\t0,300,700,
+chr1\t1000\t1100\tplain
+'''
+
+class TestImporters(unittest.TestCase):
+    def test_gff3_join(self):
+        intervals = list(read_intervals(StringIO(GFF)))
+        self.assertEqual([i.type for i in intervals], ['gene', 'mRNA', 'site', 'region'])
+        self.assertEqual(intervals[1].segments, [(100, 200), (400, 500), (800, 900)])
+        self.assertEqual(intervals[3].name, 'region;1')
+
+    def test_gff3_tracks(self):
+        tracks = read_tracks(StringIO(GFF), seqid = 'chr1')
+        self.assertEqual([t.name for t in tracks], ['gene', 'mRNA', 'site'])
+        gene, mrna, site = [t.features[0] for t in tracks]
+        self.assertTrue(isinstance(gene, features.GeneSeqFeature))
+        self.assertTrue(isinstance(mrna, features.SegmentedFeature))
+        self.assertTrue(isinstance(site, features.Simple))
+        self.assertEqual(site.score, 0.5)
+
+    def test_bed_blocks(self):
+        intervals = list(read_intervals(StringIO(BED), format = 'bed', start = 950))
+        self.assertEqual(len(intervals), 1)
+        tx = list(read_intervals(StringIO(BED), format = 'bed'))[0]
+        self.assertEqual(tx.segments, [(100, 200), (400, 500), (800, 900)])
+
+    def test_tables(self):
+        tables = read_tables(StringIO(GFF), seqid = 'chr1')
+        self.assertEqual(list(tables['mRNA'].starts), [100])
+        self.assertEqual(tables['gene'].names, ['ABC1'])
+        tables = read_tables(StringIO(GFF), seqid = 'chr2')
+        self.assertEqual((tables.keys(), tables['region'].chrom), (['region'], 'chr2'))
+        self.assertRaises(ValueError, read_tables, StringIO(GFF))
+
+    def test_draw(self):
+        panel = Panel(fig_width = 500)
+        panel.extend(read_tracks(StringIO(GFF), seqid = 'chr1'))
+        (fhandle, fname) = tempfile.mkstemp(suffix='.png')
+        os.close(fhandle)
+        panel.save(fname)
+        panel.close()
+        self.assertTrue('ABC1-001' in panel.htmlmap)
+        os.unlink(fname)
+
+def test_suite():
+    return unittest.makeSuite(TestImporters)
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,86 @@
+import unittest
+import os
+import tempfile
+import random
+from StringIO import StringIO
+from biograpy import tracks, features
+from biograpy.intervalindex import IntervalIndex, build_interval_index
+
+BED = '''track name=test
+chr1\t100\t200\tfeat1\t0.5\t+
+chr1\t150\t5000\tlong\t1\t-
+chr1\t40000\t40100\tfar\t0\t+
+chr2\t10\t20\tother
+'''
+
+GFF = '''##gff-version 3
+chr1\ttest\tgene\t101\t200\t.\t+\t.\tID=gene1;Name=ABC1
+chr1\ttest\tmRNA\t101\t200\t.\t+\t.\tID=mrna1;Parent=gene1
+'''
+
+class TestIntervalIndex(unittest.TestCase):
+    def setUp(self):
+        (fhandle, self.fname) = tempfile.mkstemp(suffix='.bgi')
+        os.close(fhandle)
+
+    def tearDown(self):
+        os.unlink(self.fname)
+
+    def test_bed(self):
+        build_interval_index(StringIO(BED), self.fname, window = 1000)
+        index = IntervalIndex(self.fname)
+        self.assertEqual(index.count('chr1'), 3)
+        table = index.fetch('chr1', 180, 3000)
+        self.assertEqual(table.names, ['feat1', 'long'])
+        self.assertEqual(list(table.strands), [1, -1])
+        self.assertEqual(len(index.fetch('chr1', 4000, 4100)), 1)
+        self.assertEqual(len(index.fetch('chr1', 5000, 39999)), 0)
+        self.assertEqual(len(index.fetch('chr3', 0, 100)), 0)
+
+    def test_gff(self):
+        build_interval_index(StringIO(GFF), self.fname, format = 'gff')
+        index = IntervalIndex(self.fname)
+        table = index.fetch('chr1', 0, 1000)
+        self.assertEqual(list(table.starts), [100, 100])
+        self.assertEqual(table.types, ['gene', 'mRNA'])
+        self.assertEqual(table.names, ['ABC1', 'mrna1'])
+
+    def test_random_queries(self):
+        intervals = []
+        lines = []
+        for i in range(2000):
+            start = random.randint(0, 100000)
+            end = start + random.randint(1, 3000)
+            intervals.append((start, end, 'f%i' % i))
+            lines.append('chr1\t%i\t%i\tf%i\n' % (start, end, i))
+        build_interval_index(StringIO(''.join(lines)), self.fname, window = 512)
+        index = IntervalIndex(self.fname)
+        for i in range(50):
+            qstart = random.randint(0, 100000)
+            qend = qstart + random.randint(1, 5000)
+            expected = sorted(n for s, e, n in intervals if s < qend and e > qstart)
+            self.assertEqual(sorted(index.fetch('chr1', qstart, qend).names), expected)
+
+    def test_fill_track(self):
+        build_interval_index(StringIO(BED), self.fname)
+        track = IntervalIndex(self.fname).fill_track(tracks.BaseTrack(), 'chr1', 0, 1000)
+        self.assertEqual(len(track.features), 2)
+        self.assertTrue(isinstance(track.features[0], features.Simple))
+        self.assertEqual((track.xmin, track.xmax), (100, 5000))
+
+    def test_to_features(self):
+        '''stranded genes are drawn as in the importers'''
+        build_interval_index(StringIO(GFF), self.fname, format = 'gff')
+        gene, mrna = IntervalIndex(self.fname).fetch('chr1', 0, 1000).to_features()
+        self.assertTrue(isinstance(gene, features.GeneSeqFeature))
+        self.assertEqual((gene.strand, gene.start, gene.end), (1, 100, 200))
+        self.assertTrue(isinstance(mrna, features.Simple))
+        build_interval_index(StringIO(BED), self.fname)
+        feat, long_feat = IntervalIndex(self.fname).fetch('chr1', 0, 1000).to_features(features.SegmentedFeature, segments = [])
+        self.assertEqual((feat.strand, long_feat.strand), (1, -1))
+
+def test_suite():
+    return unittest.makeSuite(TestIntervalIndex)
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,81 @@
+import tempfile
+import unittest
+from matplotlib.text import Annotation
+from biograpy import Panel, tracks, features
+from biograpy.labels import place_labels, truncate
+
+class TestPlaceLabels(unittest.TestCase):
+    def test_rows(self):
+        '''labels 10 characters long, 1 pixel per character'''
+        chars = place_labels([0, 0, 0, 1, 1], [0, 30, 37, 0, 5], [10] * 5, 1., 100)
+        self.assertEqual(list(chars), [10, 6, 10, 0, 10])
+        self.assertEqual(list(place_labels([], [], [], 1., 100)), [])
+
+    def test_dropped_label_space(self):
+        '''the space of a dropped label is given to the previous one'''
+        chars = place_labels([0, 0, 0], [0, 8, 10], [10, 10, 10], 1., 100)
+        self.assertEqual(list(chars), [9, 0, 10])
+        chars = place_labels([0, 0, 0], [0, 8, 11], [10, 10, 10], 1., 100)
+        self.assertEqual(list(chars), [10, 0, 10])
+
+    def test_truncate(self):
+        self.assertEqual(truncate('feature name', 7), 'feat...')
+        self.assertEqual(truncate('feature', 7), 'feature')
+
+
+class TestDeclutter(unittest.TestCase):
+    def draw(self, feature_labels):
+        '''names are dropped, shortened and drawn whole'''
+        panel = Panel(fig_width = 1000)
+        track = tracks.BaseTrack(*[features.Simple(start, start + 10, name = 'feature number %i' % start) 
+                                   for start in (0, 50, 300, 320, 600, 1000)],
+                                 feature_labels = feature_labels)
+        panel.add_track(track)
+        panel.save(tempfile.TemporaryFile(), format = 'png')
+        return panel, track
+
+    def position(self, feat):
+        '''position of the name in the feature row'''
+        x, y = feat.feat_name[0].get_position()
+        return x, y - feat.offset
+
+    def test_declutter(self):
+        panel, track = self.draw('declutter')
+        labels = [feat.feat_name[0].get_text() for feat in track.features if feat.feat_name]
+        '''the last name would end out of the axis'''
+        self.assertEqual(labels, ['feat...', 'feature number 50', 'feature number 320', 'feature number 600'])
+        self.assertEqual(len([artist for artist in panel.track_axes[0].artists if isinstance(artist, Annotation)]), 
+                         len(labels))
+        '''names are not drawn again if unchanged'''
+        artists = [id(feat.feat_name[0]) for feat in track.features if feat.feat_name]
+        track.invalidate()
+        panel.save(tempfile.TemporaryFile(), format = 'png')
+        self.assertEqual([id(feat.feat_name[0]) for feat in track.features if feat.feat_name], artists)
+        panel.close()
+        '''names are drawn where the whole names are'''
+        panel, track = self.draw('all')
+        '''names take more rows when they are part of the feature footprints'''
+        self.assertEqual(track.drawn_lines, 2)
+        positions = [self.position(feat) for feat in track.features]
+        panel.close()
+        panel, track = self.draw('declutter')
+        self.assertEqual(track.drawn_lines, 1)
+        for feat, position in zip(track.features, positions):
+            if feat.feat_name:
+                x, y = self.position(feat)
+                self.assertEqual(x, position[0])
+                self.assertAlmostEqual(y, position[1])
+        panel.close()
+
+    def test_none(self):
+        panel, track = self.draw('none')
+        self.assertEqual([feat for feat in track.features if feat.feat_name], [])
+        panel.close()
+
+
+def test_suite():
+    return unittest.TestSuite([unittest.makeSuite(TestPlaceLabels),
+                               unittest.makeSuite(TestDeclutter)])
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,69 @@
+import tempfile
+import unittest
+import numpy as np
+from multiprocessing import Pool
+from cStringIO import StringIO
+from PIL import Image
+from biograpy import striprender
+from biograpy.scene import build_scene, render_scene
+from biograpy.parallelrender import bands
+from biograpy.tests.panels import tall_panel, image, same
+
+
+class TestParallelRender(unittest.TestCase):
+    def setUp(self):
+        self.pool = Pool(2)
+
+    def tearDown(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def test_bands(self):
+        panel = tall_panel(30)
+        scene = build_scene(panel)
+        panel.close()
+        height = int(scene.data['size'][1] * scene.data['dpi'])
+        found = bands(scene)
+        self.assertEqual([axes for top, rows, axes in found], [0, 1, 2])
+        self.assertEqual(found[0][0], 0)
+        self.assertEqual(sum([rows for top, rows, axes in found]), height)
+
+    def test_same_image(self):
+        '''the bands give the image of the scene and the html map of the panel'''
+        panel = tall_panel(30)
+        expected = StringIO()
+        render_scene(build_scene(panel), expected, format = 'png')
+        panel.close()
+        panel = tall_panel(30)
+        panel.save(StringIO(), format = 'png')
+        htmlmap = panel.htmlmap
+        panel.close()
+        for format in ('png', 'tiff'):
+            panel = tall_panel(30)
+            output = StringIO()
+            panel.save(output, format = format, workers = self.pool)
+            panel.close()
+            self.assertTrue(same(image(output), image(expected)))
+            if format == 'png':
+                self.assertEqual(panel.htmlmap, htmlmap)
+
+    def test_workers(self):
+        panel = tall_panel(30)
+        path = unicode(tempfile.mktemp(suffix = '.png'))
+        panel.save(path, workers = 2)
+        panel.close()
+        self.assertEqual(Image.open(path).format, 'PNG')
+        self.assertRaises(ValueError, tall_panel(30).save, StringIO(), format = 'svg', workers = 2)
+
+    def test_uniform_strips(self):
+        pixels = np.arange(10 * 2 * 4, dtype = np.uint8).reshape(10, 2, 4)
+        strips = list(striprender.uniform_strips([pixels[:1], pixels[1:6], pixels[6:7], pixels[7:]], 4))
+        self.assertEqual([len(strip) for strip in strips], [4, 4, 2])
+        self.assertTrue((np.concatenate(strips) == pixels).all())
+
+
+def test_suite():
+    return unittest.TestSuite([unittest.makeSuite(TestParallelRender)])
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,67 @@
+import re
+import tempfile
+import unittest
+import matplotlib.pyplot as plt
+from cStringIO import StringIO
+from biograpy import Panel, tracks, features
+from biograpy.figurepool import FigurePool
+from biograpy.pdfexport import PDFBatch, save_pdf
+
+def panels(n, figure_pool = None):
+    for i in range(n):
+        panel = Panel(fig_width = 500, figure_pool = figure_pool)
+        panel.add_track(tracks.BaseTrack(features.Simple(10, 300, name = 'protein %i' % i),
+                                         features.Simple(200, 500, name = 'domain'),
+                                         name = 'panel %i' % i))
+        yield panel
+
+def page_count(pdf):
+    return len(re.findall(r'/Type\s*/Page\b(?!s)', pdf))
+
+def font_count(pdf):
+    return len(re.findall(r'/Type\s*/Font\b', pdf))
+
+
+class TestPDFBatch(unittest.TestCase):
+    def test_save_pdf(self):
+        output = StringIO()
+        self.assertEqual(save_pdf(panels(5), output), 5)
+        pdf = output.getvalue()
+        self.assertTrue(pdf.startswith('%PDF'))
+        self.assertEqual(page_count(pdf), 5)
+        single = StringIO()
+        panel = panels(1).next()
+        panel.save(single, format = 'pdf')
+        panel.close()
+        '''fonts are embedded once for all the pages'''
+        self.assertEqual(font_count(pdf), font_count(single.getvalue()))
+        self.assertTrue(len(pdf) < 5 * len(single.getvalue()))
+
+    def test_figures_released(self):
+        figure_pool = FigurePool()
+        fignums = plt.get_fignums()
+        with PDFBatch(tempfile.TemporaryFile()) as batch:
+            for panel in panels(3, figure_pool):
+                batch.add(panel)
+                self.assertEqual(figure_pool.stats()['in_use'], 0)
+            self.assertEqual(batch.count, 3)
+        self.assertEqual(figure_pool.created, 1)
+        figure_pool.clear()
+        self.assertEqual(plt.get_fignums(), fignums)
+
+    def test_close(self):
+        output = StringIO()
+        batch = PDFBatch(output)
+        panel = panels(1).next()
+        batch.add(panel, close = False)
+        panel.save(tempfile.TemporaryFile(), format = 'png')
+        panel.close()
+        batch.close()
+        self.assertEqual(page_count(output.getvalue()), 1)
+
+
+def test_suite():
+    return unittest.TestSuite([unittest.makeSuite(TestPDFBatch)])
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
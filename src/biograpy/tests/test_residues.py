@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+from biograpy.residues import label_array, run_lengths, segments, DSSP_CODES, TOPOLOGY_CODES
+
+
+class TestRunLengths(unittest.TestCase):
+    def test_run_lengths(self):
+        starts, ends, values = run_lengths(label_array('aaBBBa'))
+        self.assertEqual(starts.tolist(), [0, 2, 5])
+        self.assertEqual(ends.tolist(), [2, 5, 6])
+        self.assertEqual(values.tolist(), ['a', 'B', 'a'])
+
+    def test_empty(self):
+        self.assertEqual([len(array) for array in run_lengths(label_array(''))], [0, 0, 0])
+        self.assertEqual(segments('', DSSP_CODES), dict(alphah = [], betas = [], coil = []))
+
+
+class TestSegments(unittest.TestCase):
+    def test_dssp(self):
+        found = segments(u'--HHHGG-EE-T', DSSP_CODES)
+        self.assertEqual(found['alphah'], [[2, 7]])
+        self.assertEqual(found['betas'], [[8, 10]])
+        '''coil takes all the other labels'''
+        self.assertEqual(found['coil'], [[0, 2], [7, 8], [10, 12]])
+
+    def test_filter(self):
+        found = segments('iiMMMMoMo', TOPOLOGY_CODES, offset = 10, min_length = 2, filtered = ('TM',))
+        self.assertEqual(found['TM'], [[12, 16]])
+        self.assertEqual(found['non_cyto'], [[16, 17], [18, 19]])
+        self.assertEqual(found['cyto'], [[10, 12]])
+
+    def test_arrays(self):
+        labels = np.array([0, 0, 1, 1, 1, 2, 0])
+        found = segments(labels, dict(helix = [1], strand = [2], coil = None))
+        self.assertEqual(found, dict(helix = [[2, 5]], strand = [[5, 6]], coil = [[0, 2], [6, 7]]))
+
+
+def test_suite():
+    return unittest.TestSuite([unittest.makeSuite(TestRunLengths),
+                               unittest.makeSuite(TestSegments)])
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
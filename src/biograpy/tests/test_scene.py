@@ -0,0 +1,58 @@
+import json
+import unittest
+from cStringIO import StringIO
+from biograpy.scene import Scene, build_scene, render_scene
+from biograpy.tests.panels import scene_panel, image
+
+
+class TestScene(unittest.TestCase):
+    def test_round_trip(self):
+        panel = scene_panel()
+        scene = panel.build_scene()
+        panel.close()
+        data = scene.dumps()
+        self.assertEqual(json.loads(data), scene.data)
+        self.assertEqual(Scene.loads(data).data, scene.data)
+        self.assertEqual(len(scene.data['axes']), 3)
+        self.assertEqual(len(scene.data['features']), 14)
+        '''features drawn alike share one style'''
+        self.assertEqual(len(set([glyph[0] for glyph in scene.data['axes'][0]['glyphs']])), 1)
+        self.assertEqual(scene.data['axes'][2]['colorbar']['label'], 'score')
+
+    def test_version(self):
+        self.assertRaises(ValueError, Scene, dict(version = 0))
+        self.assertRaises(ValueError, Scene.loads, '{}')
+        self.assertRaises(ValueError, Scene(dict(version = 1)).dumps, format = 'xml')
+
+    def test_msgpack(self):
+        try:
+            import msgpack
+        except ImportError:
+            return
+        panel = scene_panel()
+        scene = build_scene(panel)
+        panel.close()
+        self.assertEqual(Scene.loads(scene.dumps('msgpack'), 'msgpack').dumps(), scene.dumps())
+
+    def test_render(self):
+        '''the scene draws the image of the panel'''
+        panel = scene_panel()
+        expected = StringIO()
+        panel.save(expected, format = 'png')
+        htmlmap = panel.htmlmap
+        panel.close()
+        panel = scene_panel()
+        scene = Scene.loads(build_scene(panel).dumps())
+        panel.close()
+        output = StringIO()
+        self.assertEqual(render_scene(scene, output, format = 'png'), htmlmap)
+        expected, drawn = image(expected), image(output)
+        self.assertEqual(drawn.shape, expected.shape)
+        self.assertTrue((abs(drawn - expected).max(axis = 2) > 64).mean() < 0.002)
+
+
+def test_suite():
+    return unittest.TestSuite([unittest.makeSuite(TestScene)])
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
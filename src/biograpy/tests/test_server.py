@@ -0,0 +1,122 @@
+import unittest
+import base64
+import json
+import threading
+import time
+import urllib2
+from biograpy.server import RenderService, RenderServer, RenderTimeout, SpecError, build_panel
+
+SPEC = dict(panel = dict(fig_width = 500),
+            tracks = [dict(name = 'test',
+                           features = [dict(type = 'Simple', start = 10, end = 400, name = 'feat1'),
+                                       dict(type = 'SegmentedFeature', start = 500, end = 900,
+                                            segments = [[500, 600], [800, 900]], strand = 1,
+                                            name = 'feat2')]),
+                      dict(type = 'PlotTrack', ymin = 0, ymax = 10,
+                           features = [dict(type = 'BarPlotFeature', y = [1, 5, 3],
+                                            x = [100, 200, 300])])])
+
+class TestBuildPanel(unittest.TestCase):
+    def test_build(self):
+        panel = build_panel(SPEC)
+        self.assertEqual(len(panel.tracks), 2)
+        self.assertEqual(len(panel.tracks[0].features), 2)
+        panel.close()
+
+    def test_invalid(self):
+        self.assertRaises(SpecError, build_panel, dict(tracks = [dict(features = [dict(type = 'SignalFeature')])]))
+        self.assertRaises(SpecError, build_panel, dict(tracks = [dict(features = [dict(type = 'Simple')])]))
+
+class TestRenderServer(unittest.TestCase):
+    def setUp(self):
+        self.service = RenderService(workers = 1, queue_size = 2, timeout = 30)
+        self.server = RenderServer(('127.0.0.1', 0), self.service)
+        self.thread = threading.Thread(target = self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = 'http://127.0.0.1:%i' % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.service.close()
+
+    def post(self, spec):
+        request = urllib2.Request(self.url + '/render', json.dumps(spec),
+                                  {'Content-Type': 'application/json'})
+        return json.loads(urllib2.urlopen(request).read())
+
+    def test_render(self):
+        result = self.post(SPEC)
+        self.assertEqual(base64.b64decode(result['image'])[:4], '\x89PNG')
+        self.assertTrue('href="#feat1"' in result['htmlmap'])
+        spec = dict(SPEC, format = 'svg')
+        result = self.post(spec)
+        self.assertTrue('<svg' in base64.b64decode(result['image']))
+        metrics = json.loads(urllib2.urlopen(self.url + '/metrics').read())
+        self.assertEqual(metrics['completed'], 2)
+        self.assertEqual(metrics['latency_ms']['count'], 2)
+        self.assertEqual(metrics['in_flight'], 0)
+
+    def test_bad_spec(self):
+        for spec in (dict(tracks = [dict(type = 'NoTrack')]), [SPEC], 'spec', dict(tracks = [[]])):
+            try:
+                self.post(spec)
+            except urllib2.HTTPError, e:
+                self.assertEqual(e.code, 400)
+            else:
+                self.fail('invalid spec accepted')
+
+    def test_timeout(self):
+        self.assertRaises(RenderTimeout, self.service.render, SPEC, timeout = 0.0001)
+        self.assertEqual(self.service.stats()['timeouts'], 1)
+
+    def test_stuck_render(self):
+        '''a render that cannot finish in time does not hold its worker'''
+        slow = dict(panel = dict(fig_width = 500),
+                    tracks = [dict(features = [dict(start = i, end = i + 500, name = 'f%i' % i) for i in range(3000)])])
+        service = RenderService(workers = 1, queue_size = 0, timeout = 30)
+        try:
+            pool = service.pool
+            self.assertRaises(RenderTimeout, service.render, slow, timeout = 1)
+            self.assertTrue(service.pool is not pool)
+            self.assertTrue(service.render(SPEC, timeout = 10)['htmlmap'])
+            self.assertEqual(service.stats()['worker_recycles'], 1)
+        finally:
+            service.close()
+
+    def test_timeout_slot(self):
+        '''a render that times out gives back its slot once'''
+        service = RenderService(workers = 1, queue_size = 0, timeout = 30)
+        try:
+            self.assertRaises(RenderTimeout, service.render, SPEC, timeout = 0.0001)
+            self.assertTrue(service.render(SPEC)['htmlmap'])
+            time.sleep(0.2)# the result callbacks run in the pool thread
+            self.assertTrue(service._slots.acquire(False))
+            self.assertFalse(service._slots.acquire(False))
+        finally:
+            service.close()
+
+class TestMemoryCeiling(unittest.TestCase):
+    def test_recycle(self):
+        '''workers above the ceiling are replaced, renders go on'''
+        service = RenderService(workers = 1, queue_size = 2, timeout = 30, max_worker_memory = 1)
+        try:
+            pool = service.pool
+            self.assertTrue(service.render(SPEC)['htmlmap'])
+            time.sleep(0.2)# the result callback runs in the pool thread
+            stats = service.stats()
+            self.assertEqual(stats['worker_recycles'], 1)
+            self.assertTrue(stats['worker_memory'] > 1024 * 1024)
+            self.assertTrue(service.pool is not pool)
+            self.assertTrue(service.render(SPEC)['htmlmap'])
+        finally:
+            service.close()
+
+def test_suite():
+    return unittest.TestSuite([unittest.makeSuite(TestBuildPanel),
+                               unittest.makeSuite(TestRenderServer),
+                               unittest.makeSuite(TestMemoryCeiling)])
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,127 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from biograpy import Panel, tracks, features
+from biograpy.signaldata import MemmapSignal, ZoomSignal, bin_signal, build_zoom_file, open_signal
+
+class TestMemmapSignal(unittest.TestCase):
+    def setUp(self):
+        (fhandle, self.fname) = tempfile.mkstemp(suffix='.f32')
+        os.close(fhandle)
+        fh = open(self.fname, 'wb')
+        fh.write('HEADER16BYTES...')
+        np.arange(1000, dtype = np.float32).tofile(fh)
+        fh.close()
+
+    def tearDown(self):
+        os.unlink(self.fname)
+
+    def test_length(self):
+        signal = MemmapSignal(self.fname, offset = 16, start = 101)
+        self.assertEqual(signal.length, 1000)
+        self.assertEqual((signal.start, signal.end), (101, 1100))
+
+    def test_fetch_window(self):
+        signal = MemmapSignal(self.fname, offset = 16, start = 101)
+        x, ymin, ymax, ymean = signal.fetch(201, 210)
+        self.assertEqual(list(x), range(201, 211))
+        self.assertEqual(list(ymean), range(100, 110))
+
+    def test_fetch_binned(self):
+        signal = MemmapSignal(self.fname, offset = 16)
+        x, ymin, ymax, ymean = signal.fetch(bins = 10)
+        self.assertEqual(len(x), 10)
+        self.assertEqual(ymin[0], 0)
+        self.assertEqual(ymax[0], 99)
+        self.assertEqual(ymean[-1], 949.5)
+
+    def test_bin_signal(self):
+        first, ymin, ymax, ymean, counts = bin_signal(np.ones(7), 3)
+        self.assertEqual(counts.sum(), 7)
+        self.assertEqual(list(ymean), [1., 1., 1.])
+
+    def test_draw(self):
+        panel = Panel(fig_width = 500)
+        track = tracks.PlotTrack(features.SignalFeature(self.fname, offset = 16),
+                                 ymin = 0, ymax = 1000)
+        panel.add_track(track)
+        (fhandle, fname) = tempfile.mkstemp(suffix='.png')
+        os.close(fhandle)
+        panel.save(fname, xmin = 100, xmax = 900)
+        panel.close()
+        xs = track.features[0].patches[0].get_xdata()
+        self.assertTrue(len(xs) <= 500)
+        self.assertTrue(min(xs) >= 100)
+        os.unlink(fname)
+
+class TestZoomSignal(unittest.TestCase):
+    def setUp(self):
+        (fhandle, self.fname) = tempfile.mkstemp(suffix='.f32')
+        os.close(fhandle)
+        np.arange(1000, dtype = np.float32).tofile(self.fname)
+        (fhandle, self.zname) = tempfile.mkstemp(suffix='.bgz')
+        os.close(fhandle)
+        self.raw = MemmapSignal(self.fname)
+        build_zoom_file(self.raw, self.zname, chunk_size = 64)
+
+    def tearDown(self):
+        os.unlink(self.fname)
+        os.unlink(self.zname)
+
+    def test_levels(self):
+        signal = ZoomSignal(self.zname)
+        self.assertEqual(signal.levels[0]['bin_size'], 2)
+        self.assertEqual(signal.levels[-1]['count'], 1)
+        top = signal._level_data(signal.levels[-1])[0]
+        self.assertEqual((top['min'], top['max'], top['count']), (0, 999, 1000))
+        self.assertAlmostEqual(top['mean'], 499.5, 3)
+
+    def test_select_level(self):
+        signal = ZoomSignal(self.zname, raw = self.raw)
+        self.assertEqual(signal.select_level(1000, 10)['bin_size'], 64)
+        self.assertEqual(signal.select_level(10, 10), None)
+
+    def test_fetch_matches_raw(self):
+        signal = ZoomSignal(self.zname)
+        x, ymin, ymax, ymean = signal.fetch(1, 1000, 10)
+        self.assertEqual(len(x), 10)
+        self.assertEqual(ymin[0], 0)
+        self.assertEqual(ymax[-1], 999)
+        self.assertTrue(((ymin <= ymean) & (ymean <= ymax)).all())
+        self.assertTrue(((x >= 1) & (x <= 1000)).all())
+        x, ymin, ymax, ymean = signal.fetch(101, 110, 10)
+        self.assertEqual(len(x), 5)
+        signal.raw = self.raw
+        x, ymin, ymax, ymean = signal.fetch(101, 110, 10)
+        self.assertEqual(list(ymean), range(100, 110))
+
+    def test_open_signal(self):
+        self.assertTrue(isinstance(open_signal(self.zname), ZoomSignal))
+        self.assertTrue(isinstance(open_signal(self.fname), MemmapSignal))
+
+    def test_open_signal_raw(self):
+        '''zoomed in past the finest level the raw values are read'''
+        signal = open_signal(self.zname)
+        self.assertEqual(signal.raw.path, os.path.abspath(self.fname))
+        x, ymin, ymax, ymean = signal.fetch(101, 110, 10)
+        self.assertEqual(list(ymean), range(100, 110))
+        self.assertEqual(list(x), range(101, 111))
+        '''unless the raw file is gone'''
+        os.rename(self.fname, self.fname + '.moved')
+        try:
+            signal = open_signal(self.zname)
+            self.assertTrue(signal.raw is None)
+            self.assertEqual(len(signal.fetch(101, 110, 10)[0]), 5)
+        finally:
+            os.rename(self.fname + '.moved', self.fname)
+        '''or a raw source is given'''
+        raw = MemmapSignal(self.fname, start = 1)
+        self.assertTrue(open_signal(self.zname, raw = raw).raw is raw)
+
+def test_suite():
+    return unittest.TestSuite([unittest.makeSuite(TestMemmapSignal),
+                               unittest.makeSuite(TestZoomSignal)])
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,56 @@
+import tempfile
+import unittest
+import numpy as np
+from cStringIO import StringIO
+from PIL import Image
+from biograpy.striprender import render_strips, write_png, write_tiff
+from biograpy.tests.panels import tall_panel, image, same
+
+def panel_image(panel, **kwargs):
+    output = StringIO()
+    panel.save(output, **kwargs)
+    panel.close()
+    return image(output)
+
+
+class TestStripRender(unittest.TestCase):
+    def test_same_image(self):
+        '''strips give the image drawn by matplotlib'''
+        expected = panel_image(tall_panel(), format = 'png')
+        self.assertTrue(expected.shape[0] > 300)
+        self.assertTrue(same(panel_image(tall_panel(), format = 'png', strip_height = 100), expected))
+        self.assertTrue(same(panel_image(tall_panel(), format = 'tiff', strip_height = 77), expected))
+
+    def test_strips(self):
+        panel = tall_panel()
+        panel.fig.set_figheight(panel.fig_width)
+        panel._draw_tracks()
+        height = int(panel.fig.bbox.height)
+        strips = list(render_strips(panel, 100))
+        panel.close()
+        self.assertEqual([strip.shape[0] for strip in strips[:-1]], [100] * (len(strips) - 1))
+        self.assertEqual(sum([strip.shape[0] for strip in strips]), height)
+
+    def test_writers(self):
+        pixels = np.arange(5 * 3 * 4, dtype = np.uint8).reshape(5, 3, 4)
+        for writer in (write_png, write_tiff):
+            output = StringIO()
+            writer(output, 3, 5, [pixels[:2], pixels[2:4], pixels[4:]], dpi = 80)
+            output.seek(0)
+            self.assertTrue((np.asarray(Image.open(output)) == pixels).all())
+
+    def test_format(self):
+        panel = tall_panel()
+        self.assertRaises(ValueError, panel.save, tempfile.mktemp(suffix = '.svg'), strip_height = 100)
+        self.assertRaises(ValueError, panel.save, StringIO(), format = 'pdf', strip_height = 100)
+        path = unicode(tempfile.mktemp(suffix = '.tif'))
+        panel.save(path, strip_height = 100)
+        panel.close()
+        self.assertEqual(Image.open(path).format, 'TIFF')
+
+
+def test_suite():
+    return unittest.TestSuite([unittest.makeSuite(TestStripRender)])
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
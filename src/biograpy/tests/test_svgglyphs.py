@@ -0,0 +1,121 @@
+import re
+import gzip
+import tempfile
+import unittest
+from cStringIO import StringIO
+from xml.etree import cElementTree as ElementTree
+from biograpy import Panel, tracks, features
+from biograpy.svgglyphs import share_glyphs, _parse_path
+
+SVG = 'http://www.w3.org/2000/svg'
+XLINK = 'http://www.w3.org/1999/xlink'
+
+DOCUMENT = '''<?xml version="1.0" encoding="utf-8" standalone="no"?>
+<svg height="100pt" version="1.1" viewBox="0 0 100 100" width="100pt" xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">
+ <g id="figure_1">
+  <path clip-path="url(#p1)" d="M 10 10 L 20 10 L 15 5 z" style="fill:#ff0000;stroke:#000000;stroke-width:0.5;"/>
+  <path clip-path="url(#p1)" d="M 40.5 30 L 50.5 30 L 45.5 25 z" style="fill:#ff0000;stroke:#000000;stroke-width:0.5;"/>
+  <path clip-path="url(#p1)" d="M 2 60 L 12 60 L 7 55 z" style="fill:#00ff00;"/>
+  <path clip-path="url(#p1)" d="M 2 90 L 12 90 L 7 85 z" style="fill:#0000ff;"/>
+  <path d="M 0 100 L 100 100 L 100 0 L 0 0 z" style="fill:#ffffff;"/>
+ </g>
+ <defs>
+  <clipPath id="p1">
+   <rect height="90" width="90" x="5" y="5"/>
+  </clipPath>
+ </defs>
+</svg>
+'''
+
+def absolute_paths(svg):
+    '''the absolute points and style of every drawn path, expanding uses'''
+    root = ElementTree.fromstring(svg)
+    defs = {}
+    classes = {}
+    for style in root.iter('{%s}style' % SVG):
+        for name, declarations in re.findall(r'\.(\w+)\{([^}]*)\}', style.text):
+            classes[name] = declarations
+    for path in root.iter('{%s}path' % SVG):
+        if path.get('id'):
+            defs[path.get('id')] = _parse_path(path.get('d'))
+    drawn = []
+    for element in root.iter():
+        style = element.get('style') or classes.get(element.get('class'))
+        if element.tag == '{%s}path' % SVG and not element.get('id'):
+            points = [point for command, points in _parse_path(element.get('d')) for point in points]
+        elif element.tag == '{%s}use' % SVG and element.get('{%s}href' % XLINK).startswith('#glyph'):
+            commands = defs[element.get('{%s}href' % XLINK)[1:]]
+            a, d, e, f = 1., 1., float(element.get('x', 0)), float(element.get('y', 0))
+            if element.get('transform'):
+                a, b, c, d, e, f = map(float, re.findall(r'[-\d.]+', element.get('transform')))
+            points = [(a * x + e, d * y + f) for command, points in commands for x, y in points]
+        else:
+            continue
+        xs, ys = zip(*points)
+        drawn.append(((round(min(xs), 2), round(min(ys), 2), round(max(xs), 2), round(max(ys), 2)), style))
+    return sorted(drawn)
+
+
+class TestShareGlyphs(unittest.TestCase):
+    def test_document(self):
+        svg = share_glyphs(DOCUMENT)
+        root = ElementTree.fromstring(svg)
+        uses = list(root.iter('{%s}use' % SVG))
+        self.assertEqual(len(uses), 5)
+        self.assertEqual(len([path for path in root.iter('{%s}path' % SVG)]), 2)
+        self.assertEqual(uses[1].get('x'), '40.5')
+        self.assertEqual(uses[0].get('class'), uses[1].get('class'))
+        self.assertEqual(uses[4].get('transform'), 'matrix(100 0 0 100 0 0)')
+        self.assertEqual(absolute_paths(svg), absolute_paths(DOCUMENT))
+
+    def test_clip_path(self):
+        svg = share_glyphs(DOCUMENT)
+        self.assertEqual(svg.count('clip-path="url(#p1)"'), 3)# the glyphs near the clip border
+        self.assertEqual(svg.count('<g clip-path="url(#p1)"><use'), 3)
+
+    def test_min_count(self):
+        svg = share_glyphs(DOCUMENT, min_count = 5)
+        self.assertEqual(svg.count('<use'), 1)# the unit square
+        self.assertTrue('class=' not in svg)
+
+
+class TestPanelSharedGlyphs(unittest.TestCase):
+    def test_save(self):
+        panel = Panel(fig_width = 600)
+        panel.add_track(tracks.BaseTrack(*[features.GeneSeqFeature(None, start = i * 40, end = i * 40 + 200,
+                                                                   strand = (i % 2) and 1 or -1, name = 'g%i' % i,
+                                                                   exons = [(i * 40 + 20, i * 40 + 60)])
+                                           for i in range(6)]))
+        panel.add_track(tracks.BaseTrack(*[features.Simple(i * 50, i * 50 + 100, url = 'http://localhost/%i' % i)
+                                           for i in range(4)]))
+        plain = StringIO()
+        panel.save(plain, format = 'svg')
+        shared = StringIO()
+        panel.save(shared, format = 'svg', shared_glyphs = True)
+        panel.close()
+        self.assertTrue(len(shared.getvalue()) < len(plain.getvalue()))
+        self.assertEqual(absolute_paths(shared.getvalue()), absolute_paths(plain.getvalue()))
+        root = ElementTree.fromstring(shared.getvalue())
+        ids = [g.get('id') for g in root.iter('{%s}g' % SVG)]
+        self.assertTrue('feature0' in ids)
+        self.assertTrue('feature0.1' in ids)
+        links = lambda svg: [a.get('{%s}href' % XLINK) for a in ElementTree.fromstring(svg).iter('{%s}a' % SVG)]
+        self.assertEqual(links(shared.getvalue()), links(plain.getvalue()))
+        self.assertTrue('http://localhost/3' in links(shared.getvalue()))
+
+    def test_save_path(self):
+        panel = Panel(fig_width = 600)
+        panel.add_track(tracks.BaseTrack(*[features.Simple(i * 50, i * 50 + 100) for i in range(4)]))
+        path = unicode(tempfile.mktemp(suffix = '.svgz'))
+        panel.save(path, shared_glyphs = True)
+        panel.close()
+        ids = [g.get('id') for g in ElementTree.fromstring(gzip.open(path).read()).iter('{%s}g' % SVG)]
+        self.assertTrue('feature0' in ids)
+
+
+def test_suite():
+    return unittest.TestSuite([unittest.makeSuite(TestShareGlyphs),
+                               unittest.makeSuite(TestPanelSharedGlyphs)])
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
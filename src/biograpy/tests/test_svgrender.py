@@ -0,0 +1,149 @@
+import re
+import gzip
+import random
+import tempfile
+import unittest
+from cStringIO import StringIO
+from xml.etree import cElementTree as ElementTree
+from biograpy import Panel, tracks, features
+from biograpy.svgglyphs import _parse_path
+from biograpy.svgrender import _collapse
+
+SVG = 'http://www.w3.org/2000/svg'
+XLINK = 'http://www.w3.org/1999/xlink'
+
+def gene_panel():
+    panel = Panel(fig_width = 600)
+    panel.add_track(tracks.BaseTrack(features.GeneSeqFeature(None, start = 100, end = 400, strand = 1, name = 'gene1',
+                                                             exons = [(150, 200)], url = 'http://localhost/1'),
+                                     features.GeneSeqFeature(None, start = 500, end = 900, strand = -1, name = 'gene2'),
+                                     name = 'genes'))
+    return panel
+
+def feature_groups(svg):
+    '''the elements of the feature groups by id'''
+    groups = {}
+    for g in ElementTree.fromstring(svg).iter('{%s}g' % SVG):
+        if (g.get('id') or '').startswith('feature'):
+            groups[g.get('id')] = list(g)
+    return groups
+
+
+class TestCollapse(unittest.TestCase):
+    def test_rows(self):
+        margins = [(0, 10), (5, 20), (10, 30), (21, 40), (50, 60), (0, 100)]
+        self.assertEqual(_collapse(margins), [[0, 3, 4], [1], [2], [5]])
+        self.assertEqual(_collapse([]), [])
+
+    def test_same_as_track(self):
+        '''rows are filled as BaseTrack._collapse does'''
+        rand = random.Random(1)
+        margins = []
+        for i in range(300):
+            start = rand.randint(0, 1000)
+            margins.append((start, start + rand.randint(0, 60)))
+        rows = []
+        remaining = range(len(margins))
+        while remaining:
+            line_controller = []
+            rows.append([])
+            for i in remaining:
+                if not tracks.BaseTrack._collides(margins[i][0], margins[i][1], line_controller):
+                    line_controller.append(margins[i])
+                    rows[-1].append(i)
+            remaining = [i for i in remaining if i not in rows[-1]]
+        self.assertEqual(_collapse(margins), rows)
+
+
+class TestSVGRenderer(unittest.TestCase):
+    def test_geometry(self):
+        '''glyphs are where matplotlib draws them'''
+        panel = gene_panel()
+        panel._draw_tracks()
+        panel._set_feature_ids()
+        output = StringIO()
+        panel.fig.savefig(output, format = 'svg', dpi = panel.fig.get_dpi())
+        panel.close()
+        expected = {}
+        for g in ElementTree.fromstring(output.getvalue()).iter('{%s}g' % SVG):
+            if (g.get('id') or '').startswith('feature'):
+                expected[g.get('id')] = [point for path in g.iter('{%s}path' % SVG)
+                                         for command, points in _parse_path(path.get('d')) for point in points]
+        panel = gene_panel()
+        output = StringIO()
+        panel.save(output, format = 'svg', backend = 'svg')
+        panel.close()
+        groups = feature_groups(output.getvalue())
+        self.assertEqual(sorted(groups), ['feature0', 'feature1'])
+        arrow, exon = groups['feature0']
+        points = [point for command, points in _parse_path(arrow.get('d')) for point in points]
+        for (x1, y1), (x2, y2) in zip(points, expected['feature0']):
+            self.assertAlmostEqual(x1, x2, 1)
+            self.assertAlmostEqual(y1, y2, 1)
+        xs = [x for x, y in expected['feature0.1']]
+        ys = [y for x, y in expected['feature0.1']]
+        self.assertAlmostEqual(float(exon.get('x')), min(xs), 1)
+        self.assertAlmostEqual(float(exon.get('y')), min(ys), 1)
+        self.assertAlmostEqual(float(exon.get('width')), max(xs) - min(xs), 1)
+        self.assertAlmostEqual(float(exon.get('height')), max(ys) - min(ys), 1)
+
+    def test_document(self):
+        panel = gene_panel()
+        panel.add_track(tracks.BaseTrack(features.Simple(100, 300, name = 'a & b'),
+                                         features.Simple(200, 400, name = 'overlapping'),
+                                         features.SegmentedFeature(500, 900, [(500, 600), (800, 900)]),
+                                         features.SinglePositionFeature(None, start = 700, marker = 's')))
+        output = StringIO()
+        panel.save(output, format = 'svg', backend = 'svg')
+        panel.close()
+        root = ElementTree.fromstring(output.getvalue())
+        texts = [text.text for text in root.iter('{%s}text' % SVG)]
+        for name in ('gene1', 'gene2', 'genes', 'a & b', 'overlapping', '100'):
+            self.assertTrue(name in texts)
+        links = [a.get('{%s}href' % XLINK) for a in root.iter('{%s}a' % SVG)]
+        self.assertEqual(links, ['http://localhost/1'])
+        groups = feature_groups(output.getvalue())
+        self.assertEqual(len(groups), 6)
+        self.assertEqual([child.tag for child in groups['feature4']],
+                         ['{%s}rect' % SVG, '{%s}rect' % SVG, '{%s}path' % SVG])
+        '''overlapping features are in different rows'''
+        self.assertNotEqual(groups['feature2'][0].get('y'), groups['feature3'][0].get('y'))
+        self.assertEqual(groups['feature2'][0].get('y'), groups['feature4'][0].get('y'))
+
+    def test_fallback(self):
+        panel = gene_panel()
+        plot = tracks.PlotTrack(features.PlotFeature([0.1, 0.5, -0.3, 0.8], x = [100, 300, 500, 900]), name = 'plot')
+        panel.add_track(plot)
+        panel.add_track(tracks.BaseTrack(features.Simple(100, 300, score = .4, use_score_for_color = True), draw_cb = True))
+        output = StringIO()
+        panel.save(output, format = 'svg', backend = 'svg')
+        svg = output.getvalue()
+        root = ElementTree.fromstring(svg)
+        ids = [element.get('id') for element in root.iter() if element.get('id')]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertTrue('t1_figure_1' in ids)
+        self.assertTrue('t2_figure_1' in ids)
+        references = re.findall(r'url\(#([^)]+)\)', svg) + re.findall(r'xlink:href="#([^"]+)"', svg)
+        self.assertTrue(references)
+        self.assertTrue(set(references) <= set(ids))
+        '''the panel can still be drawn with matplotlib'''
+        self.assertTrue(plot.is_dirty())
+        panel.save(tempfile.TemporaryFile(), format = 'png')
+        panel.close()
+
+    def test_save(self):
+        panel = gene_panel()
+        path = unicode(tempfile.mktemp(suffix = '.svgz'))
+        panel.save(path, backend = 'svg')
+        self.assertTrue('gene1' in gzip.open(path).read())
+        self.assertRaises(ValueError, panel.save, tempfile.mktemp(suffix = '.png'), backend = 'svg')
+        self.assertRaises(ValueError, panel.save, StringIO(), format = 'svg', backend = 'unknown')
+        panel.close()
+
+
+def test_suite():
+    return unittest.TestSuite([unittest.makeSuite(TestCollapse),
+                               unittest.makeSuite(TestSVGRenderer)])
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
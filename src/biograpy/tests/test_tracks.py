@@ -0,0 +1,271 @@
+import unittest
+import tempfile
+import matplotlib.cm as cm
+from biograpy import Panel, tracks, features
+
+class TestTrackColors(unittest.TestCase):
+    def draw(self, *tracks2draw):
+        panel = Panel(fig_width = 500)
+        panel.extend(tracks2draw)
+        fh = tempfile.TemporaryFile()
+        panel.save(fh, format = 'png')
+        panel.close()
+
+    def test_score_colors(self):
+        track = tracks.BaseTrack(*[features.Simple(i * 100, i * 100 + 50, score = i / 10.,
+                                                   use_score_for_color = True)
+                                   for i in range(10)])
+        self.draw(track)
+        colormap = cm.get_cmap(track.default_cm)
+        for feat in track.features:
+            self.assertEqual(feat.fc, tuple(colormap(feat.score)))
+            self.assertEqual(feat.ec, feat.fc)
+
+    def test_mixed_score_colors(self):
+        '''integer scores index the colormap as in a lookup per feature'''
+        track = tracks.BaseTrack(*[features.Simple(i * 100, i * 100 + 50, score = score,
+                                                   use_score_for_color = True)
+                                   for i, score in enumerate([1, 0.5, 200, 1.])])
+        self.draw(track)
+        colormap = cm.get_cmap(track.default_cm)
+        for feat in track.features:
+            self.assertEqual(feat.fc, tuple(colormap(feat.score)))
+        self.assertNotEqual(track.features[0].fc, track.features[3].fc)
+
+    def test_number_colors(self):
+        track = tracks.BaseTrack(*[features.Simple(i * 100, i * 100 + 50, color_by_cm = True)
+                                   for i in range(5)])
+        self.draw(track)
+        fcs = [feat.fc for feat in track.features]
+        self.assertEqual(len(set(fcs)), 5)
+        self.assertEqual(fcs[0], tuple(track.cm(track.norm(1))))
+
+    def test_barplot_colors(self):
+        feat = features.BarPlotFeature([1, 2, 3], x = [10, 20, 30], color_by_cm = True)
+        self.draw(tracks.PlotTrack(feat, ymin = 0, ymax = 4))
+        self.assertEqual(len(feat.patches), 1)
+        self.assertEqual(tuple(feat.patches[0].get_facecolors()[-1])[:3], tuple(feat.cm(1.))[:3])
+
+class TestPanelGrid(unittest.TestCase):
+    def test_grid_collection(self):
+        panel = Panel(fig_width = 500, grid = 'both')
+        for i in range(5):
+            panel.add_track(tracks.BaseTrack(features.Simple(100, 1000 + i)))
+        fh = tempfile.TemporaryFile()
+        panel.save(fh, format = 'png')
+        major, minor = panel._auto_xticks()
+        for axis in panel.track_axes:
+            self.assertEqual(len(axis.collections), 1)
+            self.assertEqual(len(axis.collections[0].get_segments()), len(major) + len(minor))
+            self.assertEqual(len(axis.lines), 0)
+        panel.close()
+
+    def test_auto_xticks(self):
+        panel = Panel()
+        panel.xmin, panel.xmax = 1, 1000
+        major, minor = panel._auto_xticks()
+        self.assertEqual(major, range(1, 1001, 100))
+        self.assertEqual(minor[:3], [1, 26, 51])
+        self.assertTrue(minor[-1] <= 1000)
+
+class TestIncrementalLayout(unittest.TestCase):
+    def build(self, n, **kwargs):
+        panel = Panel(fig_width = 600)
+        edited = tracks.BaseTrack(*[features.Simple(50 * i, 50 * i + 300, name = 'f%i' % i, **kwargs)
+                                    for i in range(n)], name = 'edited')
+        other = tracks.BaseTrack(features.Simple(100, 800, name = 'other', fc = 'r', color_by_cm = False))
+        panel.extend([other, edited])
+        return panel, edited
+
+    def render(self, panel):
+        fh = tempfile.TemporaryFile()
+        panel.save(fh, format = 'png')
+        fh.seek(0)
+        return fh.read(), panel.htmlmap
+
+    def check_append(self, **kwargs):
+        panel, edited = self.build(3, **kwargs)
+        self.render(panel)
+        other_axis, edited_axis = panel.track_axes
+        for i in (3, 4):
+            edited.append(features.Simple(50 * i, 50 * i + 300, name = 'f%i' % i, **kwargs))
+        self.assertTrue(edited.is_dirty())
+        updated = self.render(panel)
+        self.assertFalse(edited.is_dirty())
+        self.assertTrue(panel.track_axes[0] is other_axis)
+        self.assertFalse(panel.track_axes[1] is edited_axis)
+        panel.close()
+        fresh_panel = self.build(5, **kwargs)[0]
+        fresh = self.render(fresh_panel)
+        fresh_panel.close()
+        self.assertEqual(updated, fresh)
+
+    def test_append_features(self):
+        self.check_append(color_by_cm = False, fc = 'g')
+
+    def test_append_colored_by_number(self):
+        self.check_append()
+
+    def test_add_track(self):
+        panel, edited = self.build(3)
+        self.render(panel)
+        axes = list(panel.track_axes)
+        panel.add_track(tracks.BaseTrack(features.Simple(10, 400, name = 'new')))
+        self.render(panel)
+        self.assertEqual(len(panel.track_axes), 3)
+        self.assertTrue(panel.track_axes[0] is axes[0])
+        self.assertTrue(panel.track_axes[1] is axes[1])
+        edited.invalidate()
+        self.render(panel)
+        self.assertFalse(panel.track_axes[1] is axes[1])
+        panel.save(tempfile.TemporaryFile(), format = 'png', xmin = 100)
+        self.assertFalse(panel.track_axes[0] is axes[0])
+        panel.close()
+
+class TestIdempotentRender(unittest.TestCase):
+    def artists(self, track):
+        return [id(artist) for feat in track.features 
+                for artist in feat.patches + feat.feat_name]
+
+    def test_render_once(self):
+        feat = features.Simple(100, 500, name = 'feat')
+        self.assertTrue(feat.render((0, 1000, 800)))
+        patches = list(feat.patches)
+        self.assertFalse(feat.render((0, 1000, 800)))
+        self.assertEqual(feat.patches, patches)
+        self.assertTrue(feat.render((100, 1000, 800)))
+        self.assertNotEqual(feat.patches, patches)
+
+    def test_offset(self):
+        feat = features.Simple(100, 500, name = 'feat')
+        feat.render()
+        y = feat.feat_name[0].get_position()[1]
+        feat.set_offset(2)
+        feat.set_offset(3)
+        self.assertEqual(feat.feat_name[0].get_position()[1], y + 3)
+        self.assertEqual(feat.feat_name[0].xytext[1], y + 3)
+
+    def test_save_again(self):
+        panel = Panel(fig_width = 800)
+        track = tracks.BaseTrack(features.Simple(100, 756, name = 'feat1'),
+                                 features.Simple(300, 1056, name = 'feat2'), 
+                                 features.Simple(1100, 1456, name = 'feat3'))
+        panel.add_track(track)
+        panel.save(tempfile.TemporaryFile(), format = 'png')
+        artists = self.artists(track)
+        htmlmap = panel.htmlmap
+        track.invalidate()
+        panel.save(tempfile.TemporaryFile(), format = 'png')
+        self.assertEqual(self.artists(track), artists)
+        self.assertEqual(panel.htmlmap, htmlmap)
+        self.assertEqual(len(panel.ax.texts) + len(panel.ax.patches), 0)
+        self.assertEqual(len(panel.track_axes[0].patches), 3)
+        panel.close()
+
+class TestMaxRows(unittest.TestCase):
+    def draw(self, n, **kwargs):
+        panel = Panel(fig_width = 600)
+        track = tracks.BaseTrack(*[features.Simple(10 * i, 10 * i + 500, name = 'f%i' % i) for i in range(n)], 
+                                 **kwargs)
+        panel.add_track(track)
+        panel.save(tempfile.TemporaryFile(), format = 'png')
+        return panel, track
+
+    def test_overflow(self):
+        panel, track = self.draw(30, max_rows = 5)
+        self.assertEqual(track.drawn_lines, 6)
+        self.assertEqual(len(track.hidden_features), 25)
+        self.assertEqual(panel.Drawn_objects, track.drawn_features())
+        self.assertEqual(len(panel.Drawn_objects), 6)
+        self.assertTrue(panel.Drawn_objects[-1] is track.overflow_feature)
+        self.assertEqual(len(panel.track_axes[0].patches), 6)
+        areas = panel.htmlmap.split('\n')
+        self.assertTrue('alt="25 more features"' in areas[-2])
+        self.assertTrue('f29' in areas[-2])
+        panel.close()
+
+    def test_no_overflow(self):
+        panel, track = self.draw(3, max_rows = 5)
+        self.assertEqual(track.hidden_features, [])
+        self.assertTrue(track.overflow_feature is None)
+        self.assertEqual(track.drawn_features(), track.features)
+        panel.close()
+
+    def test_ordered(self):
+        panel, track = self.draw(10, max_rows = 4, sort_by = None)
+        self.assertEqual(track.hidden_features, track.features[4:])
+        self.assertEqual(track.drawn_lines, 5)
+        panel.close()
+
+    def test_append(self):
+        panel, track = self.draw(30, max_rows = 5)
+        track.append(features.Simple(0, 100, name = 'appended'))
+        panel.save(tempfile.TemporaryFile(), format = 'png')
+        self.assertEqual(len(track.hidden_features), 26)
+        self.assertEqual(track.overflow_feature.name, '26 more features')
+        self.assertEqual(track.drawn_lines, 6)
+        panel.close()
+
+    def test_counts(self):
+        hidden = [features.Simple(0, 49), features.Simple(25, 74), features.Simple(200, 300)]
+        overflow = features.OverflowFeature(hidden, xmin = 0, xmax = 100, bins = 4)
+        self.assertEqual(list(overflow.counts), [1, 2, 1, 0])
+        self.assertTrue(overflow.render())
+        self.assertEqual(overflow.patches[0].get_xy()[:, 1].max(), 1.)
+
+class TestOrdering(unittest.TestCase):
+    def track(self, **kwargs):
+        feats = [features.Simple(0, 100, name = 'a', score = 2.),
+                 features.Simple(0, 300, name = 'b', score = 1.),
+                 features.Simple(0, 50, name = 'c', score = 2.),
+                 features.GeneSeqFeature(None, start = 0, end = 100, strand = -1, name = 'd', score = 1.),
+                 features.GeneSeqFeature(None, start = 0, end = 200, strand = 1, name = 'e', score = 0.5),]
+        return tracks.BaseTrack(*feats, **kwargs)
+
+    def names(self, feats):
+        return [feat.name for feat in feats]
+
+    def test_order(self):
+        '''features with the same key keep their order, no artists needed'''
+        track = self.track()
+        self.assertEqual(self.names(track._order_by_score()), ['e', 'b', 'd', 'a', 'c'])
+        self.assertEqual(self.names(track._order_by_length()), ['c', 'a', 'd', 'e', 'b'])
+        self.assertEqual(self.names(track._order_by(('strand', 'score'))), ['d', 'b', 'a', 'c', 'e'])
+        track.sort_order = 'bottom'
+        self.assertEqual(self.names(track._order_by_score()), ['a', 'c', 'b', 'd', 'e'])
+        self.assertEqual(self.names(track._order_by(('strand', 'score'))), ['e', 'a', 'c', 'b', 'd'])
+        track.sort_order = 'left'
+        self.assertRaises(ValueError, track._order_by_score)
+
+    def test_layout(self):
+        for sort_by, expected in (('length', ['c', 'a', 'd', 'e', 'b']),
+                                  (('strand', 'score'), ['d', 'b', 'a', 'c', 'e'])):
+            panel = Panel(fig_width = 500)
+            track = self.track(sort_by = sort_by)
+            panel.add_track(track)
+            panel.save(tempfile.TemporaryFile(), format = 'png')
+            panel.close()
+            by_row = sorted(track.features, key = lambda feat: -feat.offset)
+            self.assertEqual(self.names(by_row), expected)
+        self.assertRaises(ValueError, self.track(sort_by = ('size',))._order_by, ('size',))
+
+    def test_unknown_sort_by(self):
+        '''an unknown sort_by string draws the features in the order they were added'''
+        panel = Panel(fig_width = 500)
+        track = self.track(sort_by = 'size')
+        panel.add_track(track)
+        panel.save(tempfile.TemporaryFile(), format = 'png')
+        panel.close()
+        by_row = sorted(track.features, key = lambda feat: -feat.offset)
+        self.assertEqual(self.names(by_row), ['a', 'b', 'c', 'd', 'e'])
+
+def test_suite():
+    return unittest.TestSuite([unittest.makeSuite(TestTrackColors),
+                               unittest.makeSuite(TestPanelGrid),
+                               unittest.makeSuite(TestIncrementalLayout),
+                               unittest.makeSuite(TestIdempotentRender),
+                               unittest.makeSuite(TestMaxRows),
+                               unittest.makeSuite(TestOrdering)])
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
@@ -11,6 +11,7 @@ there's always a simpler solution you're not yet aware of...
 
 '''
 import operator, warnings
+import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.colors as colors
 import matplotlib.cm as cm
@@ -18,6 +19,15 @@ from matplotlib.lines import Line2D
 from matplotlib.patches import Rectangle, Circle, Wedge, Polygon, FancyBboxPatch, FancyArrow
 from matplotlib.font_manager import FontProperties
 from matplotlib.text import Annotation
+from features import BaseGraphicFeature, OverflowFeature
+from labels import CHAR_WIDTH, place_labels, truncate
+
+'''numeric feature values used by the `sort_by` option'''
+SORT_KEYS = {'score' : lambda feat: feat.score,
+             'length' : lambda feat: feat.end - feat.start,
+             'start' : lambda feat: feat.start,
+             'end' : lambda feat: feat.end,
+             'strand' : lambda feat: getattr(feat, 'strand', None) or 0,}
 
 
 
@@ -98,7 +108,7 @@ class BaseTrack(object):
                               ``1*number_of feature_lines``. if forced can 
                               results in wrong feature proportions
         sort_by               ``'score'`` | ``'length'`` | ``'collapse'`` | 
-                              ``None``. 
+                              ``None``, or a tuple of sort keys. 
                               default is ``'collapse'`` 
                               
                               * ``'collapse'`` will arrange features in the \
@@ -107,10 +117,33 @@ class BaseTrack(object):
                               on score values.  
                               * ``'length'`` will arrange features basing \
                               on feature length.
-                              * ``None`` will arrange features basing \
-                              in the order they are passed to the track.
+                              * ``None``, or any other string, will \
+                              arrange features basing in the order they \
+                              are passed to the track.
+                              * a tuple of ``'score'``, ``'length'``, \
+                              ``'start'``, ``'end'`` and ``'strand'`` keys, \
+                              eg. ``('strand', 'score')``, will arrange \
+                              features by the first key, then by the next.
+                              
+                              features with the same keys keep the order they
+                              are passed to the track
         sort_order            ``'top'`` | ``'bottom'``, default is ``'top'``.
                               use to reverse order
+        max_rows              maximum number of feature rows, default is 
+                              ``None`` (no limit). features not fitting in them
+                              are listed in `hidden_features` and summarized
+                              by an :class:`~biograpy.features.OverflowFeature`
+                              drawn in a last row
+        feature_labels        ``'all'`` | ``'declutter'`` | ``'none'``. default
+                              is ``'all'``
+                              
+                              * ``'all'`` draws every feature name, and the \
+                              names take space when the rows are filled. 
+                              * ``'declutter'`` leaves the names out when the \
+                              rows are filled, then draws the names fitting \
+                              in their row, shortened if needed, see \
+                              :mod:`biograpy.labels`.
+                              * ``'none'`` draws no feature name.
         ===================== ==================================================
 '''
     
@@ -175,17 +208,35 @@ class BaseTrack(object):
             
         self.sort_by = kwargs.get('sort_by', 'collapse' )# can also be: score, length, collapse or None. None means the features are plotted in the order they get added
         self.sort_order = kwargs.get('sort_order', 'top')# can be top or bottom
+        self.max_rows = kwargs.get('max_rows', None)
+        self.feature_labels = kwargs.get('feature_labels', 'all')# can also be: declutter or none
+        self.hidden_features = []# features not drawn because of max_rows
+        self.overflow_feature = None# summary of the hidden features
         self.features = [] # this will contains all the Graphicfeatures of the panel
         self.xmin = None
         self.xmax = None
+        '''layout state, used to update the track when features are appended'''
+        self._laid_out = False
+        self._invalid = False
+        self._new_features = []
+        self._rows = []
+        self._positions = {}# feature id -> Y offset
+        self._store_layout_origin()
         
         for feature in args:
             self.add_feature(feature)
+    
+    def _store_layout_origin(self):
+        '''store the Y position and lines count a layout starts from'''
+        self._origin_Ycord = self.Ycord
+        self._origin_lines = self.drawn_lines
         
     def add_feature(self, feature):
         '''add  :class:`~biograpy.features` object to track.'''
         def add(feature):
             self.features.append(feature)
+            if self._laid_out:
+                self._new_features.append(feature)
             if self.xmin == None:
                 self.xmin = feature.start
             else:
@@ -213,6 +264,104 @@ class BaseTrack(object):
         for feature in features:
             self.add_feature(feature)
     
+    def invalidate(self):
+        '''force a complete layout of the track at the next drawing. needed 
+        after changing the track options or features already drawn'''
+        self._invalid = True
+        
+    def is_dirty(self):
+        '''``True`` if the track has to be laid out or updated before the 
+        next drawing'''
+        return (not self._laid_out) or self._invalid or bool(self._new_features)
+    
+    def _can_update(self):
+        '''``True`` if the appended features can be placed without changing 
+        the layout of the features already drawn'''
+        if (not self._laid_out) or self._invalid or self.hidden_features:
+            return False
+        return self.sort_by in ('collapse', None)
+    
+    def _colored_by_number(self):
+        '''``True`` if feature colors depend on the number of features'''
+        for feat in self.features:
+            if feat.color_by_cm and not feat.use_score_for_color:
+                return True
+        return False
+    
+    def _reset_layout(self):
+        '''restart the layout, feature artists are kept if still valid'''
+        self.Ycord = self._origin_Ycord
+        self.drawn_lines = self._origin_lines
+        self._rows = []
+        self._positions = {}
+        self.hidden_features = []
+        self.overflow_feature = None
+    
+    def _rows_full(self):
+        '''``True`` if no more feature rows can be opened'''
+        return bool(self.max_rows) and (self.drawn_lines - self._origin_lines >= self.max_rows)
+    
+    def drawn_features(self):
+        '''the features drawn in the track: the features not hidden by 
+        `max_rows` and their summary'''
+        if not self.hidden_features:
+            return self.features
+        hidden = set([id(feat) for feat in self.hidden_features])
+        drawn = [feat for feat in self.features if id(feat) not in hidden]
+        if self.overflow_feature is not None:
+            drawn.append(self.overflow_feature)
+        return drawn
+
+    def release(self):
+        '''drop the artists of the features and the layout, the track is
+        laid out again when drawn'''
+        for feat in self.features:
+            feat.reset()
+        self._reset_layout()
+        self._laid_out = False
+
+    @staticmethod
+    def _collides(left_margin, right_margin, line_controller):
+        for prev_start,prev_end in line_controller:
+            if  (prev_start <= left_margin <= prev_end) or \
+                (prev_start <= right_margin <= prev_end) or \
+                ((left_margin < prev_start < right_margin) and \
+                 (left_margin < prev_end < right_margin)):
+                return True
+        return False
+    
+    def _move_feature(self, feat2draw, Ycord):
+        '''place the feature at `Ycord`'''
+        self._positions[id(feat2draw)] = Ycord
+        feat2draw.set_offset(Ycord)
+    
+    def _feature_margins(self, feat2draw, dpi, renderer = None):
+        '''left and right margins of the feature patches and names, measured
+        once for the feature artists'''
+        if 'margins' in feat2draw.measures:
+            return feat2draw.measures['margins']
+        xs_patches=[]
+        for patch in feat2draw.patches:
+            #for p in patch:
+            try:
+                bbox=patch.get_window_extent(None,)
+            except:
+                warnings.warn('could not find box coordinated for patch: '+str(patch) )
+                continue
+            xs_patches.append(bbox.xmax)
+            xs_patches.append(bbox.xmin)
+        for fname in feat2draw.feat_name:
+            # set the correct dpi to correctly estimate text size.
+            # required by Text class in matplotlib
+            if renderer is not None:
+                bbox = fname.get_window_extent(renderer, dpi = dpi)
+            else:
+                bbox = fname.get_window_extent(dpi = dpi)
+            xs_patches.append(bbox.xmax)
+            xs_patches.append(bbox.xmin)
+        feat2draw.measures['margins'] = {'left_margin' : min(xs_patches),
+                                         'right_margin' : max(xs_patches)}
+        return feat2draw.measures['margins']
 
       
     def _collapse(self, dpi,):
@@ -223,179 +372,248 @@ class BaseTrack(object):
         line_controller=[]
         size_memory={}
         draw_features = []
-        while len(draw_features) < len(self.features):
+        while (len(draw_features) < len(self.features)) and not self._rows_full():
             for feat_numb, feat2draw in enumerate(self.features):
                 '''estimate feature lenght'''
                 if feat_numb not in size_memory:
-                    xs_patches=[]
-                    for patch in feat2draw.patches:
-                        #for p in patch:
-                        try:
-                            bbox=patch.get_window_extent(None,)
-                        except:
-                            warnings.warn('could not find box coordinated for patch: '+str(patch) )
-                            continue
-                        xs_patches.append(bbox.xmax)
-                        xs_patches.append(bbox.xmin)
-                    for fname in feat2draw.feat_name:
-                        # set the correct dpi to correctly estimate text size.
-                        # required by Text class in matplotlib
-                        bbox = fname.get_window_extent(dpi = dpi)
-                        xs_patches.append(bbox.xmax)
-                        xs_patches.append(bbox.xmin)
-                    size_memory[feat_numb]={'left_margin' : min(xs_patches),
-                                    'right_margin' : max(xs_patches)}
+                    size_memory[feat_numb] = self._feature_margins(feat2draw, dpi)
 
                 ''' Check for collisions both on text and patches'''
                 if feat_numb not in draw_features:
-                    draw=True
-                    for prev_start,prev_end in line_controller:
-                        if  (prev_start <= size_memory[feat_numb]['left_margin'] <= prev_end) or \
-                            (prev_start <= size_memory[feat_numb]['right_margin'] <= prev_end) or \
-                            ((size_memory[feat_numb]['left_margin'] < prev_start < size_memory[feat_numb]['right_margin']) and \
-                             (size_memory[feat_numb]['left_margin'] < prev_end < size_memory[feat_numb]['right_margin'])):
-                            draw = False
-                            break
-                    if draw:
+                    if not self._collides(size_memory[feat_numb]['left_margin'], 
+                                          size_memory[feat_numb]['right_margin'],
+                                          line_controller):
                         '''Draw if not collision '''
                         line_controller.append([size_memory[feat_numb]['left_margin'],size_memory[feat_numb]['right_margin']])
-                        for patch in feat2draw.patches:
-                            if isinstance(patch, Line2D):
-                                current_ys = patch.get_ydata()
-                                new_ys = map(operator.add, current_ys, [self.Ycord] * len(current_ys))
-                                patch.set_ydata(new_ys)
-
-                            elif isinstance(patch, FancyArrow):
-                                current_xy=patch.get_xy()
-                                new_xy=[]
-                                for x, y in current_xy:
-                                    new_xy.append([x, y + self.Ycord])
-                                patch.set_xy(new_xy)
-                            elif isinstance(patch, Annotation):
-                                current_x, current_y = patch.xytext
-                                patch.xytext = (current_x, current_y + self.Ycord)
-                            else:
-                                try:
-                                    current_y = patch.get_y()
-                                except AttributeError:
-                                    current_y = patch.get_position()[1]
-                                patch.set_y(current_y + self.Ycord)
-                            
-                        for iname, fname in enumerate(feat2draw.feat_name):
-                            y=fname.get_position()[1]
-                            feat2draw.feat_name[iname].set_y(y + self.Ycord)
-                            current_x, current_y = fname.xytext
-                            feat2draw.feat_name[iname].xytext = (current_x, current_y + self.Ycord)
+                        self._move_feature(feat2draw, self.Ycord)
                         draw_features.append(feat_numb)
                         
             #if len(draw_features) < len(self.features):
+            self._rows.append((self.Ycord, line_controller))# kept to place appended features
             self.Ycord-=self._betw_feat_space
             line_controller=[]
             self.drawn_lines += 1
+        if len(draw_features) < len(self.features):
+            placed = set(draw_features)
+            self.hidden_features = [feat2draw for feat_numb, feat2draw in enumerate(self.features) 
+                                    if feat_numb not in placed]
+
+    def _collapse_new_features(self, feat_list, dpi):
+        '''place appended features in the first row with room for them, as 
+        :func:`_collapse` would do, without moving the features already drawn'''
+        renderer = plt.gcf().canvas.get_renderer()
+        for feat2draw in feat_list:
+            margins = self._feature_margins(feat2draw, dpi, renderer)
+            for Ycord, line_controller in self._rows:
+                if not self._collides(margins['left_margin'], margins['right_margin'], line_controller):
+                    break
+            else:
+                if self._rows_full():
+                    self.hidden_features.append(feat2draw)
+                    continue
+                Ycord, line_controller = self.Ycord, []
+                self._rows.append((Ycord, line_controller))
+                self.Ycord-=self._betw_feat_space
+                self.drawn_lines += 1
+            line_controller.append([margins['left_margin'], margins['right_margin']])
+            self._move_feature(feat2draw, Ycord)
 
       
+    def _order_by(self, keys):
+        '''order features by the `keys` of :data:`SORT_KEYS`, the first key 
+        first. the sort is stable, features with the same keys keep the 
+        order they were added in, as do all of them if there are no `keys`'''
+        if not keys:
+            return list(self.features)
+        if self.sort_order not in ('top', 'bottom'):
+            raise ValueError('Wrong Sort order option: %s'%self.sort_order )
+        if not self.features:
+            return []
+        columns = []
+        for key in reversed(keys):# np.lexsort sorts by the last key first
+            if key not in SORT_KEYS:
+                raise ValueError('Wrong sort_by option: %s' % key)
+            column = np.asarray([SORT_KEYS[key](feat) for feat in self.features], dtype = float)
+            if self.sort_order == 'bottom':
+                column = -column
+            columns.append(column)
+        return [self.features[i] for i in np.lexsort(columns)]
+
     def _order_by_score(self,):
         '''order features by score '''
-        feat_list = []
-        for feat in self.features:
-            feat_list.append([feat.score, feat])
-        if self.sort_order == 'top':
-            feat_list.sort()
-        elif self.sort_order == 'bottom':
-            feat_list.sort()
-            feat_list.reverse()
-        else:
-            raise ValueError('Wrong Sort order option: %s'%self.sort_order )
-        
-        return [feat for (i,feat) in feat_list]
+        return self._order_by(('score',))
 
-    
     def _order_by_length(self,):
-        ''' order basing on the actual length of the feature patches in the figure '''
-        
-        feat_list = []
-        for feat in self.features:
-            xs_patches = []
-            for patch in feat.patches:
-                bbox=patch.get_window_extent(None)
-                xs_patches.append(bbox.xmax)
-                xs_patches.append(bbox.xmin)
-            feat_list.append([max(xs_patches) - min(xs_patches), feat])
-        if self.sort_order == 'top':
-            feat_list.sort()
-        elif self.sort_order == 'bottom':
-            feat_list.sort()
-            feat_list.reverse()
-        else:
-            raise ValueError('Wrong Sort order option: %s'%self.sort_order )
-        
-        return [feat for (i,feat) in feat_list]
+        ''' order basing on the feature length, from `start` to `end` '''
+        return self._order_by(('length',))
+
+    def _sort_keys(self):
+        '''the `sort_by` keys of the features, no keys for an unknown 
+        `sort_by` string'''
+        if isinstance(self.sort_by, basestring):
+            if self.sort_by not in SORT_KEYS:
+                return ()
+            return (self.sort_by,)
+        return tuple(self.sort_by)
         
     def _draw_ordered_features(self, feat_list = None,):
         '''draws one feature per line in the track in the order they are passed'''
         if not feat_list:
             feat_list = self.features
         for feat2draw in feat_list:
-            for patch in feat2draw.patches:
-                if isinstance(patch, Line2D):
-                    current_ys = patch.get_ydata()
-                    new_ys = map(operator.add, current_ys, [self.Ycord] * len(current_ys))
-                    patch.set_ydata(new_ys)
-                elif isinstance(patch, FancyArrow):
-                    current_xy=patch.get_xy()
-                    new_xy=[]
-                    for x, y in current_xy:
-                        new_xy.append([x, y + self.Ycord])
-                    patch.set_xy(new_xy)
-                elif isinstance(patch, Annotation):
-                    current_x, current_y = patch.xytext
-                    patch.xytext = (current_x, current_y + self.Ycord)
-                else:
-                    try: 
-                        current_y = patch.get_y()
-                    except AttributeError:
-                        current_y = patch.get_position()[1]
-                    patch.set_y(current_y + self.Ycord)
-            for iname, fname in enumerate(feat2draw.feat_name):
-                y=fname.get_position()[1]
-                feat2draw.feat_name[iname].set_y(y + self.Ycord)
-                current_x, current_y = fname.xytext
-                feat2draw.feat_name[iname].xytext = (current_x , current_y + self.Ycord)
+            if self._rows_full():
+                self.hidden_features.append(feat2draw)
+                continue
+            self._move_feature(feat2draw, self.Ycord)
             self.Ycord-=self._betw_feat_space
             self.drawn_lines += 1
 
-    def _draw_features(self, **kwargs):
-        '''draw features '''
-        xoffset = kwargs.get('xoffset',0)
-        for feat_numb, feat2draw in enumerate(self.features):
+    def _color_features(self, set_ec = True, feat_list = None):
+        '''set the colormap based colors of all the features with one 
+        colormap lookup for score colored features and one for number colored
+        features'''
+        if feat_list is None:
+            feat_list = self.features
+        by_score = []
+        by_number = []
+        numbered = False
+        for feat_numb, feat2draw in enumerate(feat_list):
             if feat2draw.color_by_cm:
                 if feat2draw.use_score_for_color:
                     feat2draw.cm_value = feat2draw.score
-                    feat2draw.fc = self.cm(feat2draw.cm_value)
-                    if not feat2draw.ec:
-                        feat2draw.ec = feat2draw.fc
+                    by_score.append(feat2draw)
                 else:# color by feature number
                     if not feat2draw.cm_value:
-                        self.norm = colors.normalize(1,len(self.features)+1,)
+                        numbered = True
                         feat2draw.cm_value = feat_numb +1
-                    feat2draw.fc = self.cm(self.norm(feat2draw.cm_value))
-            feat2draw.draw_feature()
-            feat2draw.draw_feat_name(xoffset = xoffset)
-
+                    by_number.append(feat2draw)
+        '''integer scores index the colormap and the others are scaled to it,
+        a single array would turn them all to floats'''
+        integer = [isinstance(feat.cm_value, (int, long, np.integer)) for feat in by_score]
+        for scored in ([feat for feat, is_int in zip(by_score, integer) if is_int],
+                       [feat for feat, is_int in zip(by_score, integer) if not is_int]):
+            if not scored:
+                continue
+            rgba = self.cm(np.asarray([feat.cm_value for feat in scored]))
+            for feat2draw, color in zip(scored, rgba):
+                feat2draw.fc = tuple(color)
+                if set_ec and not feat2draw.ec:
+                    feat2draw.ec = feat2draw.fc
+        if by_number:
+            if numbered:
+                self.norm = colors.normalize(1,len(self.features)+1,)
+            rgba = self.cm(self.norm(np.asarray([feat.cm_value for feat in by_number], dtype = float)))
+            for feat2draw, color in zip(by_number, rgba):
+                feat2draw.fc = tuple(color)
+
+    def _draw_features(self, feat_list = None, **kwargs):
+        '''draw features '''
+        if feat_list is None:
+            feat_list = self.features
+        xoffset = kwargs.get('xoffset',0)
+        self._color_features(feat_list = feat_list)
+        context = self._render_context(**kwargs)
+        labels = self.feature_labels == 'all'
+        for feat2draw in feat_list:
+            feat2draw.render(context, labels = labels, xoffset = xoffset)
+    
+    def _place_labels(self, dpi, **kwargs):
+        '''draw the names of the placed features that fit in their row, 
+        shortened if needed, see :func:`~biograpy.labels.place_labels`'''
+        feat_list = [feat for feat in self.features if id(feat) in self._positions]
+        if not feat_list:
+            return
+        xmin = kwargs.get('xoffset', None)
+        if xmin is None:
+            xmin = self.xmin
+        xmax = kwargs.get('xmax', None)
+        if xmax is None:
+            xmax = self.xmax
+        pixels = kwargs.get('pixels', None) or (xmax - xmin)
+        scale = float(pixels) / ((xmax - xmin) or 1)
+        '''names are drawn as draw_feat_name does'''
+        xoffset = kwargs.get('xoffset',0)
+        starts = np.asarray([feat.start for feat in feat_list], dtype = float)
+        ends = np.asarray([feat.end for feat in feat_list], dtype = float)
+        text_x = np.where((starts < (xoffset or 0)) & ((xoffset or 0) <= ends), starts + (xoffset or 0), starts)
+        lengths = [len(feat.name) if isinstance(feat.name, basestring) else 0 for feat in feat_list]
+        char_width = FontProperties(size = 'x-small').get_size_in_points() * dpi / 72. * CHAR_WIDTH
+        chars = place_labels([self._positions[id(feat)] for feat in feat_list], 
+                             (text_x - xmin) * scale, lengths, char_width, (xmax - xmin) * scale)
+        base_draw_feat_name = BaseGraphicFeature.draw_feat_name.im_func
+        for feat2draw, shown, length in zip(feat_list, chars, lengths):
+            if type(feat2draw).draw_feat_name.im_func is not base_draw_feat_name:
+                text = feat2draw.name# names drawn by other methods are not placed
+            elif shown:
+                text = truncate(feat2draw.name, shown)
+            else:
+                text = ''
+            feat2draw.set_label(text, xoffset = xoffset)
+    
+    @staticmethod
+    def _render_context(**kwargs):
+        '''feature artists built for the same drawing range are reused'''
+        return (kwargs.get('xoffset', None), kwargs.get('xmax', None), kwargs.get('pixels', None))
+
+    def _summarize_overflow(self, **kwargs):
+        '''draw the features hidden by `max_rows` as an 
+        :class:`~biograpy.features.OverflowFeature` in a last row'''
+        if not self.hidden_features:
+            return
+        self.overflow_feature = OverflowFeature(self.hidden_features,
+                                                xmin = kwargs.get('xoffset', None),
+                                                xmax = kwargs.get('xmax', None),
+                                                bins = kwargs.get('pixels', None))
+        self.overflow_feature.render(self._render_context(**kwargs), xoffset = kwargs.get('xoffset',0))
+        self._move_feature(self.overflow_feature, self.Ycord)
+        self.Ycord-=self._betw_feat_space
+        self.drawn_lines += 1
+    
+    def _place_new_features(self, feat_list, dpi):
+        if self.sort_by == 'collapse':
+            self._collapse_new_features(feat_list, dpi)
+        else:
+            self._draw_ordered_features(feat_list)
+    
+    def _update_features(self, dpi = 80, **kwargs):
+        '''draw and place only the features appended after the last layout.
+        returns the list of the new features'''
+        feat_list = self._new_features
+        self._new_features = []
+        if self._colored_by_number():
+            '''colors change with the number of features: the old features 
+            are drawn again where they were placed'''
+            placed = self.features[:len(self.features) - len(feat_list)]
+            self._draw_features(**kwargs)
+            for feat2draw in placed:
+                if id(feat2draw) in self._positions:
+                    self._move_feature(feat2draw, self._positions[id(feat2draw)])
+        else:
+            self._draw_features(feat_list = feat_list, **kwargs)
+        self._place_new_features(feat_list, dpi)
+        if self.feature_labels == 'declutter':
+            self._place_labels(dpi, **kwargs)
+        self._summarize_overflow(**kwargs)
+        return feat_list
             
     def _sort_features(self, dpi = 80, **kwargs):
         ''' sort features basing on the chosen mode '''
+        if self._laid_out:
+            self._reset_layout()
+        self._laid_out = True
+        self._invalid = False
+        self._new_features = []
         self._draw_features(**kwargs)
         if self.sort_by =='collapse':
             self._collapse(dpi, )
-        elif self.sort_by =='score':
-            feat_list = self._order_by_score()
-            self._draw_ordered_features(feat_list,)
-        elif self.sort_by =='length':
-            feat_list = self._order_by_length()
-            self._draw_ordered_features(feat_list, )
-        else:
+        elif self.sort_by is None:
             self._draw_ordered_features()
+        else:
+            feat_list = self._order_by(self._sort_keys())
+            self._draw_ordered_features(feat_list,)
+        if self.feature_labels == 'declutter':
+            self._place_labels(dpi, **kwargs)
+        self._summarize_overflow(**kwargs)
     
         
         
@@ -488,6 +706,7 @@ class PlotTrack(BaseTrack):
         self.ymax = kwargs.get('ymax', 1)
         self.show_yticklabels = kwargs.get('show_yticklabels', True )
         self.drawn_lines = kwargs.get('track_lines', 4 )#  number of features to be counted do determine track height
+        self._store_layout_origin()
         
                                 
     def _collapse(self, dpi):
@@ -495,34 +714,38 @@ class PlotTrack(BaseTrack):
         
 
       
-    def _order_by_score(self,):
-        return self.features
-
-
-    
-    def _order_by_length(self,):
+    def _order_by(self, keys):
         return self.features
         
                 
     def _draw_ordered_features(self, feat_list = None):
         return
 
-    def _draw_features(self, **kwargs):
+    def _can_update(self):
+        return self._laid_out and not self._invalid
+    
+    def _place_new_features(self, feat_list, dpi):
+        return
+
+    def _draw_features(self, feat_list = None, **kwargs):
+        if feat_list is None:
+            feat_list = self.features
         xoffset = kwargs.get('xoffset',0)
-        for feat_numb, feat2draw in enumerate(self.features):
-            if feat2draw.color_by_cm:
-                if feat2draw.use_score_for_color:
-                    feat2draw.cm_value = feat2draw.score
-                    feat2draw.fc = self.cm(feat2draw.cm_value)
-                else:# color by feature number
-                    if not feat2draw.cm_value:
-                        self.norm = colors.normalize(1,len(self.features)+1,)
-                        feat2draw.cm_value = feat_numb +1
-                    feat2draw.fc = self.cm(self.norm(feat2draw.cm_value))
-            feat2draw.draw_feature()
-            feat2draw.draw_feat_name(xoffset = xoffset)
+        self._color_features(set_ec = False, feat_list = feat_list)
+        context = self._render_context(**kwargs)
+        for feat2draw in feat_list:
+            if hasattr(feat2draw, 'set_view'):# windowed data sources only read what is visible
+                feat2draw.set_view(xmin = kwargs.get('xoffset', None),
+                                   xmax = kwargs.get('xmax', None),
+                                   pixels = kwargs.get('pixels', None))
+            feat2draw.render(context, xoffset = xoffset)
 
             
     def _sort_features(self, dpi = 80, **kwargs):
+        if self._laid_out:
+            self._reset_layout()
+        self._laid_out = True
+        self._invalid = False
+        self._new_features = []
         self._draw_features(**kwargs)
                     
\ No newline at end of file